@@ -0,0 +1,138 @@
+"""进程内共用的动画时钟：眨眼、睁眼、眼睛一亮渐显、视频路径轮询与帧播放都挂在同一个单次 QTimer 上。
+
+每个任务有截止时间与可容忍的延后（tolerance）；定时器只对准所有任务中「最晚可接受时间」最早的那个，
+到点后把所有已到截止时间的任务一并执行，因此多个窗口的眨眼、轮询会合并成一次唤醒。
+帧播放等需要准时的任务 tolerance 为 0，时钟随之按帧间隔唤醒；没有任何任务时定时器停止，不再唤醒。
+"""
+import itertools
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from PyQt6 import sip
+from PyQt6.QtCore import QObject, Qt, QTimer
+
+
+@dataclass
+class _Entry:
+    deadline: float                  # 截止时间（time.monotonic 秒）
+    tolerance: float                 # 可接受的延后（秒），用于与其它任务合并唤醒
+    callback: Callable[[], None]
+    owner: Optional[int]             # 所属对象（一般为 id(窗口)），便于整体取消
+    interval: float = 0.0            # >0 为周期任务
+
+
+class AnimationClock(QObject):
+    """单个定时器驱动的动画调度器。
+
+    - call_later(delay_ms, cb) / call_at(deadline, cb)：单次任务
+    - every(interval_ms, cb)：周期任务；落后时跳过错过的周期，不补发
+    - cancel(handle) / cancel_owner(owner)：取消单个任务 / 某对象的全部任务
+    """
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+        self._entries: Dict[int, _Entry] = {}
+        self._handles = itertools.count(1)
+        self._dispatching = False
+        # 统计：定时器唤醒次数与执行的回调数
+        self.wakeups = 0
+        self.callbacks = 0
+
+    @staticmethod
+    def now() -> float:
+        return time.monotonic()
+
+    def call_at(self, deadline: float, callback: Callable[[], None], tolerance_ms: float = 0.0,
+                owner: Optional[int] = None) -> int:
+        handle = next(self._handles)
+        self._entries[handle] = _Entry(deadline, tolerance_ms / 1000.0, callback, owner)
+        self._arm()
+        return handle
+
+    def call_later(self, delay_ms: float, callback: Callable[[], None], tolerance_ms: float = 0.0,
+                   owner: Optional[int] = None) -> int:
+        return self.call_at(self.now() + delay_ms / 1000.0, callback, tolerance_ms, owner)
+
+    def every(self, interval_ms: float, callback: Callable[[], None], tolerance_ms: float = 0.0,
+              owner: Optional[int] = None) -> int:
+        interval = max(interval_ms, 1.0) / 1000.0
+        handle = next(self._handles)
+        self._entries[handle] = _Entry(self.now() + interval, tolerance_ms / 1000.0, callback, owner, interval)
+        self._arm()
+        return handle
+
+    def cancel(self, handle: Optional[int]) -> None:
+        if handle is not None and self._entries.pop(handle, None) is not None:
+            self._arm()
+
+    def cancel_owner(self, owner: int) -> None:
+        handles = [h for h, e in self._entries.items() if e.owner == owner]
+        for handle in handles:
+            del self._entries[handle]
+        if handles:
+            self._arm()
+
+    def pending(self, handle: Optional[int]) -> bool:
+        return handle is not None and handle in self._entries
+
+    def _arm(self) -> None:
+        if self._dispatching or sip.isdeleted(self._timer):
+            return  # 回调执行完后统一重新对准；进程退出时定时器可能已先于窗口销毁
+        if not self._entries:
+            self._timer.stop()
+            return
+        # 任务数很少（每个窗口几个），直接线性扫描
+        fire_at = min(e.deadline + e.tolerance for e in self._entries.values())
+        self._timer.start(max(0, int((fire_at - self.now()) * 1000.0 + 0.999)))
+
+    def _on_timeout(self) -> None:
+        self.wakeups += 1
+        now = self.now()
+        due = sorted(
+            ((h, e) for h, e in self._entries.items() if e.deadline <= now),
+            key=lambda item: item[1].deadline,
+        )
+        self._dispatching = True
+        try:
+            for handle, entry in due:
+                if self._entries.get(handle) is not entry:
+                    continue  # 已被前面的回调取消
+                if entry.interval > 0:
+                    entry.deadline += entry.interval
+                    if entry.deadline <= now:
+                        entry.deadline = now + entry.interval
+                else:
+                    del self._entries[handle]
+                self.callbacks += 1
+                try:
+                    entry.callback()
+                except Exception as e:
+                    print(f"[桌宠-动画] 回调出错: {e}", file=sys.stderr, flush=True)
+        finally:
+            self._dispatching = False
+        self._arm()
+
+    def stats(self) -> dict:
+        return {
+            "clock_wakeups": self.wakeups,
+            "clock_callbacks": self.callbacks,
+            "clock_entries": len(self._entries),
+            "clock_active": self._timer.isActive(),
+        }
+
+
+_CLOCK: Optional[AnimationClock] = None
+
+
+def animation_clock() -> AnimationClock:
+    """进程内唯一的动画时钟（首次使用时创建，需已有 QApplication）。"""
+    global _CLOCK
+    if _CLOCK is None:
+        _CLOCK = AnimationClock()
+    return _CLOCK
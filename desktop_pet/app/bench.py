@@ -0,0 +1,659 @@
+"""桌宠窗口绘制与动效的基准测试（离屏运行，无需显示器）。
+
+用法：
+    python -m desktop_pet.app.bench paint [--paints 300] [--avatar 1024x1024]
+    python -m desktop_pet.app.bench repaint [--seconds 60] [--present 20]
+    python -m desktop_pet.app.bench timers [--seconds 30] [--windows 3]
+    python -m desktop_pet.app.bench gif [--frames 121] [--plays 3] [--busy-ms 0]
+    python -m desktop_pet.app.bench reaction [--plays 20] [--frames 121]
+    python -m desktop_pet.app.bench video [--plays 1000] [--frames 12]
+    python -m desktop_pet.app.bench framepack [--frames 121] [--plays 3]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QElapsedTimer, QEvent, QEventLoop, QObject, Qt, QTimer
+from PyQt6.QtGui import QColor, QImage, QLinearGradient, QPainter, QPixmap
+from PyQt6.QtWidgets import QApplication
+
+
+def parse_size(text: str) -> Tuple[int, int]:
+    """解析 "宽x高" 形式的尺寸。"""
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def _app() -> QApplication:
+    return QApplication.instance() or QApplication([])
+
+
+def write_test_avatar(path: Path, size: Tuple[int, int] = (1024, 1024)) -> Path:
+    """写出一张渐变色的测试头像（PNG）。"""
+    image = QImage(size[0], size[1], QImage.Format.Format_ARGB32)
+    painter = QPainter(image)
+    gradient = QLinearGradient(0, 0, size[0], size[1])
+    gradient.setColorAt(0.0, QColor(255, 180, 120))
+    gradient.setColorAt(1.0, QColor(90, 60, 160))
+    painter.fillRect(image.rect(), gradient)
+    painter.end()
+    image.save(str(path))
+    return path
+
+
+def _time_repaints(window, paints: int) -> float:
+    """同步重绘 paints 次，返回平均单次耗时（毫秒）。"""
+    window.repaint()  # 首次绘制：缓存未命中的缩放不计入
+    start = time.perf_counter()
+    for _ in range(paints):
+        window.repaint()
+    return (time.perf_counter() - start) * 1000.0 / paints
+
+
+def run_paint_bench(paints: int = 300, avatar_size: Tuple[int, int] = (1024, 1024)) -> dict:
+    """头像窗口与几何形象窗口的单次重绘耗时；对照项为旧做法每次重绘都对原图 scaled() 的耗时。"""
+    from desktop_pet.app.pixmap_cache import SCALED_AVATARS
+    from desktop_pet.app.window import PetWindow
+    from desktop_pet.config import WINDOW_CONTENT_MARGIN
+
+    app = _app()
+    with tempfile.TemporaryDirectory() as tmp:
+        avatar = write_test_avatar(Path(tmp) / "avatar.png", avatar_size)
+        window = PetWindow(avatar_path=str(avatar))
+        window.show()
+        app.processEvents()
+        avatar_ms = _time_repaints(window, paints)
+        # 对照：旧 paintEvent 每次对全尺寸原图做平滑缩放
+        source = QPixmap(str(avatar))
+        content_w, content_h = window.width() - 2 * WINDOW_CONTENT_MARGIN, window.height() - 2 * WINDOW_CONTENT_MARGIN
+        start = time.perf_counter()
+        for _ in range(paints):
+            source.scaled(content_w, content_h, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        rescale_ms = (time.perf_counter() - start) * 1000.0 / paints
+        window.close()
+    plain = PetWindow()
+    plain.show()
+    app.processEvents()
+    geometric_ms = _time_repaints(plain, paints)
+    plain.close()
+    row = {"avatar_paint_ms": avatar_ms, "rescale_ms": rescale_ms, "geometric_paint_ms": geometric_ms}
+    row.update(SCALED_AVATARS.stats())
+    return row
+
+
+def _replay_minute(window, app: QApplication, seconds: float, present_s: float, tick_ms: int) -> int:
+    """按时间线回放一段动效：每 3 s 眨眼一次（120 ms 后睁眼），每 tick_ms 一次检测结果；
+    中间 present_s 秒有人且运动位置在画面里左右来回移动（视线跟随）。返回期间重绘的像素数。"""
+    window.repaint()
+    painted = window.painted_pixels
+    ticks = int(seconds * 1000 / tick_ms)
+    start_tick = (ticks - int(present_s * 1000 / tick_ms)) // 2
+    end_tick = start_tick + int(present_s * 1000 / tick_ms)
+    blink_every = max(1, 3000 // tick_ms)
+    for i in range(ticks):
+        present = start_tick <= i < end_tick
+        window.update_detection(present)
+        window.look_at((0.2 + 0.6 * ((i - start_tick) % 20) / 19.0, 0.5) if present else None)
+        app.processEvents()
+        if i % blink_every == blink_every - 1:
+            window._do_blink()
+            app.processEvents()
+            window._open_eyes()
+            app.processEvents()
+    return window.painted_pixels - painted
+
+
+def run_repaint_bench(seconds: float = 60.0, present_s: float = 20.0, tick_ms: int = 200,
+                      avatar_size: Tuple[int, int] = (512, 512)) -> dict:
+    """同一段眨眼 / 检测 / 视线跟随时间线下，整窗重绘与局部重绘各自重绘的像素数（折算为每分钟）。"""
+    from desktop_pet.app.window import PetWindow
+
+    app = _app()
+    row = {}
+    scale = 60.0 / seconds
+    with tempfile.TemporaryDirectory() as tmp:
+        avatar = str(write_test_avatar(Path(tmp) / "avatar.png", avatar_size))
+        for kind, path in (("geometric", None), ("avatar", avatar)):
+            for mode, partial in (("full", False), ("partial", True)):
+                window = PetWindow(avatar_path=path)
+                window.partial_repaint = partial
+                window.show()
+                app.processEvents()
+                row[f"{kind}_{mode}_px_per_min"] = _replay_minute(window, app, seconds, present_s, tick_ms) * scale
+                window.close()
+    return row
+
+
+def _print_repaint_row(row: dict) -> None:
+    for kind, label in (("geometric", "几何形象"), ("avatar", "头像")):
+        full, partial = row[f"{kind}_full_px_per_min"], row[f"{kind}_partial_px_per_min"]
+        ratio = partial / full if full else 0.0
+        print(f"{label}：整窗重绘 {full / 1e6:.2f} M 像素/分钟，局部重绘 {partial / 1e6:.3f} M 像素/分钟（{ratio:.1%}）")
+
+
+class _TimerEventCounter(QObject):
+    """应用级事件过滤器：统计定时器事件（即定时器唤醒）次数。"""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def eventFilter(self, obj, event) -> bool:
+        if event.type() == QEvent.Type.Timer:
+            self.count += 1
+        return False
+
+
+def _count_timer_events(app: QApplication, seconds: float) -> int:
+    counter = _TimerEventCounter()
+    app.installEventFilter(counter)
+    elapsed = QElapsedTimer()
+    elapsed.start()
+    while elapsed.elapsed() < seconds * 1000:
+        app.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents, 50)
+    app.removeEventFilter(counter)
+    return counter.count
+
+
+def _legacy_timers() -> list:
+    """旧窗口的定时器：3 s 眨眼（每次再 singleShot 120 ms 睁眼）与 2 s 视频路径轮询。"""
+    blink = QTimer()
+    blink.timeout.connect(lambda: QTimer.singleShot(120, lambda: None))
+    blink.start(3000)
+    poll = QTimer()
+    poll.timeout.connect(lambda: None)
+    poll.start(2000)
+    return [blink, poll]
+
+
+class _BenchPet:
+    """等待图生视频的宠物档案：窗口会轮询 video_path。"""
+    id = "bench"
+    video_path = None
+    gif_path = None
+
+
+def run_timer_bench(seconds: float = 30.0, windows: int = 3) -> dict:
+    """windows 个待机窗口（几何形象、等待视频）在 seconds 秒内的定时器唤醒次数：旧的每窗口独立定时器 vs 动画时钟。"""
+    from desktop_pet.app.animation import animation_clock
+    from desktop_pet.app.window import PetWindow
+
+    app = _app()
+    timers = [timer for _ in range(windows) for timer in _legacy_timers()]
+    legacy = _count_timer_events(app, seconds)
+    for timer in timers:
+        timer.stop()
+    app.processEvents()
+
+    clock = animation_clock()
+    wakeups = clock.wakeups
+    pets = [PetWindow(pet=_BenchPet()) for _ in range(windows)]
+    for window in pets:
+        window.show()
+    app.processEvents()
+    events = _count_timer_events(app, seconds)
+    row = {
+        "legacy_wakeups_per_min": legacy * 60.0 / seconds,
+        "clock_timer_events_per_min": events * 60.0 / seconds,
+        "clock_wakeups_per_min": (clock.wakeups - wakeups) * 60.0 / seconds,
+    }
+    for window in pets:
+        window.close()
+        window.deleteLater()
+    app.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+    row.update(clock.stats())
+    return row
+
+
+def _print_timer_row(row: dict) -> None:
+    print(f"旧定时器：{row['legacy_wakeups_per_min']:.0f} 次唤醒/分钟")
+    print(f"动画时钟：{row['clock_wakeups_per_min']:.0f} 次唤醒/分钟（应用内全部定时器事件 "
+          f"{row['clock_timer_events_per_min']:.0f} 次/分钟）；窗口关闭后剩余任务 {row['clock_entries']}，"
+          f"定时器{'仍在运行' if row['clock_active'] else '已停止'}")
+
+
+def _rss_bytes() -> int:
+    """当前进程常驻内存（字节）；没有 /proc 时退回峰值。"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def write_test_gif(path: Path, frames: int = 121, size: Tuple[int, int] = (320, 320), fps: int = 30) -> Path:
+    """写出一段只播一遍的测试 GIF（与 video_to_gif 的输出同规格：320 宽、30 fps），画面每帧都在变化。"""
+    import cv2
+    import numpy as np
+
+    w, h = size
+    yy, xx = np.mgrid[0:h, 0:w]
+    images = []
+    for i in range(frames):
+        frame = np.empty((h, w, 3), np.uint8)
+        frame[..., 0] = (xx + i * 3) % 256
+        frame[..., 1] = (yy * 2 + i) % 256
+        frame[..., 2] = 160
+        cx = int(w / 2 + w / 3 * np.sin(i / 10.0))
+        cv2.circle(frame, (cx, h // 2), h // 6, (255, 255, 255), -1)
+        images.append(frame)
+    animation = cv2.Animation()
+    animation.frames = images
+    animation.durations = [int(1000 / fps)] * frames
+    animation.loop_count = 1
+    cv2.imwriteanimation(str(path), animation)
+    return path
+
+
+def write_test_video(path: Path, frames: int = 121, size: Tuple[int, int] = (320, 480), fps: int = 30) -> Path:
+    """写出一段测试 mp4（mp4v 编码，与即梦图生视频一样竖屏），画面每帧都在变化。"""
+    import cv2
+    import numpy as np
+
+    w, h = size
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (w, h))
+    yy, xx = np.mgrid[0:h, 0:w]
+    for i in range(frames):
+        frame = np.empty((h, w, 3), np.uint8)
+        frame[..., 0] = (xx + i * 3) % 256
+        frame[..., 1] = (yy + i) % 256
+        frame[..., 2] = 120
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def run_video_bench(plays: int = 1000, frames: int = 12, display: Tuple[int, int] = (180, 180), fps: int = 60) -> dict:
+    """OpenCV 视频帧来源连播 plays 遍（每遍打开、解码、释放一次 VideoCapture），记录每遍播完后的常驻内存。"""
+    from PyQt6.QtCore import QSize
+    from desktop_pet.app.frame_player import FramePlayer, VideoFrameSource
+
+    app = _app()
+    with tempfile.TemporaryDirectory() as tmp:
+        video = write_test_video(Path(tmp) / "pet_i2v.mp4", frames, fps=fps)
+        source = VideoFrameSource(str(video))
+        player = FramePlayer(source)
+        player.set_size(QSize(*display))
+        done = []
+        player.finished.connect(lambda: done.append(True))
+        base = _rss_bytes()
+        rss, start = [], time.perf_counter()
+        for i in range(plays):
+            player.play()
+            while len(done) <= i:
+                app.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents, 5)
+            rss.append(_rss_bytes())
+        elapsed = time.perf_counter() - start
+        row = player.stats()
+    warm = min(10, len(rss) - 1)
+    row.update({
+        "plays_done": len(rss),
+        "seconds": elapsed,
+        "base_rss_mb": base / 1e6,
+        "rss_after_warmup_mb": rss[warm] / 1e6,
+        "rss_last_mb": rss[-1] / 1e6,
+        "rss_max_mb": max(rss) / 1e6,
+        "decoder_released": source._cap is None,
+    })
+    return row
+
+
+def _print_video_row(row: dict) -> None:
+    print(f"OpenCV 视频帧来源连播 {row['plays_done']} 遍（{row['seconds']:.1f} s）：显示 {row['frames_shown']} 帧、"
+          f"丢帧 {row['frames_dropped']}，预读峰值 {row['peak_buffered_bytes'] / 1024:.0f} KB")
+    print(f"常驻内存：基线 {row['base_rss_mb']:.1f} MB，第 10 遍后 {row['rss_after_warmup_mb']:.1f} MB，"
+          f"最后 {row['rss_last_mb']:.1f} MB，最高 {row['rss_max_mb']:.1f} MB；"
+          f"播完已释放解码器：{'是' if row['decoder_released'] else '否'}")
+
+
+def _clip_nominal_ms(path: str) -> float:
+    """整段 GIF（或帧包）从第一帧到最后一帧出现的标称时长（毫秒）。"""
+    from PyQt6.QtGui import QImageReader
+    from desktop_pet.app.framepack import SUFFIX, open_framepack
+
+    if path.endswith(SUFFIX):
+        pack = open_framepack(path)
+        return float(sum(pack.delay_ms(i) for i in range(len(pack) - 1)))
+    reader = QImageReader(path)
+    delays = []
+    while not reader.read().isNull():
+        delays.append(reader.nextImageDelay())
+    return float(sum(delays[:-1]))
+
+
+def _frame_timing(times: list, delays: list) -> dict:
+    """相邻两帧实际间隔与上一帧标称时长之差（毫秒），以及第一帧到最后一帧的实际时长。"""
+    errors = sorted(abs((times[i] - times[i - 1]) * 1000.0 - delays[i - 1]) for i in range(1, len(times)))
+    return {
+        "frames": len(times),
+        "jitter_p50_ms": errors[len(errors) // 2] if errors else 0.0,
+        "jitter_max_ms": errors[-1] if errors else 0.0,
+        "duration_ms": (times[-1] - times[0]) * 1000.0 if times else 0.0,
+    }
+
+
+def _busy(ms: float) -> None:
+    """占住 GUI 线程 ms 毫秒，模拟机器繁忙。"""
+    end = time.perf_counter() + ms / 1000.0
+    while time.perf_counter() < end:
+        pass
+
+
+def _play_gif_once(app: QApplication, mode: str, path: str, size: Tuple[int, int], holder: dict,
+                   busy_ms: float = 0.0) -> dict:
+    """在本进程内播一遍 GIF：mode 为 qmovie（旧做法：QLabel + QMovie CacheAll）或 player（逐帧播放器）；
+    mode 为 framepack 时 path 为帧包，用逐帧播放器映射播放。
+    busy_ms > 0 时每显示一帧都占住 GUI 线程这么久。"""
+    times, delays, peak = [], [], [0]
+    done = []
+
+    def on_frame(delay_ms: int) -> None:
+        times.append(time.perf_counter())
+        delays.append(delay_ms)
+        peak[0] = max(peak[0], _rss_bytes())
+        if busy_ms > 0:
+            _busy(busy_ms)
+
+    if mode == "qmovie":
+        from PyQt6.QtGui import QMovie
+        from PyQt6.QtWidgets import QLabel
+
+        if "movie" not in holder:  # 旧窗口里 QMovie 常驻，多次播放共用
+            label = QLabel()
+            movie = QMovie(path)
+            movie.setCacheMode(QMovie.CacheMode.CacheAll)
+            label.setMovie(movie)
+            label.setScaledContents(True)
+            label.resize(*size)
+            label.show()
+            holder.update(label=label, movie=movie)
+        movie = holder["movie"]
+        conn = movie.frameChanged.connect(lambda _: on_frame(movie.nextFrameDelay()))
+        fin = movie.finished.connect(lambda: done.append(True))
+        movie.start()
+    else:
+        from PyQt6.QtCore import QSize
+        from desktop_pet.app.frame_player import FramePackSource, FramePlayer, GifFrameSource
+
+        if "player" not in holder:
+            player = FramePlayer(FramePackSource(path) if mode == "framepack" else GifFrameSource(path))
+            player.set_size(QSize(*size))
+            holder["player"] = player
+        player = holder["player"]
+        conn = player.frameChanged.connect(lambda: on_frame(player.current.delay_ms))
+        fin = player.finished.connect(lambda: done.append(True))
+        player.play()
+    while not done:
+        app.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents, 5)
+    source = holder["movie"] if mode == "qmovie" else holder["player"]
+    source.frameChanged.disconnect(conn)
+    source.finished.disconnect(fin)
+    row = _frame_timing(times, delays)
+    row["nominal_ms"] = holder["nominal_ms"]
+    if mode != "qmovie":
+        # 按墙上时钟：整段时长以最后一帧结束为准（最后一帧也要显示满它的时长）
+        stats = holder["player"].stats()
+        row["frames_dropped"] = stats["frames_dropped"] - holder.get("dropped", 0)
+        row["frames_late"] = stats["frames_late"] - holder.get("late", 0)
+        holder.update(dropped=stats["frames_dropped"], late=stats["frames_late"])
+    row["peak_rss_mb"] = peak[0] / 1e6
+    row["after_rss_mb"] = _rss_bytes() / 1e6
+    return row
+
+
+def _gif_worker(mode: str, path: str, size: Tuple[int, int], plays: int, busy_ms: float = 0.0) -> dict:
+    """子进程内：记录基线内存后连播 plays 遍，返回每遍的计时与内存。"""
+    app = _app()
+    from desktop_pet.app.frame_player import FramePlayer  # noqa: F401  先导入，避免计入播放内存
+    from PyQt6.QtGui import QMovie  # noqa: F401
+    holder: dict = {"nominal_ms": _clip_nominal_ms(path)}
+    base = _rss_bytes()
+    runs = [_play_gif_once(app, mode, path, size, holder, busy_ms) for _ in range(plays)]
+    return {"mode": mode, "base_rss_mb": base / 1e6, "runs": runs}
+
+
+def run_gif_bench(frames: int = 121, plays: int = 3, display: Tuple[int, int] = (180, 180), busy_ms: float = 0.0) -> dict:
+    """同一段 GIF 分别用 QMovie(CacheAll) 与逐帧播放器各在独立子进程里连播 plays 遍：内存增量、帧时间抖动，
+    以及 busy_ms 模拟繁忙时整段实际时长与丢帧数。"""
+    with tempfile.TemporaryDirectory() as tmp:
+        gif = write_test_gif(Path(tmp) / "pet.gif", frames)
+        out = {}
+        for mode in ("qmovie", "player"):
+            cmd = [sys.executable, "-m", "desktop_pet.app.bench", "_gif-worker", mode, str(gif),
+                   "--plays", str(plays), "--display", f"{display[0]}x{display[1]}", "--busy-ms", str(busy_ms)]
+            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+            lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+            if proc.returncode != 0 or not lines:
+                raise RuntimeError(f"{mode} 子进程失败: {proc.stderr[-2000:]}")
+            out[mode] = json.loads(lines[-1])
+        out["gif_bytes"] = os.path.getsize(gif)
+    return out
+
+
+def _print_gif_row(row: dict) -> None:
+    print(f"测试 GIF {row['gif_bytes'] / 1e6:.2f} MB")
+    for mode, label in (("qmovie", "QMovie(CacheAll)"), ("player", "逐帧播放器")):
+        data = row[mode]
+        base = data["base_rss_mb"]
+        for i, run in enumerate(data["runs"], 1):
+            dropped = f"，丢帧 {run['frames_dropped']}、晚显示 {run['frames_late']}" if "frames_dropped" in run else ""
+            print(f"{label} 第 {i} 遍：{run['frames']} 帧{dropped}，时长 {run['duration_ms']:.0f}/{run['nominal_ms']:.0f} ms，"
+                  f"抖动 p50 {run['jitter_p50_ms']:.1f} ms / 最大 {run['jitter_max_ms']:.1f} ms，"
+                  f"内存峰值 +{run['peak_rss_mb'] - base:.1f} MB，播完 +{run['after_rss_mb'] - base:.1f} MB")
+
+
+def run_reaction_bench(plays: int = 20, frames: int = 121, size: Tuple[int, int] = (320, 320)) -> dict:
+    """检测到人→第一帧画到窗口上的耗时：不预热（播放时才开始解码）与空闲时预热开头几帧。"""
+    from desktop_pet.app.window import PetWindow
+
+    app = _app()
+    out = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        gif = write_test_gif(Path(tmp) / "pet.gif", frames, size)
+        for mode in ("cold", "warm"):
+            window = PetWindow()
+            window.show()
+            window._setup_gif(str(gif))
+            app.processEvents()
+            player = window._frame_player
+            if mode == "cold":
+                player.prewarm_bytes = 0
+                player._drop_warm()  # 显示窗口时已按默认预算预热过
+            for _ in range(plays):
+                player.prewarm()
+                while player._warm_thread is not None:  # 预热在空闲时完成，不计入
+                    app.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents, 5)
+                reactions = len(window._reaction_ms)
+                window.update_detection(True)
+                while len(window._reaction_ms) == reactions:
+                    app.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents, 1)
+                window._on_player_finished()  # 只测第一帧：立即收起，下一遍重新开始
+                window.update_detection(False)
+            row = window.playback_stats()
+            row["warm_kb"] = sum(f.nbytes for f in player._warm) / 1024.0
+            out[mode] = row
+            window.close()
+    return out
+
+
+def _print_reaction_row(row: dict) -> None:
+    for mode, label in (("cold", "不预热"), ("warm", "预热开头几帧")):
+        data = row[mode]
+        print(f"{label}：检测→第一帧 p50 {data['reaction_p50_ms']:.2f} ms / 最大 {data['reaction_max_ms']:.2f} ms"
+              f"（{data['reactions']} 次），预热 {data['warm_frames']} 帧常驻 {data['warm_kb']:.0f} KB")
+
+
+def _gif_via_cv2(video: Path, gif: Path, width: int = 320) -> Path:
+    """没有 ffmpeg 时的对照：用 OpenCV 把视频按 video_to_gif 的规格（320 宽、原帧率）编码成 GIF。"""
+    import cv2
+
+    cap = cv2.VideoCapture(str(video))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    images = []
+    while True:
+        ok, bgr = cap.read()
+        if not ok:
+            break
+        h, w = bgr.shape[:2]
+        images.append(cv2.resize(bgr, (width, int(round(h * width / w))), interpolation=cv2.INTER_AREA))
+    cap.release()
+    animation = cv2.Animation()
+    animation.frames = images
+    animation.durations = [int(round(1000 / fps))] * len(images)
+    animation.loop_count = 1
+    cv2.imwriteanimation(str(gif), animation)
+    return gif
+
+
+def _median_ms(fn, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000.0)
+    return sorted(times)[len(times) // 2]
+
+
+def _first_frame(source, size) -> None:
+    """打开帧来源并取出第一帧（加载耗时）。"""
+    if not source.open(size) or source.read() is None:
+        raise RuntimeError("无法读取第一帧")
+    source.close()
+
+
+def run_framepack_bench(frames: int = 121, plays: int = 3, load_repeats: int = 20) -> dict:
+    """同一段视频转为 GIF 与帧包（未压缩 / zlib）：转换耗时、文件大小、打开到第一帧的耗时，
+    以及在独立子进程里连播 plays 遍的内存增量与帧时间抖动。显示尺寸取帧包尺寸（视频等比缩放进窗口内容区）。"""
+    from PyQt6.QtCore import QSize
+    from desktop_pet.app.frame_player import FramePackSource, GifFrameSource
+    from desktop_pet.app.framepack import SUFFIX, open_framepack
+    from desktop_pet.jimeng.video_to_gif import video_to_framepack, video_to_gif
+
+    _app()
+    out = {"formats": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        video = write_test_video(Path(tmp) / "pet_i2v.mp4", frames)
+        start = time.perf_counter()
+        gif = video_to_gif(video, gif_path=Path(tmp) / "pet.gif")
+        out["gif_encoder"] = "ffmpeg"
+        if gif is None:
+            gif = _gif_via_cv2(video, Path(tmp) / "pet.gif")
+            out["gif_encoder"] = "OpenCV（未找到 ffmpeg）"
+        convert = {"gif": time.perf_counter() - start}
+        packs = {}
+        for name, compress in (("framepack", False), ("framepack_zlib", True)):
+            start = time.perf_counter()
+            packs[name] = video_to_framepack(video, compress=compress, pack_path=Path(tmp) / f"pet_{name}{SUFFIX}")
+            convert[name] = time.perf_counter() - start
+        pack = open_framepack(packs["framepack"])
+        display = (pack.width, pack.height)
+        size = QSize(*display)
+        del pack
+        for name, path, make in (
+            ("gif", gif, GifFrameSource),
+            ("framepack", packs["framepack"], FramePackSource),
+            ("framepack_zlib", packs["framepack_zlib"], FramePackSource),
+        ):
+            row = {
+                "convert_s": convert[name],
+                "file_mb": os.path.getsize(path) / 1e6,
+                "load_ms": _median_ms(lambda: _first_frame(make(str(path)), size), load_repeats),
+            }
+            cmd = [sys.executable, "-m", "desktop_pet.app.bench", "_gif-worker", "player" if name == "gif" else "framepack",
+                   str(path), "--plays", str(plays), "--display", f"{display[0]}x{display[1]}"]
+            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+            lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+            if proc.returncode != 0 or not lines:
+                raise RuntimeError(f"{name} 子进程失败: {proc.stderr[-2000:]}")
+            row["playback"] = json.loads(lines[-1])
+            out["formats"][name] = row
+    out["display"] = display
+    return out
+
+
+def _print_framepack_row(row: dict) -> None:
+    print(f"显示尺寸 {row['display'][0]}×{row['display'][1]}，GIF 编码：{row['gif_encoder']}")
+    for name, label in (("gif", "GIF"), ("framepack", "帧包"), ("framepack_zlib", "帧包(zlib)")):
+        data = row["formats"][name]
+        playback = data["playback"]
+        base = playback["base_rss_mb"]
+        peak = max(run["peak_rss_mb"] for run in playback["runs"]) - base
+        after = playback["runs"][-1]["after_rss_mb"] - base
+        jitter = max(run["jitter_p50_ms"] for run in playback["runs"])
+        print(f"{label}：转换 {data['convert_s']:.2f} s，文件 {data['file_mb']:.2f} MB，打开到第一帧 {data['load_ms']:.2f} ms，"
+              f"播放内存峰值 +{peak:.1f} MB、播完 +{after:.1f} MB，抖动 p50 {jitter:.1f} ms")
+
+
+def _print_paint_row(row: dict) -> None:
+    print(f"头像窗口重绘 {row['avatar_paint_ms']:.3f} ms/次（旧做法每次缩放原图另需 {row['rescale_ms']:.3f} ms）")
+    print(f"几何形象重绘 {row['geometric_paint_ms']:.3f} ms/次")
+    print(f"缩放缓存：命中 {row['avatar_cache_hits']} 次，未命中 {row['avatar_cache_misses']} 次，"
+          f"缩放 {row['avatar_scale_ms']:.2f} ms/次")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m desktop_pet.app.bench", description="桌宠窗口绘制与动效基准测试")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_paint = sub.add_parser("paint", help="单次重绘耗时：缓存的头像缩放图与几何形象")
+    p_paint.add_argument("--paints", type=int, default=300)
+    p_paint.add_argument("--avatar", type=parse_size, default=(1024, 1024), help="测试头像原图尺寸")
+    p_repaint = sub.add_parser("repaint", help="每分钟重绘像素数：整窗重绘与局部重绘")
+    p_repaint.add_argument("--seconds", type=float, default=60.0, help="回放的时长（秒）")
+    p_repaint.add_argument("--present", type=float, default=20.0, help="其中有人的时长（秒）")
+    p_repaint.add_argument("--tick-ms", type=int, default=200, help="检测结果间隔（毫秒）")
+    p_timers = sub.add_parser("timers", help="待机窗口每分钟的定时器唤醒次数：独立定时器与动画时钟")
+    p_timers.add_argument("--seconds", type=float, default=30.0)
+    p_timers.add_argument("--windows", type=int, default=3)
+    p_gif = sub.add_parser("gif", help="GIF 播放内存与帧时间抖动：QMovie(CacheAll) 与逐帧播放器")
+    p_gif.add_argument("--frames", type=int, default=121)
+    p_gif.add_argument("--plays", type=int, default=3)
+    p_gif.add_argument("--display", type=parse_size, default=(180, 180), help="窗口中的显示尺寸")
+    p_gif.add_argument("--busy-ms", type=float, default=0.0, help="每显示一帧占住 GUI 线程的毫秒数（模拟繁忙）")
+    p_reaction = sub.add_parser("reaction", help="检测到人→第一帧画到窗口上的耗时：不预热与预热开头几帧")
+    p_reaction.add_argument("--plays", type=int, default=20)
+    p_reaction.add_argument("--frames", type=int, default=121)
+    p_video = sub.add_parser("video", help="OpenCV 视频帧来源连播多遍的常驻内存")
+    p_video.add_argument("--plays", type=int, default=1000)
+    p_video.add_argument("--frames", type=int, default=12, help="测试视频帧数（60 fps）")
+    p_video.add_argument("--display", type=parse_size, default=(180, 180), help="窗口中的显示尺寸")
+    p_pack = sub.add_parser("framepack", help="帧包与 GIF：转换耗时、文件大小、加载耗时与播放内存")
+    p_pack.add_argument("--frames", type=int, default=121)
+    p_pack.add_argument("--plays", type=int, default=3)
+    p_worker = sub.add_parser("_gif-worker")  # 内部使用：在独立进程中测一种播放方式
+    p_worker.add_argument("mode", choices=("qmovie", "player", "framepack"))
+    p_worker.add_argument("gif")
+    p_worker.add_argument("--plays", type=int, default=3)
+    p_worker.add_argument("--display", type=parse_size, default=(180, 180))
+    p_worker.add_argument("--busy-ms", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    if args.command == "paint":
+        _print_paint_row(run_paint_bench(args.paints, args.avatar))
+    elif args.command == "repaint":
+        _print_repaint_row(run_repaint_bench(args.seconds, args.present, args.tick_ms))
+    elif args.command == "timers":
+        _print_timer_row(run_timer_bench(args.seconds, args.windows))
+    elif args.command == "gif":
+        _print_gif_row(run_gif_bench(args.frames, args.plays, args.display, args.busy_ms))
+    elif args.command == "reaction":
+        _print_reaction_row(run_reaction_bench(args.plays, args.frames))
+    elif args.command == "video":
+        _print_video_row(run_video_bench(args.plays, args.frames, args.display))
+    elif args.command == "framepack":
+        _print_framepack_row(run_framepack_bench(args.frames, args.plays))
+    elif args.command == "_gif-worker":
+        print(json.dumps(_gif_worker(args.mode, args.gif, args.display, args.plays, args.busy_ms)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
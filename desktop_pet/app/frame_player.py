@@ -0,0 +1,514 @@
+"""窗口内逐帧播放：后台线程按显示尺寸解码，只在字节预算内预读，显示过的帧随即丢弃。
+
+取代 QMovie(CacheAll)：QMovie 会把每一帧按原尺寸解码后常驻到窗口销毁；桌宠的动效每次检测只播一遍，
+播完后本播放器连同解码器一起释放，常驻内存只有预算内的几帧。
+帧按动画时钟（AnimationClock）调度，窗口在 paintEvent 中把 current 画到媒体区域。
+各帧的显示时刻按墙上时钟从第一帧起累计标称时长排定：机器忙、某帧没能按时显示时，
+已经错过整个显示时段的帧直接丢弃（frames_dropped），显示晚了超过半帧的记为 frames_late，一段动效总是按标称时长播完。
+空闲时 prewarm() 在后台先解码开头几帧（不超过 PLAYBACK_PREWARM_BYTES）常驻，play() 时第一帧当场就能画，
+解码线程从其后接着解码。预热还没做完就开始播放时，play() 只收下已解码的帧、不在 GUI 线程等预热线程，
+新的解码线程等预热线程退出（共用同一个来源）后再开始。
+帧来源有 GIF（GifFrameSource，QImageReader）、视频（VideoFrameSource，cv2.VideoCapture，解码器只在播放期间打开）
+与帧包（FramePackSource，映射文件零拷贝读取）。
+"""
+import sys
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional
+
+from PyQt6.QtCore import QObject, QSize, Qt, QThread, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader
+
+from desktop_pet.app.animation import AnimationClock, animation_clock
+from desktop_pet.app.framepack import FramePack, cover_resize, open_framepack
+from desktop_pet.config import PLAYBACK_DECODE_BUDGET_BYTES, PLAYBACK_PREWARM_BYTES
+
+# GIF 未写帧间隔时按 100 ms 播放（与浏览器一致）
+_DEFAULT_DELAY_MS = 100
+# 到点时下一帧还没解码好：隔多久再看一次
+_UNDERRUN_RETRY_MS = 4
+# 保留最近多少帧的调度误差样本
+_JITTER_SAMPLES = 1024
+
+
+@dataclass
+class Frame:
+    """一帧解码好的画面（已按显示尺寸缩放、预乘透明度）。"""
+    image: QImage
+    delay_ms: int  # 本帧显示时长
+    index: int
+
+    @property
+    def nbytes(self) -> int:
+        return self.image.sizeInBytes()
+
+
+class FrameSource:
+    """帧来源：open(size) 后依次 read() 出 Frame，读完返回 None；close() 释放解码器。
+
+    open / read / close 都在解码线程中调用；size 为目标物理像素尺寸，无效时保持原尺寸。
+    """
+
+    def open(self, size: QSize) -> bool:
+        raise NotImplementedError
+
+    def read(self) -> Optional[Frame]:
+        raise NotImplementedError
+
+    def skip(self, count: int) -> None:
+        """跳过接下来的 count 帧（默认逐帧解码后丢弃）。"""
+        for _ in range(count):
+            if self.read() is None:
+                return
+
+    def close(self) -> None:
+        pass
+
+
+class GifFrameSource(FrameSource):
+    """用 QImageReader 逐帧解码 GIF，解码时直接缩放到显示尺寸。"""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._reader: Optional[QImageReader] = None
+        self._index = 0
+
+    def open(self, size: QSize) -> bool:
+        self._reader = QImageReader(self.path)
+        if size.isValid() and not size.isEmpty():
+            self._reader.setScaledSize(size)
+        self._index = 0
+        return self._reader.canRead()
+
+    def read(self) -> Optional[Frame]:
+        if self._reader is None:
+            return None
+        image = self._reader.read()
+        if image.isNull():
+            return None
+        delay = self._reader.nextImageDelay()
+        image = image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+        frame = Frame(image, delay if delay > 0 else _DEFAULT_DELAY_MS, self._index)
+        self._index += 1
+        return frame
+
+    def close(self) -> None:
+        self._reader = None
+
+
+class VideoFrameSource(FrameSource):
+    """用 cv2.VideoCapture 在解码线程中逐帧解码视频（如即梦图生视频的 mp4），不经 QMediaPlayer、不必先转 GIF。
+
+    每帧按等比放大、居中裁剪铺满显示尺寸（与 QVideoWidget 的 KeepAspectRatioByExpanding 一致），
+    直接写入 QImage 的像素缓冲区；close() 释放 VideoCapture，每播一遍打开一次。
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._cap = None
+        self._size = QSize()
+        self._delay_ms = _DEFAULT_DELAY_MS
+        self._index = 0
+
+    def open(self, size: QSize) -> bool:
+        import cv2
+
+        self._cap = cv2.VideoCapture(self.path)
+        if not self._cap.isOpened():
+            self.close()
+            return False
+        fps = self._cap.get(cv2.CAP_PROP_FPS)
+        self._delay_ms = int(round(1000.0 / fps)) if fps and fps > 0 else _DEFAULT_DELAY_MS
+        self._size = QSize(size)
+        self._index = 0
+        return True
+
+    def read(self) -> Optional[Frame]:
+        import cv2
+        import numpy as np
+
+        if self._cap is None:
+            return None
+        ok, bgr = self._cap.read()
+        if not ok or bgr is None:
+            return None
+        h, w = bgr.shape[:2]
+        tw, th = (self._size.width(), self._size.height()) if self._size.isValid() and not self._size.isEmpty() else (w, h)
+        crop = cover_resize(bgr, (tw, th))
+        # 小端机器上 ARGB32 的内存顺序为 B, G, R, A：BGR 加不透明 alpha 直接写进 QImage，无需再转换
+        image = QImage(tw, th, QImage.Format.Format_ARGB32_Premultiplied)
+        bits = image.bits()
+        bits.setsize(image.sizeInBytes())
+        pixels = np.frombuffer(bits, np.uint8).reshape(th, image.bytesPerLine() // 4, 4)[:, :tw]
+        cv2.cvtColor(crop, cv2.COLOR_BGR2BGRA, dst=pixels)
+        frame = Frame(image, self._delay_ms, self._index)
+        self._index += 1
+        return frame
+
+    def skip(self, count: int) -> None:
+        """只 grab 不解出画面，跳过已预热的帧。"""
+        for _ in range(count):
+            if self._cap is None or not self._cap.grab():
+                return
+            self._index += 1
+
+    def close(self) -> None:
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+
+class FramePackSource(FrameSource):
+    """播放帧包（见 desktop_pet.app.framepack）：映射文件，未压缩的帧直接用映射内存构造 QImage，不解码也不拷贝。
+
+    跳帧只移动读取位置；帧包尺寸与显示尺寸不一致时（如换了头像）才按等比铺满、居中裁剪缩放，会拷贝一次。
+    映射在来源存续期间保留，close() 只让系统换出本遍读过的页面。
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._pack: Optional[FramePack] = None
+        self._size = QSize()
+        self._index = 0
+
+    def open(self, size: QSize) -> bool:
+        if self._pack is None:
+            self._pack = open_framepack(self.path)
+        self._size = QSize(size)
+        self._index = 0
+        return self._pack is not None
+
+    def read(self) -> Optional[Frame]:
+        pack = self._pack
+        if pack is None or self._index >= len(pack):
+            return None
+        data = pack.frame_data(self._index)
+        # QImage 引用 data（映射内存上的 memoryview 或解压出的 bytes），帧存续期间缓冲区不会被释放
+        image = QImage(data, pack.width, pack.height, pack.width * 4, QImage.Format.Format_ARGB32_Premultiplied)
+        if self._size.isValid() and not self._size.isEmpty() and image.size() != self._size:
+            # 与生成时一样等比放大、居中裁剪铺满，不拉伸
+            image = image.scaled(
+                self._size, Qt.AspectRatioMode.KeepAspectRatioByExpanding, Qt.TransformationMode.SmoothTransformation
+            )
+            x = (image.width() - self._size.width()) // 2
+            y = (image.height() - self._size.height()) // 2
+            image = image.copy(x, y, self._size.width(), self._size.height())
+        frame = Frame(image, pack.delay_ms(self._index), self._index)
+        self._index += 1
+        return frame
+
+    def skip(self, count: int) -> None:
+        self._index += count
+
+    def close(self) -> None:
+        if self._pack is not None:
+            self._pack.release_pages()
+
+
+class _FrameQueue:
+    """解码线程与 GUI 线程之间的预读队列：已缓冲字节数超过预算时解码线程等待（至少容纳一帧）。"""
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = max(0, int(budget_bytes))
+        self._frames: Deque[Frame] = deque()
+        self._bytes = 0
+        self._cond = threading.Condition()
+        self.closed = False  # 播放方不再需要（停止 / 播完）
+        self.done = False    # 解码方已读完或出错
+        self.peak_bytes = 0
+
+    def put(self, frame: Frame) -> bool:
+        """放入一帧，超出预算时等待；队列已关闭时返回 False。"""
+        with self._cond:
+            while not self.closed and self._frames and self._bytes + frame.nbytes > self.budget_bytes:
+                self._cond.wait()
+            if self.closed:
+                return False
+            self._frames.append(frame)
+            self._bytes += frame.nbytes
+            self.peak_bytes = max(self.peak_bytes, self._bytes)
+            return True
+
+    def offer(self, frame: Frame) -> bool:
+        """不等待地放入一帧；超出预算（且已有帧）时返回 False。"""
+        with self._cond:
+            if self.closed or (self._frames and self._bytes + frame.nbytes > self.budget_bytes):
+                return False
+            self._frames.append(frame)
+            self._bytes += frame.nbytes
+            self.peak_bytes = max(self.peak_bytes, self._bytes)
+            return True
+
+    def seed(self, frames: List[Frame]) -> None:
+        """预先放入已解码好的帧（预热帧），不受预算限制。"""
+        with self._cond:
+            self._frames.extend(frames)
+            self._bytes += sum(f.nbytes for f in frames)
+            self.peak_bytes = max(self.peak_bytes, self._bytes)
+
+    def drain(self) -> List[Frame]:
+        with self._cond:
+            frames = list(self._frames)
+            self._frames.clear()
+            self._bytes = 0
+            self._cond.notify_all()
+            return frames
+
+    def take(self) -> Optional[Frame]:
+        """取出下一帧（不等待）；还没解码好时返回 None。"""
+        with self._cond:
+            if not self._frames:
+                return None
+            frame = self._frames.popleft()
+            self._bytes -= frame.nbytes
+            self._cond.notify_all()
+            return frame
+
+    def exhausted(self) -> bool:
+        with self._cond:
+            return self.done and not self._frames
+
+    def finish(self) -> None:
+        with self._cond:
+            self.done = True
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        """丢弃已缓冲的帧并让解码线程退出。"""
+        with self._cond:
+            self.closed = True
+            self._frames.clear()
+            self._bytes = 0
+            self._cond.notify_all()
+
+
+class _DecodeThread(QThread):
+    """解码线程：打开来源，逐帧解码放入队列，读完或队列关闭后释放解码器。
+
+    skip：跳过开头已预热的帧；fill_only：只解码到队列预算装满为止（预热用），不等待；
+    after：仍在使用同一来源的线程（队列已关闭的预热线程），先在本线程里等它退出再打开来源。
+    """
+
+    def __init__(
+        self,
+        source: FrameSource,
+        size: QSize,
+        queue: _FrameQueue,
+        skip: int = 0,
+        fill_only: bool = False,
+        after: Optional[QThread] = None,
+    ):
+        super().__init__()
+        self._source = source
+        self._size = QSize(size)
+        self._queue = queue
+        self._skip = skip
+        self._fill_only = fill_only
+        self._after = after
+
+    def run(self) -> None:
+        try:
+            if self._after is not None:
+                self._after.wait()
+                self._after = None
+            if not self._source.open(self._size):
+                return
+            self._source.skip(self._skip)
+            while not self._queue.closed:
+                frame = self._source.read()
+                if frame is None:
+                    break
+                if not (self._queue.offer(frame) if self._fill_only else self._queue.put(frame)):
+                    break
+        except Exception as e:
+            print(f"[桌宠-播放] 解码失败: {e}", file=sys.stderr, flush=True)
+        finally:
+            try:
+                self._source.close()
+            finally:
+                self._queue.finish()
+
+
+class FramePlayer(QObject):
+    """播一遍帧来源：play() 开始，播完发 finished 并释放全部帧；current 为当前应显示的帧。"""
+    frameChanged = pyqtSignal()
+    finished = pyqtSignal()
+
+    def __init__(
+        self,
+        source: FrameSource,
+        budget_bytes: int = PLAYBACK_DECODE_BUDGET_BYTES,
+        clock: Optional[AnimationClock] = None,
+        parent: Optional[QObject] = None,
+        prewarm_bytes: int = PLAYBACK_PREWARM_BYTES,
+    ):
+        super().__init__(parent)
+        self._source = source
+        self.budget_bytes = budget_bytes
+        self.prewarm_bytes = prewarm_bytes
+        self._warm: List[Frame] = []  # 预热好的开头几帧，跨多次播放常驻
+        self._warm_queue: Optional[_FrameQueue] = None
+        self._warm_thread: Optional[_DecodeThread] = None
+        self._clock = clock or animation_clock()
+        self._size = QSize()
+        self._dpr = 1.0
+        self._queue: Optional[_FrameQueue] = None
+        self._thread: Optional[_DecodeThread] = None
+        self._task: Optional[int] = None
+        self._due = 0.0  # 下一帧按墙上时钟应显示的时刻（第一帧到来前无意义）
+        self._started = False
+        self.current: Optional[Frame] = None
+        # 统计：播放次数、显示 / 丢弃 / 显示晚了的帧数、到点未解码好的次数、预读峰值字节数、调度误差（毫秒）
+        self.plays = 0
+        self.frames_shown = 0
+        self.frames_dropped = 0
+        self.frames_late = 0
+        self.underruns = 0
+        self.peak_buffered_bytes = 0
+        self._jitter_ms: Deque[float] = deque(maxlen=_JITTER_SAMPLES)
+
+    @property
+    def source(self) -> FrameSource:
+        return self._source
+
+    def set_source(self, source: FrameSource) -> None:
+        self.stop()
+        self._drop_warm()
+        self._source = source
+
+    def set_size(self, size: QSize, dpr: float = 1.0) -> None:
+        """目标显示尺寸（逻辑像素）与设备像素比；下一次播放起生效，尺寸变化时预热帧作废。"""
+        if QSize(size) == self._size and float(dpr) == self._dpr:
+            return
+        self._drop_warm()
+        self._size = QSize(size)
+        self._dpr = float(dpr)
+
+    def _pixel_size(self) -> QSize:
+        return QSize(int(round(self._size.width() * self._dpr)), int(round(self._size.height() * self._dpr)))
+
+    def is_playing(self) -> bool:
+        return self._queue is not None
+
+    @property
+    def warm_frames(self) -> int:
+        return len(self._warm)
+
+    def prewarm(self) -> None:
+        """空闲时在后台解码开头几帧（不超过 prewarm_bytes）；已预热或正在预热时忽略。"""
+        if self.prewarm_bytes <= 0 or self._warm or self._warm_thread is not None or self.is_playing():
+            return
+        self._warm_queue = _FrameQueue(self.prewarm_bytes)
+        thread = self._warm_thread = _DecodeThread(self._source, self._pixel_size(), self._warm_queue, fill_only=True)
+        # 绑定发出信号的线程：排队送达的旧线程 finished 不会收走（并等待）之后新开的预热线程
+        thread.finished.connect(lambda t=thread: self._collect_warm(t))
+        thread.start()
+
+    def _collect_warm(self, finished: Optional[_DecodeThread] = None) -> None:
+        """预热线程结束（finished 为该线程）或需要立即用到预热帧（不传）：收下当前预热线程已解码的帧。"""
+        thread, queue = self._warm_thread, self._warm_queue
+        if thread is None or (finished is not None and finished is not thread):
+            return
+        thread.wait()
+        self._warm_thread = self._warm_queue = None
+        self._warm = queue.drain()
+
+    def _take_warm(self) -> Optional[_DecodeThread]:
+        """收下预热队列里已解码的帧并关闭队列，不等预热线程；返回它（读完手上这一帧即退出），没有时返回 None。"""
+        thread, queue = self._warm_thread, self._warm_queue
+        if thread is None:
+            return None
+        self._warm_thread = self._warm_queue = None
+        self._warm = queue.drain()
+        queue.close()
+        return thread
+
+    def _drop_warm(self) -> None:
+        if self._warm_queue is not None:
+            self._warm_queue.close()
+        self._collect_warm()
+        self._warm = []
+
+    def play(self) -> None:
+        """开始播一遍；有预热帧时第一帧当场显示（frameChanged 在返回前发出）。"""
+        if self.is_playing():
+            return
+        warming = self._take_warm()
+        self.plays += 1
+        self._queue = _FrameQueue(self.budget_bytes)
+        self._queue.seed(self._warm)
+        self._thread = _DecodeThread(self._source, self._pixel_size(), self._queue, skip=len(self._warm), after=warming)
+        self._thread.start()
+        self._started = False
+        if self._warm:
+            self._tick()
+        else:
+            self._task = self._clock.call_later(0, self._tick, owner=id(self))
+
+    def stop(self) -> None:
+        """停止播放：取消调度、丢弃全部帧、等解码线程释放解码器。"""
+        self._clock.cancel(self._task)
+        self._task = None
+        if self._queue is not None:
+            self.peak_buffered_bytes = max(self.peak_buffered_bytes, self._queue.peak_bytes)
+            self._queue.close()
+        if self._thread is not None:
+            self._thread.wait()
+        self._queue = None
+        self._thread = None
+        self.current = None
+
+    def _tick(self) -> None:
+        self._task = None
+        queue = self._queue
+        if queue is None:
+            return
+        now = self._clock.now()
+        while True:
+            frame = queue.take()
+            if frame is None:
+                if queue.exhausted():
+                    self.stop()
+                    self.finished.emit()
+                    return
+                self.underruns += 1
+                self._task = self._clock.call_later(_UNDERRUN_RETRY_MS, self._tick, owner=id(self))
+                return
+            if not self._started:
+                # 从第一帧真正可显示的时刻起排定整段时间表
+                self._started = True
+                self._due = now
+            end = self._due + frame.delay_ms / 1000.0
+            if end > now:
+                break
+            # 整个显示时段都已错过：丢弃，看下一帧
+            self.frames_dropped += 1
+            self._due = end
+        lateness_ms = (now - self._due) * 1000.0
+        self._jitter_ms.append(lateness_ms)
+        if lateness_ms > frame.delay_ms / 2.0:
+            self.frames_late += 1
+        if frame.image.devicePixelRatio() != self._dpr:
+            frame.image.setDevicePixelRatio(self._dpr)
+        self.current = frame
+        self.frames_shown += 1
+        self.frameChanged.emit()
+        # 下一帧在本帧标称时段结束时显示，与本帧实际何时显示无关
+        self._due = end
+        self._task = self._clock.call_at(end, self._tick, owner=id(self))
+
+    def stats(self) -> dict:
+        samples = sorted(self._jitter_ms)
+        peak = max(self.peak_buffered_bytes, self._queue.peak_bytes if self._queue is not None else 0)
+        return {
+            "plays": self.plays,
+            "frames_shown": self.frames_shown,
+            "frames_dropped": self.frames_dropped,
+            "frames_late": self.frames_late,
+            "underruns": self.underruns,
+            "peak_buffered_bytes": peak,
+            "warm_frames": len(self._warm),
+            "jitter_p50_ms": samples[len(samples) // 2] if samples else 0.0,
+            "jitter_max_ms": samples[-1] if samples else 0.0,
+        }
@@ -0,0 +1,152 @@
+"""帧包（framepack）：按桌宠窗口尺寸预先缩放好的逐帧像素，供窗口内播放器映射（mmap）后零拷贝读取。
+
+文件布局（小端）：
+    MAGIC（8 字节）| 文件头 HEADER_DTYPE | 各帧像素（每帧起点按 FRAME_ALIGN 对齐）| 帧索引 INDEX_DTYPE × 帧数
+像素为预乘透明度的 B, G, R, A 字节序，即小端机器上 QImage.Format_ARGB32_Premultiplied 的内存布局，
+每行 宽×4 字节、无填充；FLAG_ZLIB 时每帧单独用 zlib（低压缩级别）压缩。
+帧索引放在文件末尾，写入时不必预先知道帧数；文件头记录索引的位置。
+"""
+import mmap
+import os
+import zlib
+from pathlib import Path
+from typing import Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+# 文件头：格式标识与版本，布局变化时更换
+MAGIC = b"DPFPK001"
+HEADER_DTYPE = np.dtype([
+    ("width", "<u4"),
+    ("height", "<u4"),
+    ("frames", "<u4"),
+    ("flags", "<u4"),
+    ("index_offset", "<u8"),
+])
+# 帧索引：像素数据在文件中的位置、字节数（压缩后）、显示时长（毫秒）
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("size", "<u4"), ("delay_ms", "<u4")])
+FLAG_ZLIB = 1
+# 每帧起点对齐到缓存行，映射后可直接作为 QImage 的像素缓冲区
+FRAME_ALIGN = 64
+SUFFIX = ".framepack"
+# zlib 压缩级别：解码快、压缩率够用
+_ZLIB_LEVEL = 1
+
+
+def cover_resize(bgr: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    """等比放大、居中裁剪铺满 size=(宽, 高)（与 QVideoWidget 的 KeepAspectRatioByExpanding 一致）：先裁再一次缩放。"""
+    import cv2
+
+    h, w = bgr.shape[:2]
+    tw, th = size
+    scale = max(tw / w, th / h)
+    cw, ch = min(w, int(round(tw / scale))), min(h, int(round(th / scale)))
+    x, y = (w - cw) // 2, (h - ch) // 2
+    crop = bgr[y:y + ch, x:x + cw]
+    if (cw, ch) != (tw, th):
+        crop = cv2.resize(crop, (tw, th), interpolation=cv2.INTER_AREA)
+    return crop
+
+
+def write_framepack(
+    path: Union[str, Path],
+    frames: Iterable[Tuple[np.ndarray, int]],
+    size: Tuple[int, int],
+    compress: bool = False,
+) -> int:
+    """把 (BGR 或 BGRA 画面, 显示时长毫秒) 逐帧写成帧包，画面按 size 铺满缩放；返回帧数。
+
+    先写到同目录的临时文件再替换，正在映射旧文件的播放器不受影响。
+    """
+    import cv2
+
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    width, height = size
+    index = []
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.zeros(1, HEADER_DTYPE).tobytes())  # 占位，写完帧后回填
+        for image, delay_ms in frames:
+            image = cover_resize(image, size)
+            if image.shape[2] == 3:
+                image = cv2.cvtColor(image, cv2.COLOR_BGR2BGRA)
+            else:
+                # BGRA 转为预乘透明度
+                alpha = image[..., 3:4].astype(np.uint16)
+                image = np.concatenate([(image[..., :3] * alpha // 255).astype(np.uint8), image[..., 3:4]], axis=2)
+            data = np.ascontiguousarray(image).tobytes()
+            if compress:
+                data = zlib.compress(data, _ZLIB_LEVEL)
+            f.write(b"\0" * (-f.tell() % FRAME_ALIGN))
+            index.append((f.tell(), len(data), max(1, int(delay_ms))))
+            f.write(data)
+        index_offset = f.tell()
+        f.write(np.array(index, INDEX_DTYPE).tobytes())
+        header = np.array([(width, height, len(index), FLAG_ZLIB if compress else 0, index_offset)], HEADER_DTYPE)
+        f.seek(len(MAGIC))
+        f.write(header.tobytes())
+    os.replace(tmp, path)
+    return len(index)
+
+
+class FramePack:
+    """只读映射的帧包：frame_data(i) 对未压缩的帧返回映射内存上的 memoryview（不拷贝）。
+
+    映射随对象释放；仍有帧引用映射内存时不会被提前解除映射。
+    """
+
+    def __init__(self, mm: mmap.mmap, header: np.void, index: np.ndarray):
+        self._mm = mm
+        self.width = int(header["width"])
+        self.height = int(header["height"])
+        self.compressed = bool(int(header["flags"]) & FLAG_ZLIB)
+        self.index = index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.width * self.height * 4
+
+    def delay_ms(self, i: int) -> int:
+        return int(self.index[i]["delay_ms"])
+
+    def frame_data(self, i: int) -> Union[memoryview, bytes]:
+        offset, size = int(self.index[i]["offset"]), int(self.index[i]["size"])
+        view = memoryview(self._mm)[offset:offset + size]
+        return zlib.decompress(view) if self.compressed else view
+
+    def release_pages(self) -> None:
+        """告诉系统可以把已读过的页面换出（只读文件映射，再次读取时从页缓存换入，内容不变）。"""
+        if hasattr(self._mm, "madvise") and hasattr(mmap, "MADV_DONTNEED"):
+            try:
+                self._mm.madvise(mmap.MADV_DONTNEED)
+            except OSError:
+                pass
+
+
+def open_framepack(path: Union[str, Path]) -> Optional[FramePack]:
+    """映射帧包；文件不存在、格式不符或索引越界时返回 None。"""
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        header = np.frombuffer(mm, HEADER_DTYPE, 1, len(MAGIC))[0].copy()
+        count, index_offset = int(header["frames"]), int(header["index_offset"])
+        if index_offset + count * INDEX_DTYPE.itemsize > len(mm):
+            return None
+        index = np.frombuffer(mm, INDEX_DTYPE, count, index_offset).copy()
+        if count and int((index["offset"] + index["size"]).max()) > index_offset:
+            return None
+        pack = FramePack(mm, header, index)
+        if not pack.compressed and count and (index["size"] != pack.frame_bytes).any():
+            return None
+        return pack
+    except ValueError:
+        return None
@@ -0,0 +1,91 @@
+"""缩放后头像的缓存：按 (源路径, 修改时间, 内容区, 设备像素比) 缓存缩放结果及其在窗口中的绘制区域。
+
+原图只在未命中时解码一次并缩放到内容区大小（按设备像素比取物理像素），之后绘制只是一次 drawPixmap；
+全尺寸原图不常驻内存。无法解码的文件也按修改时间缓存（结果为 None）：同一版本不反复解码，
+文件被重写（修改时间变化）后自动重试。进程内所有桌宠窗口共用 SCALED_AVATARS。
+"""
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from PyQt6.QtCore import QRect, Qt
+from PyQt6.QtGui import QImage, QPixmap
+
+# (路径, 修改时间 ns, 内容区 x, y, w, h, 设备像素比)
+_Key = Tuple[str, int, int, int, int, int, float]
+
+
+@dataclass(frozen=True)
+class ScaledPixmap:
+    """缩放好的头像与其绘制区域。"""
+    pixmap: QPixmap  # 物理像素尺寸，已设置 devicePixelRatio
+    rect: QRect      # 窗口中的绘制区域（逻辑像素），在内容区内等比居中
+    dpr: float
+
+
+class ScaledPixmapCache:
+    """头像缩放结果的 LRU 缓存；源文件修改时间变化即视为新图。解码失败也缓存，直到文件被修改。"""
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[_Key, Optional[ScaledPixmap]]" = OrderedDict()
+        # 统计：命中 / 未命中次数与缩放累计耗时
+        self.hits = 0
+        self.misses = 0
+        self._scale_total_s = 0.0
+
+    def get(self, path: str, content: QRect, dpr: float = 1.0) -> Optional[ScaledPixmap]:
+        """返回 path 等比缩放进 content 的结果；文件不存在或（当前版本）无法解码时返回 None。"""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        key = (str(path), mtime, content.x(), content.y(), content.width(), content.height(), float(dpr))
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        start = time.perf_counter()
+        entry = self._scale(str(path), content, float(dpr))
+        self._scale_total_s += time.perf_counter() - start
+        self.misses += 1
+        self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def _scale(path: str, content: QRect, dpr: float) -> Optional[ScaledPixmap]:
+        image = QImage(path)
+        if image.isNull() or content.isEmpty():
+            return None
+        image = image.scaled(
+            int(round(content.width() * dpr)),
+            int(round(content.height() * dpr)),
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation,
+        )
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(dpr)
+        w = int(round(pixmap.width() / dpr))
+        h = int(round(pixmap.height() / dpr))
+        x = content.x() + (content.width() - w) // 2
+        y = content.y() + (content.height() - h) // 2
+        return ScaledPixmap(pixmap, QRect(x, y, w, h), dpr)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "avatar_cache_entries": len(self._entries),
+            "avatar_cache_hits": self.hits,
+            "avatar_cache_misses": self.misses,
+            "avatar_scale_ms": self._scale_total_s * 1000.0 / self.misses if self.misses else 0.0,
+        }
+
+
+# 进程内共用：多个窗口显示同一头像时只缩放一次
+SCALED_AVATARS = ScaledPixmapCache()
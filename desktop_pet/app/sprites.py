@@ -0,0 +1,183 @@
+"""内置几何形象的预渲染精灵：身体与各外观的眼睛只在首次用到某个尺寸 / 设备像素比时画一次。
+
+窗口绘制时只贴图：身体一张整窗图，眼睛一张「眼睛带」小图（按视线偏移贴到身体上）。
+缓存由进程内所有桌宠窗口共用（SPRITES）。局部重绘时用 blit() 只贴与重绘区域相交的部分。
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Tuple, Union
+
+from PyQt6.QtCore import QPoint, QRect, QRectF, QSize, Qt
+from PyQt6.QtGui import QBrush, QColor, QImage, QPainter, QPen, QPixmap
+
+from desktop_pet.app.pet_actor import PetState
+
+# 几何形象的布局（窗口逻辑坐标，按 200×200 窗口设计）
+BODY_RECT = QRect(15, 35, 170, 115)
+EYE_CENTERS = ((72, 72), (122, 72))
+EYE_RADIUS = 11
+# 眼睛带：两只眼睛（含描边）的包围盒，眨眼 / 变亮只影响这一块
+_EYE_PAD = 2
+EYE_BAND = QRect(
+    EYE_CENTERS[0][0] - EYE_RADIUS - _EYE_PAD,
+    EYE_CENTERS[0][1] - EYE_RADIUS - _EYE_PAD,
+    EYE_CENTERS[1][0] - EYE_CENTERS[0][0] + 2 * (EYE_RADIUS + _EYE_PAD),
+    2 * (EYE_RADIUS + _EYE_PAD),
+)
+# 有头像时「眼睛一亮」叠加的高光椭圆（相对窗口水平居中）
+HIGHLIGHT_SIZE = QSize(50, 30)
+HIGHLIGHT_TOP = 30
+
+
+class Appearance(str, Enum):
+    """几何形象的外观（决定眼睛画法）。"""
+    IDLE = "idle"                # 睁眼
+    EYES_CLOSED = "eyes_closed"  # 眨眼（闭眼）
+    EYES_LIT = "eyes_lit"        # 眼睛一亮
+    DRAGGED = "dragged"          # 被拖拽：目前与待机同样的眼睛，共用一张图
+
+
+def appearance_for(state: PetState, eyes_closed: bool) -> Appearance:
+    if eyes_closed:
+        return Appearance.EYES_CLOSED
+    if state == PetState.EYES_LIT:
+        return Appearance.EYES_LIT
+    if state == PetState.DRAGGED:
+        return Appearance.DRAGGED
+    return Appearance.IDLE
+
+
+def highlight_rect(width: int) -> QRect:
+    return QRect(width // 2 - HIGHLIGHT_SIZE.width() // 2, HIGHLIGHT_TOP, HIGHLIGHT_SIZE.width(), HIGHLIGHT_SIZE.height())
+
+
+@dataclass(frozen=True)
+class GeometricSprites:
+    """某一尺寸 / 设备像素比下的全部精灵。"""
+    body: QPixmap                      # 整窗大小，透明底上的身体
+    eyes: Dict[Appearance, QPixmap]    # 眼睛带大小，贴在 EYE_BAND 位置（加视线偏移）
+    highlight: QPixmap                 # 头像上的眼睛一亮高光，贴在 highlight_rect() 位置
+
+
+def _canvas(width: int, height: int, dpr: float) -> QPixmap:
+    pixmap = QPixmap(int(round(width * dpr)), int(round(height * dpr)))
+    pixmap.setDevicePixelRatio(dpr)
+    pixmap.fill(Qt.GlobalColor.transparent)
+    return pixmap
+
+
+def _painter(pixmap: QPixmap) -> QPainter:
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    return painter
+
+
+def _render_body(size: QSize, dpr: float) -> QPixmap:
+    pixmap = _canvas(size.width(), size.height(), dpr)
+    painter = _painter(pixmap)
+    painter.setBrush(QBrush(QColor(255, 200, 160, 220)))
+    painter.setPen(QPen(QColor(255, 180, 140), 1))
+    painter.drawEllipse(BODY_RECT)
+    painter.end()
+    return pixmap
+
+
+def _render_eyes(appearance: Appearance, dpr: float) -> QPixmap:
+    pixmap = _canvas(EYE_BAND.width(), EYE_BAND.height(), dpr)
+    painter = _painter(pixmap)
+    painter.translate(-EYE_BAND.x(), -EYE_BAND.y())
+    r = EYE_RADIUS
+    if appearance == Appearance.EYES_CLOSED:
+        painter.setPen(QPen(QColor(80, 60, 40), 2))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        for x, y in EYE_CENTERS:
+            painter.drawLine(x - r, y, x + r, y)
+    else:
+        lit = appearance == Appearance.EYES_LIT
+        if lit:
+            painter.setBrush(QBrush(QColor(255, 255, 150)))
+            painter.setPen(QPen(QColor(255, 220, 80), 2))
+        else:
+            painter.setBrush(QBrush(QColor(60, 60, 80)))
+            painter.setPen(Qt.PenStyle.NoPen)
+        for x, y in EYE_CENTERS:
+            painter.drawEllipse(x - r, y - r, r * 2, r * 2)
+        if lit:
+            painter.setBrush(QBrush(QColor(255, 255, 255)))
+            for x, y in EYE_CENTERS:
+                painter.drawEllipse(x - 3, y - 5, 6, 6)
+    painter.end()
+    return pixmap
+
+
+def _render_highlight(dpr: float) -> QPixmap:
+    pixmap = _canvas(HIGHLIGHT_SIZE.width(), HIGHLIGHT_SIZE.height(), dpr)
+    painter = _painter(pixmap)
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(QBrush(QColor(255, 255, 200, 120)))
+    painter.drawEllipse(0, 0, HIGHLIGHT_SIZE.width(), HIGHLIGHT_SIZE.height())
+    painter.end()
+    return pixmap
+
+
+class SpriteCache:
+    """按 (宽, 高, 设备像素比) 缓存 GeometricSprites；只保留最近用过的几组。"""
+
+    def __init__(self, max_entries: int = 4):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Tuple[int, int, float], GeometricSprites]" = OrderedDict()
+        self.renders = 0  # 实际渲染的组数
+
+    def get(self, size: QSize, dpr: float = 1.0) -> GeometricSprites:
+        key = (size.width(), size.height(), float(dpr))
+        sprites = self._entries.get(key)
+        if sprites is not None:
+            self._entries.move_to_end(key)
+            return sprites
+        idle = _render_eyes(Appearance.IDLE, dpr)
+        sprites = GeometricSprites(
+            body=_render_body(size, dpr),
+            eyes={
+                Appearance.IDLE: idle,
+                Appearance.DRAGGED: idle,
+                Appearance.EYES_CLOSED: _render_eyes(Appearance.EYES_CLOSED, dpr),
+                Appearance.EYES_LIT: _render_eyes(Appearance.EYES_LIT, dpr),
+            },
+            highlight=_render_highlight(dpr),
+        )
+        self.renders += 1
+        self._entries[key] = sprites
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return sprites
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def eye_origin(gaze_offset: Tuple[int, int]) -> QPoint:
+    """眼睛带按视线偏移后的左上角。"""
+    return QPoint(EYE_BAND.x() + gaze_offset[0], EYE_BAND.y() + gaze_offset[1])
+
+
+def blit(painter: QPainter, dirty: QRect, top_left: QPoint, pixmap: Union[QPixmap, QImage]) -> None:
+    """把 pixmap（或 QImage，如播放中的帧）贴到 top_left（逻辑坐标），只贴与 dirty 相交的部分。"""
+    target = QRect(top_left, pixmap.deviceIndependentSize().toSize()).intersected(dirty)
+    if target.isEmpty():
+        return
+    dpr = pixmap.devicePixelRatio()
+    source = QRectF(
+        (target.x() - top_left.x()) * dpr,
+        (target.y() - top_left.y()) * dpr,
+        target.width() * dpr,
+        target.height() * dpr,
+    )
+    if isinstance(pixmap, QImage):
+        painter.drawImage(QRectF(target), pixmap, source)
+    else:
+        painter.drawPixmap(QRectF(target), pixmap, source)
+
+
+# 进程内所有桌宠窗口共用
+SPRITES = SpriteCache()
@@ -1,26 +1,49 @@
 """桌宠常驻窗口：置顶、可拖拽、可爱动效（头像/眨眼）；支持内嵌即梦短视频。"""
+import time
+from collections import deque
+from functools import partial
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Optional, Tuple
 
-from PyQt6.QtCore import QPoint, Qt, QTimer, pyqtSignal, QUrl
-from PyQt6.QtGui import QColor, QPainter, QPen, QBrush, QPixmap, QMovie
-from PyQt6.QtWidgets import QApplication, QWidget, QPushButton, QMessageBox, QLabel
+from PyQt6.QtCore import QEvent, QPoint, QRect, Qt, pyqtSignal, QUrl
+from PyQt6.QtGui import QPainter
+from PyQt6.QtWidgets import QApplication, QWidget, QPushButton, QMessageBox
 
 from desktop_pet.config import (
     WINDOW_ALWAYS_ON_TOP,
+    WINDOW_CONTENT_MARGIN,
     WINDOW_FRAMELESS,
     WINDOW_HEIGHT,
+    WINDOW_PARTIAL_REPAINT,
     WINDOW_WIDTH,
     VIDEOS_DIR,
     JIMENG_ACCESS_KEY,
     JIMENG_SECRET_KEY,
+    USE_FRAMEPACK_PLAYBACK,
     USE_GIF_PLAYBACK,
+    USE_OPENCV_PLAYBACK,
     ensure_dirs,
 )
+from desktop_pet.app.animation import animation_clock
+from desktop_pet.app.frame_player import FramePackSource, FramePlayer, FrameSource, GifFrameSource, VideoFrameSource
 from desktop_pet.app.pet_actor import PetState, next_state_on_detection
-
-# 头像/视频共用：内容区边距，保证图片与视频同一区域、同一比例
-CONTENT_MARGIN = 10
+from desktop_pet.app.pixmap_cache import SCALED_AVATARS, ScaledPixmap
+from desktop_pet.app.sprites import EYE_BAND, SPRITES, Appearance, appearance_for, blit, eye_origin, highlight_rect
+
+# 几何形象「看向」运动方向时眼睛的最大偏移（像素）与触发重绘的最小变化
+GAZE_MAX_OFFSET = 5
+GAZE_MIN_CHANGE = 0.05
+# 动画时钟上的任务（毫秒）：眨眼周期与闭眼时长、眼睛一亮渐显、视频路径轮询；
+# 容忍延后越大越容易与其它窗口 / 任务合并成一次唤醒
+BLINK_INTERVAL_MS = 3000
+BLINK_TOLERANCE_MS = 500
+BLINK_CLOSED_MS = 120
+EYES_LIT_FADE_MS = 150
+FADE_FRAME_MS = 30
+VIDEO_POLL_MS = 2000
+VIDEO_POLL_TOLERANCE_MS = 2000
+# 保留最近多少次「检测→第一帧」耗时样本
+REACTION_SAMPLES = 256
 
 # 可选：视频内嵌播放（即梦图生视频）
 try:
@@ -56,18 +79,21 @@ except Exception:
     _HAS_I2V = False
     I2VWorker = None
 
-# 可选：已有视频转 GIF Worker
+# 可选：已有视频转 GIF / 帧包 Worker
 try:
-    from desktop_pet.jimeng.video_to_gif import VideoToGifWorker
+    from desktop_pet.jimeng.video_to_gif import VideoToGifWorker, video_path_to_framepack_path
     _HAS_VIDEO_TO_GIF = True
 except Exception:
     _HAS_VIDEO_TO_GIF = False
     VideoToGifWorker = None
+    video_path_to_framepack_path = None
 
 
 class PetWindow(QWidget):
     """桌面宠物窗口：无边框、置顶、可拖拽；支持头像图；待机眨眼与轻微弹跳。"""
     returnToWelcomeRequested = pyqtSignal()
+    visibilityChanged = pyqtSignal(bool)  # 窗口能否被看到（显示 / 隐藏、最小化、被完全遮挡），供摄像头流水线降频与释放设备
+    partial_repaint = WINDOW_PARTIAL_REPAINT  # False 时动效照旧整窗重绘（基准测试对照用）
 
     def __init__(
         self,
@@ -90,29 +116,44 @@ class PetWindow(QWidget):
         self._user_id = user_id
         self._pet = pet
         self._profile_store = profile_store
-        self._avatar: Optional[QPixmap] = None
+        # 头像只记路径：缩放结果与绘制区域由 SCALED_AVATARS 缓存，本窗口记住当前条目直到换图或尺寸变化
+        self._avatar_path: Optional[str] = None
+        self._avatar_entry: Optional[ScaledPixmap] = None
+        self._avatar_failed = False  # 上次取头像时无法解码（当次绘制退回了几何形象）
         if avatar_path and Path(avatar_path).exists():
-            self._avatar = QPixmap(avatar_path)
-            if self._avatar.isNull():
-                self._avatar = None
+            self._avatar_path = str(avatar_path)
         self._eyes_closed = False
+        self._gaze = (0.0, 0.0)  # 视线方向，-1~1（右、下为正）
+        self._lit_alpha = 1.0  # 眼睛一亮的渐显进度 0~1
+        self._lit_fade_start = 0.0
+        # 动画任务都挂在进程共用的动画时钟上，窗口销毁时一并取消
+        self._clock = animation_clock()
+        self._blink_task: Optional[int] = None
+        self._fade_task: Optional[int] = None
+        self._video_poll_task: Optional[int] = None
+        self._video_poll_wanted = False  # 等待图生视频写入 video_path；窗口看得见时才轮询
+        self.destroyed.connect(partial(self._clock.cancel_owner, id(self)))
+        # 看不见（隐藏、最小化、被完全遮挡）时暂停眨眼、轮询与播放，重新看得见时从当前状态继续
+        self._seen = False
+        self._expose_watched = False
+        self.pauses = 0
+        self.painted_pixels = 0  # paintEvent 累计重绘的像素数（逻辑像素）
         self._last_pet_detected = False  # 用于「人刚出现」时播视频，避免人一直在就反复播导致内存泄漏
         self._video_widget: Optional[QWidget] = None
         self._media_player = None
-        self._gif_label: Optional[QLabel] = None
-        self._gif_movie: Optional[QMovie] = None
-        self._use_gif = False  # True=用 GIF 播放，False=用视频
+        self._frame_player: Optional[FramePlayer] = None
+        # 检测到人→第一帧画到窗口上的耗时（毫秒）
+        self._reaction_started: Optional[float] = None
+        self._reaction_ms = deque(maxlen=REACTION_SAMPLES)
+        self._use_player = False  # True=窗口内逐帧播放（GIF 或 OpenCV 解码视频），False=用 QMediaPlayer
         self.setup_ui()
         # 若有宠物且已有视频/GIF 路径，直接内嵌播放；否则启动轮询（i2v 完成后会写入 pet.video_path）
         video_path = getattr(pet, "video_path", None) if pet else None
         gif_path = getattr(pet, "gif_path", None) if pet else None
         if video_path and Path(str(video_path)).exists():
             self._setup_media(str(video_path), gif_path)
-        elif (_HAS_VIDEO or USE_GIF_PLAYBACK) and pet:
-            self._video_poll_timer = QTimer(self)
-            self._video_poll_timer.timeout.connect(self._check_pet_video_path)
-            self._video_poll_timer.start(2000)
-        self._start_idle_animations()
+        elif (_HAS_VIDEO or USE_GIF_PLAYBACK or USE_OPENCV_PLAYBACK or USE_FRAMEPACK_PLAYBACK) and pet:
+            self._video_poll_wanted = True  # 轮询任务在窗口看得见时挂到时钟上（见 _resume）
 
     def setup_ui(self) -> None:
         self.setWindowTitle("桌宠")
@@ -164,16 +205,15 @@ class PetWindow(QWidget):
         path = str(path).strip()
         if not path or not Path(path).exists():
             return
-        self._avatar = QPixmap(path)
-        if self._avatar.isNull():
-            self._avatar = None
+        self._avatar_path = path
+        self._avatar_entry = None
         self._update_video_widget_geometry()
-        self._update_gif_widget_geometry()
+        self._update_player_frame_size()
         self.update()
         self.repaint()
 
     def set_video_path(self, video_path: str, gif_path: Optional[str] = None) -> None:
-        """设置即梦短视频/GIF（图生视频完成后由弹窗或轮询调用）。优先用 GIF 若 USE_GIF_PLAYBACK。"""
+        """设置即梦短视频/GIF（图生视频完成后由弹窗或轮询调用）。播放方式见 _frame_source。"""
         video_path = str(video_path).strip()
         if not video_path or not Path(video_path).exists():
             return
@@ -186,12 +226,10 @@ class PetWindow(QWidget):
             if self._profile_store:
                 self._profile_store.save(self._pet)
         # 已有控件时只更新源与尺寸；强制重新加载以支持同路径覆盖后的新内容
-        if self._use_gif and self._gif_label is not None and self._gif_movie is not None and gif_path:
-            self._gif_movie.stop()
-            self._gif_movie.setFileName("")
-            self._gif_movie.setFileName(gif_path)
-            self._update_gif_widget_geometry()
-            self._gif_label.hide()
+        source = self._frame_source(video_path, gif_path)
+        if self._use_player and self._frame_player is not None and source is not None:
+            self._frame_player.set_source(source)
+            self._frame_player.prewarm()
             self.update()
             return
         if self._video_widget is not None and self._media_player is not None:
@@ -203,75 +241,124 @@ class PetWindow(QWidget):
             return
         self._setup_media(video_path, gif_path)
 
-    def _setup_media(self, video_path: str, gif_path: Optional[str] = None) -> None:
-        """根据配置选择 GIF 或视频播放。USE_GIF_PLAYBACK 且 gif 存在时用 GIF，否则用视频。"""
+    @staticmethod
+    def _frame_source(video_path: str, gif_path: Optional[str] = None) -> Optional[FrameSource]:
+        """窗口内逐帧播放的帧来源：USE_OPENCV_PLAYBACK 时直接解码视频；否则 USE_FRAMEPACK_PLAYBACK 且视频的帧包存在时用帧包，
+        USE_GIF_PLAYBACK 且 gif 存在时用 GIF；都不满足时返回 None（用 QMediaPlayer）。"""
+        if USE_OPENCV_PLAYBACK:
+            return VideoFrameSource(str(video_path))
+        if USE_FRAMEPACK_PLAYBACK and video_path_to_framepack_path is not None:
+            pack_path = video_path_to_framepack_path(video_path)
+            if pack_path.exists():
+                return FramePackSource(str(pack_path))
         if USE_GIF_PLAYBACK and gif_path and Path(str(gif_path)).exists():
-            self._setup_gif(str(gif_path))
+            return GifFrameSource(str(gif_path))
+        return None
+
+    def _setup_media(self, video_path: str, gif_path: Optional[str] = None) -> None:
+        """根据配置选择窗口内逐帧播放（视频 / 帧包 / GIF）或 QMediaPlayer，见 _frame_source。"""
+        source = self._frame_source(video_path, gif_path)
+        if source is not None:
+            self._setup_player(source)
         elif _HAS_VIDEO:
             self._setup_video(str(video_path))
-            # 已有视频无 GIF 时，后台转换；转换完成后自动切换为 GIF 并提示耗时
-            if USE_GIF_PLAYBACK and _HAS_VIDEO_TO_GIF and VideoToGifWorker is not None:
+            # 已有视频无 GIF / 帧包时，后台转换；转换完成后自动切换为逐帧播放并提示耗时
+            if (USE_GIF_PLAYBACK or USE_FRAMEPACK_PLAYBACK) and _HAS_VIDEO_TO_GIF and VideoToGifWorker is not None:
                 self._start_convert_video_to_gif(str(video_path))
 
     def _setup_gif(self, path: str) -> None:
-        """内嵌 GIF 播放：QLabel + QMovie，播完一遍后隐藏（与视频一致）。"""
-        if not Path(path).exists():
-            return
-        if self._gif_label is not None:
+        """内嵌 GIF 播放（视频转 GIF 完成后调用）。"""
+        if Path(path).exists():
+            self._setup_player(GifFrameSource(path))
+
+    def _setup_player(self, source: FrameSource) -> None:
+        """窗口内逐帧播放：播放器按媒体区域尺寸流式解码，画在窗口里；播完一遍后切回静态图（与视频一致）。"""
+        if self._frame_player is not None:
             return
-        self._gif_label = QLabel(self)
-        self._gif_movie = QMovie(path)
-        self._gif_movie.setCacheMode(QMovie.CacheMode.CacheAll)
-        # Qt6 QMovie 无 setLoopCount，由 GIF 文件内 loop 决定；video_to_gif 已写 loop=0（播一遍）
-        self._gif_movie.finished.connect(self._on_gif_finished)
-        self._gif_label.setMovie(self._gif_movie)
-        self._gif_label.setStyleSheet("background: transparent;")
-        self._gif_label.setScaledContents(True)
-        self._update_gif_widget_geometry()
-        self._gif_label.lower()
-        self._gif_label.hide()
-        self._gif_movie.stop()
-        self._use_gif = True
+        self._frame_player = FramePlayer(source, parent=self)
+        self._frame_player.frameChanged.connect(self._on_player_frame)
+        self._frame_player.finished.connect(self._on_player_finished)
+        self._update_player_frame_size()
+        self._use_player = True
         self.update()
 
-    def _on_gif_finished(self) -> None:
-        """GIF 播完一遍后隐藏，切回静态图。"""
-        if self._gif_label is not None and self._gif_movie is not None:
-            self._gif_movie.stop()
-            self._gif_label.hide()
+    def _frames_playing(self) -> bool:
+        return self._frame_player is not None and self._frame_player.is_playing()
+
+    def _on_player_frame(self) -> None:
+        frame = self._frame_player.current
+        if frame is not None and frame.index == 0:
+            self.update()  # 第一帧：媒体区域外的高光等也要清掉
+        else:
+            self._invalidate(self._media_rect())
+
+    def _on_player_finished(self) -> None:
+        """播完一遍（或被收起）：丢弃全部帧，切回静态图。"""
+        self._reaction_started = None  # 没画出帧就被收起：不计入反应耗时
+        if self._frame_player is not None:
+            self._frame_player.stop()
             self.update()
 
-    def _update_gif_widget_geometry(self) -> None:
-        """按头像图片实际显示尺寸与位置设置 GIF 区域。"""
-        if self._gif_label is None:
+    def _content_rect(self) -> QRect:
+        margin = WINDOW_CONTENT_MARGIN
+        return QRect(margin, margin, self._width - 2 * margin, self._height - 2 * margin)
+
+    def _scaled_avatar(self) -> Optional[ScaledPixmap]:
+        """当前头像的缩放结果（按需从缓存取）；没有头像或暂时无法解码时返回 None。
+
+        无法解码（如图生视频输出时文件正被重写）只让本次绘制退回几何形象，头像路径保留；
+        缓存按修改时间记住失败，文件被重写后下次绘制自动重试。
+        """
+        if self._avatar_path is None:
+            return None
+        entry = self._avatar_entry
+        if entry is None or entry.dpr != self.devicePixelRatioF():
+            entry = SCALED_AVATARS.get(self._avatar_path, self._content_rect(), self.devicePixelRatioF())
+            if entry is not None and self._avatar_failed:
+                self.update()  # 头像恢复：整窗重绘，局部重绘不会只贴出一块头像
+            self._avatar_failed = entry is None
+            self._avatar_entry = entry
+        return entry
+
+    def _media_rect(self) -> QRect:
+        """GIF / 视频区域：与头像实际显示区域一致；没有头像时为整个内容区。"""
+        entry = self._scaled_avatar()
+        return QRect(entry.rect) if entry is not None else self._content_rect()
+
+    def _media_pixel_size(self) -> Tuple[int, int]:
+        """媒体区域的物理像素尺寸：帧包按此尺寸生成，播放时不必再缩放。"""
+        size, dpr = self._media_rect().size(), self.devicePixelRatioF()
+        return int(round(size.width() * dpr)), int(round(size.height() * dpr))
+
+    def _update_player_frame_size(self) -> None:
+        """按头像图片实际显示尺寸解码（与 _update_video_widget_geometry 同一区域，下一次播放起生效），并按新尺寸预热开头几帧。"""
+        if self._frame_player is None:
             return
-        content_w = self._width - 2 * CONTENT_MARGIN
-        content_h = self._height - 2 * CONTENT_MARGIN
-        if self._avatar and not self._avatar.isNull():
-            scaled = self._avatar.scaled(
-                content_w, content_h,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation,
-            )
-            vw, vh = scaled.width(), scaled.height()
-            vx = (self._width - vw) // 2
-            vy = (self._height - vh) // 2
-        else:
-            vx, vy = CONTENT_MARGIN, CONTENT_MARGIN
-            vw, vh = content_w, content_h
-        self._gif_label.setGeometry(vx, vy, vw, vh)
+        self._frame_player.set_size(self._media_rect().size(), self.devicePixelRatioF())
+        self._frame_player.prewarm()
+
+    def playback_stats(self) -> dict:
+        """窗口内逐帧播放的统计（见 FramePlayer.stats）与检测到人→第一帧画到窗口上的耗时。"""
+        out = self._frame_player.stats() if self._frame_player is not None else {}
+        samples = sorted(self._reaction_ms)
+        out.update({
+            "reactions": len(samples),
+            "reaction_p50_ms": samples[len(samples) // 2] if samples else 0.0,
+            "reaction_max_ms": samples[-1] if samples else 0.0,
+        })
+        return out
 
     def _start_convert_video_to_gif(self, video_path: str) -> None:
-        """后台将已有视频转为 GIF，转换完成后切换为 GIF 播放并提示耗时。"""
+        """后台将已有视频转为 GIF（USE_FRAMEPACK_PLAYBACK 时转为帧包），转换完成后切换为逐帧播放并提示耗时。"""
         if not _HAS_VIDEO_TO_GIF or VideoToGifWorker is None:
             return
-        worker = VideoToGifWorker(video_path, parent=self)
+        worker = VideoToGifWorker(video_path, parent=self, framepack=USE_FRAMEPACK_PLAYBACK, size=self._media_pixel_size())
         worker.finished_success.connect(self._on_convert_video_to_gif_success)
         worker.finished_fail.connect(self._on_convert_video_to_gif_fail)
         worker.start()
 
     def _on_convert_video_to_gif_success(self, video_path: str, gif_path: str, elapsed: float) -> None:
-        """已有视频转 GIF 完成：销毁视频控件，切换为 GIF，保存档案，提示耗时。"""
+        """已有视频转 GIF / 帧包完成：销毁视频控件，切换为逐帧播放，保存档案，提示耗时。"""
         # 销毁视频控件
         if self._video_widget is not None:
             if self._media_player is not None:
@@ -280,45 +367,36 @@ class PetWindow(QWidget):
                 self._media_player = None
             self._video_widget.deleteLater()
             self._video_widget = None
-        self._use_gif = False
-        # 保存 gif_path 到档案
-        if self._pet and self._profile_store:
-            self._pet.gif_path = gif_path
-            self._profile_store.save(self._pet)
-        # 创建 GIF 控件
-        self._setup_gif(gif_path)
+        self._use_player = False
+        if USE_FRAMEPACK_PLAYBACK:
+            # 帧包按视频路径映射，不记入档案
+            self._setup_player(FramePackSource(gif_path))
+            kind = "帧包"
+        else:
+            # 保存 gif_path 到档案
+            if self._pet and self._profile_store:
+                self._pet.gif_path = gif_path
+                self._profile_store.save(self._pet)
+            self._setup_gif(gif_path)
+            kind = "GIF"
         QMessageBox.information(
             self,
-            "视频已转为 GIF",
-            f"转换完成，耗时 {elapsed:.1f} 秒。\n\nGIF 已保存，桌宠将使用 GIF 播放（避免内存泄漏）。",
+            f"视频已转为 {kind}",
+            f"转换完成，耗时 {elapsed:.1f} 秒。\n\n{kind} 已保存，桌宠将使用 {kind} 播放（避免内存泄漏）。",
         )
 
     def _on_convert_video_to_gif_fail(self, err: str) -> None:
         QMessageBox.warning(self, "视频转 GIF 失败", err)
 
     def _update_video_widget_geometry(self) -> None:
-        """按头像图片实际显示尺寸与位置设置视频区域（与 paintEvent 中 scaled 一致）。"""
+        """按头像图片实际显示尺寸与位置设置视频区域（与 paintEvent 中头像一致）。"""
         if self._video_widget is None:
             return
-        content_w = self._width - 2 * CONTENT_MARGIN
-        content_h = self._height - 2 * CONTENT_MARGIN
-        if self._avatar and not self._avatar.isNull():
-            scaled = self._avatar.scaled(
-                content_w, content_h,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation,
-            )
-            vw, vh = scaled.width(), scaled.height()
-            vx = (self._width - vw) // 2
-            vy = (self._height - vh) // 2
-        else:
-            vx, vy = CONTENT_MARGIN, CONTENT_MARGIN
-            vw, vh = content_w, content_h
-        self._video_widget.setGeometry(vx, vy, vw, vh)
+        self._video_widget.setGeometry(self._media_rect())
 
     def _check_pet_video_path(self) -> None:
         """轮询宠物档案中的 video_path/gif_path，若新写入则内嵌播放并停止轮询。"""
-        if not self._pet or self._video_widget is not None or self._gif_label is not None:
+        if not self._pet or self._video_widget is not None or self._frame_player is not None:
             return
         path = getattr(self._pet, "video_path", None)
         gif_path = getattr(self._pet, "gif_path", None)
@@ -334,10 +412,19 @@ class PetWindow(QWidget):
             except Exception:
                 pass
         if path and Path(str(path)).exists():
-            if getattr(self, "_video_poll_timer", None):
-                self._video_poll_timer.stop()
+            self._stop_video_poll()
             self._setup_media(str(path), str(gif_path) if gif_path else None)
 
+    def _stop_video_poll(self) -> None:
+        self._video_poll_wanted = False
+        self._clock.cancel(self._video_poll_task)
+        self._video_poll_task = None
+
+    def _start_video_poll(self) -> None:
+        self._video_poll_task = self._clock.every(
+            VIDEO_POLL_MS, self._check_pet_video_path, VIDEO_POLL_TOLERANCE_MS, owner=id(self)
+        )
+
     def _setup_video(self, path: str) -> None:
         """内嵌即梦短视频：QVideoWidget + QMediaPlayer，循环、静音，置于按钮下层。"""
         if not _HAS_VIDEO or QVideoWidget is None or QMediaPlayer is None:
@@ -345,7 +432,7 @@ class PetWindow(QWidget):
         path = str(path)
         if not Path(path).exists():
             return
-        if self._video_widget is not None or self._gif_label is not None:
+        if self._video_widget is not None or self._frame_player is not None:
             return
         self._video_widget = QVideoWidget(self)
         self._update_video_widget_geometry()
@@ -404,7 +491,9 @@ class PetWindow(QWidget):
         if not _HAS_I2V or I2VWorker is None or not JIMENG_ACCESS_KEY or not JIMENG_SECRET_KEY:
             return
         ensure_dirs()
-        worker = I2VWorker(avatar_path, JIMENG_ACCESS_KEY, JIMENG_SECRET_KEY, VIDEOS_DIR, parent=self)
+        worker = I2VWorker(
+            avatar_path, JIMENG_ACCESS_KEY, JIMENG_SECRET_KEY, VIDEOS_DIR, parent=self, pack_size=self._media_pixel_size()
+        )
         worker.finished_success.connect(self._on_i2v_success)
         worker.finished_fail.connect(self._on_i2v_fail)
         worker.start()
@@ -436,7 +525,13 @@ class PetWindow(QWidget):
     def showEvent(self, event) -> None:
         """窗口显示时同步一次档案中的 video_path/gif_path，确保新生成的与当前账号绑定。"""
         super().showEvent(event)
-        if (self._video_widget is not None or self._gif_label is not None) or not self._pet:
+        handle = self.windowHandle()
+        if handle is not None and not self._expose_watched:
+            # 最小化、被其它窗口完全遮挡时平台会发 Expose 事件（isExposed() 变为 False）
+            handle.installEventFilter(self)
+            self._expose_watched = True
+        self._update_seen()
+        if (self._video_widget is not None or self._frame_player is not None) or not self._pet:
             return
         path = getattr(self._pet, "video_path", None)
         gif_path = getattr(self._pet, "gif_path", None)
@@ -453,47 +548,188 @@ class PetWindow(QWidget):
                 pass
         if path and Path(str(path)).exists():
             self._setup_media(str(path), str(gif_path) if gif_path else None)
-            if getattr(self, "_video_poll_timer", None):
-                self._video_poll_timer.stop()
+            self._stop_video_poll()
+
+    def hideEvent(self, event) -> None:
+        super().hideEvent(event)
+        self._update_seen()
+
+    def changeEvent(self, event) -> None:
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self._update_seen()
+
+    def eventFilter(self, obj, event) -> bool:
+        if event.type() == QEvent.Type.Expose and obj is self.windowHandle():
+            self._update_seen()
+        return super().eventFilter(obj, event)
+
+    def is_seen(self) -> bool:
+        """窗口当前能否被看到：已显示、未最小化、未被完全遮挡。"""
+        if not self.isVisible() or self.isMinimized():
+            return False
+        handle = self.windowHandle()
+        return handle is None or handle.isExposed()
+
+    def _update_seen(self) -> None:
+        seen = self.is_seen()
+        if seen == self._seen:
+            return
+        self._seen = seen
+        if seen:
+            self._resume()
+        else:
+            self._pause()
+        self.visibilityChanged.emit(seen)
+
+    def _pause(self) -> None:
+        """看不见了：取消时钟上本窗口的全部任务，暂停正在播放的 GIF / 视频。"""
+        self.pauses += 1
+        self._clock.cancel_owner(id(self))
+        self._blink_task = self._fade_task = self._video_poll_task = None
+        self._eyes_closed = False
+        self._lit_alpha = 1.0
+        if self._frames_playing():
+            self._on_player_finished()  # 丢弃帧并释放解码器；恢复时也不会再接着播
+        if self._media_player is not None and self._video_widget is not None and self._video_widget.isVisible():
+            self._media_player.pause()
+
+    def _resume(self) -> None:
+        """重新看得见：不补发错过的眨眼与帧，只按当前状态各做一次。
+
+        暂停前没播完的 GIF / 视频是对当时那次检测的反应，已经过时：直接收起（GIF 在暂停时已收起），显示当前状态。
+        """
+        if self._media_player is not None and self._video_widget is not None and self._video_widget.isVisible():
+            self._media_player.setPosition(0)
+            self._video_widget.hide()
+        self._start_idle_animations()
+        if self._video_poll_wanted:
+            self._start_video_poll()
+            self._check_pet_video_path()
+        self.update()
 
     def _start_idle_animations(self) -> None:
         """待机：每隔几秒眨眼（已移除上下弹跳动效）。"""
-        self._blink_timer = QTimer(self)
-        self._blink_timer.timeout.connect(self._do_blink)
-        self._blink_timer.start(3000)
+        self._clock.cancel(self._blink_task)
+        self._blink_task = self._clock.every(BLINK_INTERVAL_MS, self._do_blink, BLINK_TOLERANCE_MS, owner=id(self))
+
+    def _gaze_offset(self) -> Tuple[int, int]:
+        return int(round(self._gaze[0] * GAZE_MAX_OFFSET)), int(round(self._gaze[1] * GAZE_MAX_OFFSET))
+
+    def _eye_rect(self) -> QRect:
+        """几何形象眼睛带当前所在的区域（含视线偏移）。"""
+        return QRect(eye_origin(self._gaze_offset()), EYE_BAND.size())
+
+    def _look(self):
+        """决定画面的外观：几何形象为当前眼睛精灵（拖拽与待机共用一张），头像只看是否叠加高光；不变则无需重绘。"""
+        if self._avatar_path is None:
+            sprites = SPRITES.get(self.size(), self.devicePixelRatioF())
+            return sprites.eyes[appearance_for(self._state, self._eyes_closed)]
+        return self._state == PetState.EYES_LIT
+
+    def _invalidate(self, rect: QRect) -> None:
+        """请求重绘 rect；关闭局部重绘时整窗重绘。"""
+        if self.partial_repaint:
+            self.update(rect)
+        else:
+            self.update()
+
+    def _invalidate_look(self, before) -> None:
+        """外观相对 before 有变化时重绘受影响的区域：眼睛带或高光。关闭局部重绘时照旧每次整窗重绘。"""
+        if not self.partial_repaint:
+            self.update()
+            return
+        if self._look() is before:
+            return
+        self._invalidate(self._eye_rect() if self._avatar_path is None else highlight_rect(self._width))
 
     def _do_blink(self) -> None:
         if self._state != PetState.IDLE and self._state != PetState.EYES_LIT:
             return
+        if self._avatar_path is not None and self.partial_repaint:
+            return  # 头像没有画眼睛：眨眼既不重绘也不必安排睁眼
+        before = self._look()
         self._eyes_closed = True
-        self.update()
-        QTimer.singleShot(120, self._open_eyes)
+        self._invalidate_look(before)
+        self._clock.call_later(BLINK_CLOSED_MS, self._open_eyes, owner=id(self))
 
     def _open_eyes(self) -> None:
+        before = self._look()
         self._eyes_closed = False
-        self.update()
+        self._invalidate_look(before)
+
+    def _enter_state(self, state: PetState) -> None:
+        """切换状态；刚进入「眼睛一亮」时开始渐显（看不见时直接到位）。"""
+        if state == PetState.EYES_LIT and self._state != PetState.EYES_LIT and EYES_LIT_FADE_MS > 0 and self._seen:
+            self._lit_alpha = 0.0
+            self._lit_fade_start = self._clock.now()
+            self._clock.cancel(self._fade_task)
+            self._fade_task = self._clock.every(FADE_FRAME_MS, self._fade_step, owner=id(self))
+        self._state = state
+
+    def _fade_step(self) -> None:
+        elapsed_ms = (self._clock.now() - self._lit_fade_start) * 1000.0
+        self._lit_alpha = min(1.0, elapsed_ms / EYES_LIT_FADE_MS)
+        if self._lit_alpha >= 1.0 or self._state != PetState.EYES_LIT:
+            self._lit_alpha = 1.0
+            self._clock.cancel(self._fade_task)
+            self._fade_task = None
+        if self._state == PetState.EYES_LIT:
+            self._invalidate(self._eye_rect() if self._avatar_path is None else highlight_rect(self._width))
 
     def set_state(self, state: PetState) -> None:
-        self._state = state
-        self.update()
+        before = self._look()
+        self._enter_state(state)
+        self._invalidate_look(before)
 
     def update_detection(self, pet_detected: bool) -> None:
-        self._state = next_state_on_detection(self._state, pet_detected)
+        before = self._look()
+        self._enter_state(next_state_on_detection(self._state, pet_detected))
         # 仅在人「刚出现」时触发播放（从未检测到→检测到），避免人一直在就反复播导致内存泄漏
-        if self._use_gif and self._gif_label is not None and self._gif_movie is not None:
-            if pet_detected and not self._last_pet_detected and not self._gif_label.isVisible():
-                self._gif_label.show()
-                self._gif_movie.start()
+        started = False
+        # 看不见时不启动播放；「刚出现」的判断照常更新，重新看得见时不会补播
+        appeared = pet_detected and not self._last_pet_detected and self._seen
+        if self._use_player and self._frame_player is not None:
+            if appeared and not self._frames_playing():
+                self._reaction_started = time.perf_counter()
+                self._frame_player.play()
+                started = True
             # 不因人离开而中断，与视频一致：播完一遍再隐藏（由 finished 信号处理）
         elif self._video_widget is not None and self._media_player is not None:
-            if pet_detected and not self._last_pet_detected and not self._video_widget.isVisible():
+            if appeared and not self._video_widget.isVisible():
                 self._video_widget.show()
                 self._media_player.play()
+                started = True
         self._last_pet_detected = pet_detected
-        self.update()
+        if started and not self._use_player:
+            self.update()  # 视频播放期间不画头像：整窗清空一次（逐帧播放在第一帧到来时清）
+        else:
+            self._invalidate_look(before)  # 状态没变（多数检测）时不重绘
         if self._on_detection:
             self._on_detection(pet_detected)
 
+    def look_at(self, point: Optional[Tuple[float, float]]) -> None:
+        """看向摄像头画面中的运动位置（归一化坐标，来自 DetectionResult.track）；None 时回正。
+
+        摄像头与桌宠都面向用户，画面左侧是桌宠自己的左侧，即屏幕上的右侧，因此水平方向取反。
+        """
+        if point is None:
+            gaze = (0.0, 0.0)
+        else:
+            gaze = (
+                max(-1.0, min(1.0, (0.5 - point[0]) * 2.0)),
+                max(-1.0, min(1.0, (point[1] - 0.5) * 2.0)),
+            )
+        if max(abs(gaze[0] - self._gaze[0]), abs(gaze[1] - self._gaze[1])) < GAZE_MIN_CHANGE:
+            return
+        if self._avatar_path is None:
+            # 只有几何形象的眼睛会随视线移动：重绘新旧两处眼睛带
+            old = self._eye_rect()
+            self._gaze = gaze
+            self._invalidate(old.united(self._eye_rect()))
+        else:
+            self._gaze = gaze
+
     def mousePressEvent(self, event) -> None:
         if event.button() == Qt.MouseButton.LeftButton:
             self._drag_pos = event.globalPosition().toPoint() - self.frameGeometry().topLeft()
@@ -511,61 +747,50 @@ class PetWindow(QWidget):
             self.set_state(PetState.IDLE)
         super().mouseReleaseEvent(event)
 
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        self._width, self._height = self.width(), self.height()
+        self._avatar_entry = None  # 内容区变化：下次绘制按新尺寸取缩放结果
+        self._update_video_widget_geometry()
+        self._update_player_frame_size()
+
     def paintEvent(self, event) -> None:
-        # 若正在播放内嵌 GIF 或视频，不绘制头像
-        if self._gif_label is not None and self._gif_label.isVisible():
-            return
+        # 若正在播放内嵌视频，不绘制头像
         if self._video_widget is not None and self._video_widget.isVisible():
             return
+        # 只重绘请求的区域：各图层只贴与之相交的部分
+        dirty = event.rect()
+        self.painted_pixels += dirty.width() * dirty.height()  # 按重绘区域的包围盒计
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
-
-        w, h = self._width, self._height
-        content_w = w - 2 * CONTENT_MARGIN
-        content_h = h - 2 * CONTENT_MARGIN
-
-        if self._avatar and not self._avatar.isNull():
-            # 使用用户上传的猫咪形象：与视频同一内容区与比例（KeepAspectRatio）
-            scaled = self._avatar.scaled(
-                content_w, content_h,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation,
-            )
-            x = (w - scaled.width()) // 2
-            y = (h - scaled.height()) // 2
-            painter.drawPixmap(x, y, scaled)
+        frame = self._frame_player.current if self._frame_player is not None else None
+        if frame is not None:
+            # 正在逐帧播放：只画当前帧（已按媒体区域尺寸解码），不画头像
+            blit(painter, dirty, self._media_rect().topLeft(), frame.image)
+            painter.end()
+            if self._reaction_started is not None:
+                self._reaction_ms.append((time.perf_counter() - self._reaction_started) * 1000.0)
+                self._reaction_started = None
+            return
+        avatar = self._scaled_avatar()
+        dpr = self.devicePixelRatioF()
+
+        if avatar is not None:
+            # 使用用户上传的猫咪形象：与视频同一内容区与比例，已缩放好，直接贴图
+            blit(painter, dirty, avatar.rect.topLeft(), avatar.pixmap)
             if self._state == PetState.EYES_LIT:
-                painter.setPen(Qt.PenStyle.NoPen)
-                painter.setBrush(QBrush(QColor(255, 255, 200, 120)))
-                painter.drawEllipse(w // 2 - 25, 30, 50, 30)
+                sprites = SPRITES.get(self.size(), dpr)
+                painter.setOpacity(self._lit_alpha)
+                blit(painter, dirty, highlight_rect(self._width).topLeft(), sprites.highlight)
         else:
-            # 默认可爱几何形象：圆身体 + 眼睛（含眨眼与眼睛一亮）
-            body_color = QColor(255, 200, 160, 220)
-            painter.setBrush(QBrush(body_color))
-            painter.setPen(QPen(QColor(255, 180, 140), 1))
-            painter.drawEllipse(15, 35, 170, 115)
-
-            eye_radius = 11
-            lx, rx = 72, 122
-            ey = 72
-            if self._eyes_closed:
-                painter.setPen(QPen(QColor(80, 60, 40), 2))
-                painter.setBrush(Qt.BrushStyle.NoBrush)
-                painter.drawLine(lx - eye_radius, ey, lx + eye_radius, ey)
-                painter.drawLine(rx - eye_radius, ey, rx + eye_radius, ey)
-            else:
-                if self._state == PetState.EYES_LIT:
-                    painter.setBrush(QBrush(QColor(255, 255, 150)))
-                    painter.setPen(QPen(QColor(255, 220, 80), 2))
-                else:
-                    painter.setBrush(QBrush(QColor(60, 60, 80)))
-                    painter.setPen(Qt.PenStyle.NoPen)
-                painter.drawEllipse(lx - eye_radius, ey - eye_radius, eye_radius * 2, eye_radius * 2)
-                painter.drawEllipse(rx - eye_radius, ey - eye_radius, eye_radius * 2, eye_radius * 2)
-                if self._state == PetState.EYES_LIT:
-                    painter.setBrush(QBrush(QColor(255, 255, 255)))
-                    painter.drawEllipse(lx - 3, ey - 5, 6, 6)
-                    painter.drawEllipse(rx - 3, ey - 5, 6, 6)
+            # 默认可爱几何形象：预渲染的身体 + 眼睛（眨眼 / 眼睛一亮各一张），按视线偏移贴眼睛
+            sprites = SPRITES.get(self.size(), dpr)
+            blit(painter, dirty, QPoint(0, 0), sprites.body)
+            appearance = appearance_for(self._state, self._eyes_closed)
+            origin = self._eye_rect().topLeft()
+            if appearance == Appearance.EYES_LIT and self._lit_alpha < 1.0:
+                # 渐显中：待机的眼睛上叠加逐渐不透明的亮眼睛
+                blit(painter, dirty, origin, sprites.eyes[Appearance.IDLE])
+                painter.setOpacity(self._lit_alpha)
+            blit(painter, dirty, origin, sprites.eyes[appearance])
 
         painter.end()
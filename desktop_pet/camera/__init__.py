@@ -1,4 +1,29 @@
 """摄像头检测：检测真实宠物出现时触发桌面动效。"""
+from desktop_pet.camera.backends import MotionBackend, create_backend
+from desktop_pet.camera.classifier import CatClassifier
 from desktop_pet.camera.detector import CameraDetector, DetectionResult
+from desktop_pet.camera.filter import DetectionFilter
+from desktop_pet.camera.pipeline import CameraPipeline, LatestFrameSlot
+from desktop_pet.camera.process_detector import ProcessCameraDetector
+from desktop_pet.camera.profiling import StageProfiler
+from desktop_pet.camera.roi import RoiStore, rect_region
+from desktop_pet.camera.sources import FrameSource, open_source
+from desktop_pet.camera.tracking import MotionTracker
 
-__all__ = ["CameraDetector", "DetectionResult"]
+__all__ = [
+    "CatClassifier",
+    "CameraDetector",
+    "DetectionResult",
+    "DetectionFilter",
+    "CameraPipeline",
+    "LatestFrameSlot",
+    "ProcessCameraDetector",
+    "StageProfiler",
+    "MotionBackend",
+    "create_backend",
+    "RoiStore",
+    "rect_region",
+    "FrameSource",
+    "open_source",
+    "MotionTracker",
+]
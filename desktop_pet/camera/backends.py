@@ -0,0 +1,231 @@
+"""运动检测后端：输入预处理（缩小、灰度、模糊）后的画面，输出运动掩码（0/255）。
+
+- frame_diff：相邻两次采样做差分（MVP 原算法），开销最小，但慢速移动容易漏检、噪声与闪烁直接计入
+- running_avg：accumulateWeighted 维护背景均值，与背景比较，噪声被平均、慢速移动也能检出
+- mog2 / knn：OpenCV 背景建模（BackgroundSubtractorMOG2/KNN），对光照抖动最稳，开销最大
+
+每个后端都统计处理帧数与单帧耗时（stats()），便于对比。
+"""
+import time
+from typing import Tuple
+
+# 可选后端名称
+BACKEND_NAMES = ("frame_diff", "running_avg", "mog2", "knn")
+
+
+class MotionBackend:
+    """后端基类。reuse_buffers 为 True 时，后端自行持有输入缓冲（input_buffer）与掩码缓冲，逐帧复用。"""
+    name = ""
+
+    def __init__(self, diff_threshold: int = 25, reuse_buffers: bool = True):
+        self.diff_threshold = diff_threshold
+        self.reuse_buffers = reuse_buffers
+        self.frames = 0
+        self.total_s = 0.0
+
+    def reset(self) -> None:
+        """清空背景模型（分辨率变化、摄像头重开时调用）。"""
+
+    @property
+    def ready(self) -> bool:
+        """模型是否已就绪：下一次 apply() 能否给出掩码。"""
+        return True
+
+    def input_buffer(self, shape: Tuple[int, int]):
+        """返回检测器应写入预处理结果的缓冲；返回 None 表示由检测器自行分配。"""
+        return None
+
+    def apply(self, gray):
+        """更新模型并返回运动掩码；模型尚未就绪时返回 None。"""
+        raise NotImplementedError
+
+    def process(self, gray):
+        """apply() 并累计耗时。"""
+        start = time.perf_counter()
+        mask = self.apply(gray)
+        self.total_s += time.perf_counter() - start
+        self.frames += 1
+        return mask
+
+    def stats(self) -> dict:
+        """处理帧数与平均单帧耗时（毫秒）。"""
+        ms = self.total_s * 1000.0 / self.frames if self.frames else 0.0
+        return {"backend": self.name, "frames": self.frames, "ms_per_frame": ms}
+
+
+class FrameDiffBackend(MotionBackend):
+    """相邻帧差分。复用模式下 cur/prev 两块缓冲每帧交换，不拷贝。"""
+    name = "frame_diff"
+
+    def __init__(self, diff_threshold: int = 25, reuse_buffers: bool = True):
+        super().__init__(diff_threshold, reuse_buffers)
+        self._prev = None
+        self._cur = None
+        self._diff = None
+        self._mask = None
+        self._primed = False
+
+    def reset(self) -> None:
+        self._prev = self._cur = self._diff = self._mask = None
+        self._primed = False
+
+    @property
+    def ready(self) -> bool:
+        return self._primed if self.reuse_buffers else self._prev is not None
+
+    def input_buffer(self, shape: Tuple[int, int]):
+        if not self.reuse_buffers:
+            return None
+        if self._cur is None or self._cur.shape != shape:
+            import numpy as np
+            self._cur = np.empty(shape, np.uint8)
+            self._prev = np.empty(shape, np.uint8)
+            self._diff = np.empty(shape, np.uint8)
+            self._mask = np.empty(shape, np.uint8)
+            self._primed = False
+        return self._cur
+
+    def apply(self, gray):
+        import cv2
+        if not self.reuse_buffers:
+            if self._prev is None or self._prev.shape != gray.shape:
+                self._prev = gray
+                return None
+            diff = cv2.absdiff(self._prev, gray)
+            self._prev = gray
+            return cv2.threshold(diff, self.diff_threshold, 255, cv2.THRESH_BINARY)[1]
+        mask = None
+        if self._primed:
+            cv2.absdiff(self._prev, gray, dst=self._diff)
+            cv2.threshold(self._diff, self.diff_threshold, 255, cv2.THRESH_BINARY, dst=self._mask)
+            mask = self._mask
+        # 交换 cur/prev：本帧结果成为下一帧的 prev
+        self._cur, self._prev = self._prev, self._cur
+        self._primed = True
+        return mask
+
+
+class RunningAverageBackend(MotionBackend):
+    """accumulateWeighted 背景均值：与缓慢更新的背景比较，而非与上一帧比较。"""
+    name = "running_avg"
+
+    def __init__(self, diff_threshold: int = 25, reuse_buffers: bool = True, alpha: float = 0.05):
+        super().__init__(diff_threshold, reuse_buffers)
+        self.alpha = alpha
+        self._model = None  # float32 背景均值
+        self._bg = None     # uint8 背景（与输入比较用）
+        self._input = None
+        self._diff = None
+        self._mask = None
+
+    def reset(self) -> None:
+        self._model = self._bg = self._input = self._diff = self._mask = None
+
+    @property
+    def ready(self) -> bool:
+        return self._model is not None
+
+    def input_buffer(self, shape: Tuple[int, int]):
+        if not self.reuse_buffers:
+            return None
+        if self._input is None or self._input.shape != shape:
+            import numpy as np
+            self._input = np.empty(shape, np.uint8)
+            self._bg = np.empty(shape, np.uint8)
+            self._diff = np.empty(shape, np.uint8)
+            self._mask = np.empty(shape, np.uint8)
+            self._model = None
+        return self._input
+
+    def apply(self, gray):
+        import cv2
+        if self._model is None or self._model.shape != gray.shape:
+            self._model = gray.astype("float32")
+            return None
+        if self.reuse_buffers:
+            cv2.convertScaleAbs(self._model, dst=self._bg)
+            cv2.absdiff(self._bg, gray, dst=self._diff)
+            cv2.threshold(self._diff, self.diff_threshold, 255, cv2.THRESH_BINARY, dst=self._mask)
+            mask = self._mask
+        else:
+            diff = cv2.absdiff(cv2.convertScaleAbs(self._model), gray)
+            mask = cv2.threshold(diff, self.diff_threshold, 255, cv2.THRESH_BINARY)[1]
+        cv2.accumulateWeighted(gray, self._model, self.alpha)
+        return mask
+
+
+class BackgroundSubtractorBackend(MotionBackend):
+    """OpenCV 背景建模（MOG2 / KNN）。建模初期前几帧掩码不可靠，视为未就绪。"""
+
+    def __init__(
+        self,
+        kind: str = "mog2",
+        diff_threshold: int = 25,
+        reuse_buffers: bool = True,
+        history: int = 120,
+        warmup_frames: int = 5,
+    ):
+        super().__init__(diff_threshold, reuse_buffers)
+        self.name = kind
+        self.kind = kind
+        self.history = history
+        self.warmup_frames = warmup_frames
+        self._subtractor = None
+        self._seen = 0
+        self._input = None
+        self._mask = None
+
+    def _create(self):
+        import cv2
+        if self.kind == "knn":
+            return cv2.createBackgroundSubtractorKNN(history=self.history, detectShadows=False)
+        # MOG2 的 varThreshold 是马氏距离平方阈值，与像素差分阈值不同量纲，用默认值
+        return cv2.createBackgroundSubtractorMOG2(history=self.history, detectShadows=False)
+
+    def reset(self) -> None:
+        self._subtractor = None
+        self._seen = 0
+        self._input = self._mask = None
+
+    @property
+    def ready(self) -> bool:
+        return self._seen >= self.warmup_frames
+
+    def input_buffer(self, shape: Tuple[int, int]):
+        if not self.reuse_buffers:
+            return None
+        if self._input is None or self._input.shape != shape:
+            import numpy as np
+            self._input = np.empty(shape, np.uint8)
+            self._mask = np.empty(shape, np.uint8)
+            self._subtractor = None
+            self._seen = 0
+        return self._input
+
+    def apply(self, gray):
+        if self._subtractor is None:
+            self._subtractor = self._create()
+            self._seen = 0
+        if self.reuse_buffers:
+            mask = self._subtractor.apply(gray, fgmask=self._mask)
+        else:
+            mask = self._subtractor.apply(gray)
+        self._seen += 1
+        if self._seen <= self.warmup_frames:
+            return None
+        return mask
+
+
+def create_backend(
+    name: str,
+    diff_threshold: int = 25,
+    reuse_buffers: bool = True,
+) -> MotionBackend:
+    """按名称创建后端；未知名称抛出 ValueError。"""
+    if name == "frame_diff":
+        return FrameDiffBackend(diff_threshold, reuse_buffers)
+    if name == "running_avg":
+        return RunningAverageBackend(diff_threshold, reuse_buffers)
+    if name in ("mog2", "knn"):
+        return BackgroundSubtractorBackend(name, diff_threshold, reuse_buffers)
+    raise ValueError(f"未知的检测后端: {name}，可选 {', '.join(BACKEND_NAMES)}")
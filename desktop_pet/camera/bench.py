@@ -0,0 +1,584 @@
+"""摄像头检测基准测试（除 latency 外无需摄像头，使用合成画面或视频 / 图片帧源，可在 CI 上运行）。
+
+用法：
+    python -m desktop_pet.camera.bench detect [--source synthetic|视频文件|图片目录] [--labels labels.txt] [--backend frame_diff]
+    python -m desktop_pet.camera.bench resolution [--frames 200] [--size 1920x1080]
+    python -m desktop_pet.camera.bench alloc [--frames 100] [--size 1280x720] [--rounds 9]
+    python -m desktop_pet.camera.bench backends [--frames 240] [--size 640x480]
+    python -m desktop_pet.camera.bench schedule [--hours 8]
+    python -m desktop_pet.camera.bench tracking [--frames 240] [--size 640x480]
+    python -m desktop_pet.camera.bench process [--frames 200] [--size 1280x720]
+    python -m desktop_pet.camera.bench profile [--frames 300] [--size 1280x720]
+    python -m desktop_pet.camera.bench filter [--source synthetic|视频文件|图片目录] [--labels labels.txt] [--interval 1000]
+    python -m desktop_pet.camera.bench latency [--camera 0] [--seconds 10]   # 需要真实摄像头
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from desktop_pet.camera.backends import BACKEND_NAMES
+from desktop_pet.camera.detector import CameraDetector
+from desktop_pet.camera.filter import DetectionFilter
+from desktop_pet.camera.profiling import format_snapshot
+from desktop_pet.camera.scheduler import AdaptiveScheduler, IdleReleasePolicy
+from desktop_pet.camera.sources import ArraySource, FrameSource, load_labels, open_source, synthetic_frames, synthetic_labels
+from desktop_pet.config import CAMERA_CAPTURE_LEAD_MS
+
+# 参与对比的处理分辨率；None 表示原分辨率（作为一致率基准）
+DEFAULT_RESOLUTIONS: Sequence[Optional[Tuple[int, int]]] = (None, (640, 480), (320, 240), (160, 120))
+
+
+def parse_size(text: str) -> Tuple[int, int]:
+    """解析 "宽x高" 形式的尺寸。"""
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def detection_metrics(flags: Sequence[bool], labels: Sequence[bool]) -> dict:
+    """逐帧检测结果与真值对比：精确率、检出率（召回率）与混淆计数；只比较两者都有的帧。"""
+    pairs = list(zip(flags, labels))
+    tp = sum(f and l for f, l in pairs)
+    fp = sum(f and not l for f, l in pairs)
+    fn = sum(l and not f for f, l in pairs)
+    return {
+        "tp": tp,
+        "fp": fp,
+        "fn": fn,
+        "precision": tp / (tp + fp) if tp + fp else 0.0,
+        "recall": tp / (tp + fn) if tp + fn else 0.0,
+    }
+
+
+def run_detect_bench(
+    source: FrameSource,
+    backend: str = "frame_diff",
+    labels: Optional[Sequence[bool]] = None,
+    limit: Optional[int] = None,
+    classifier: Optional[str] = None,
+) -> dict:
+    """逐帧对帧源做 detect()（与摄像头同一路径，含读帧），统计帧率、单次检测耗时 p50/p99，
+    有真值时计算精确率与检出率；指定分类模型时附带分类器调用次数、耗时与缓存命中。
+    帧源播完或达到 limit 帧时结束。"""
+    detector = CameraDetector(backend=backend, source=source, classifier=classifier)
+    labels = list(labels) if labels is not None else source.labels
+    flags = []
+    times_ms = []
+    start = time.perf_counter()
+    while limit is None or len(flags) < limit:
+        t0 = time.perf_counter()
+        result = detector.detect()
+        t1 = time.perf_counter()
+        if result.message in ("摄像头不可用", "无法读取画面"):
+            break
+        times_ms.append((t1 - t0) * 1000.0)
+        flags.append(result.pet_detected)
+    elapsed = time.perf_counter() - start
+    detector.release()
+    row = {
+        "backend": backend,
+        "frames": len(flags),
+        "fps": len(flags) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": float(np.percentile(times_ms, 50)) if times_ms else 0.0,
+        "p99_ms": float(np.percentile(times_ms, 99)) if times_ms else 0.0,
+        "detected": sum(flags),
+    }
+    if labels:
+        row.update(detection_metrics(flags, labels))
+    row.update(detector.classifier_stats())
+    if detector.classifier is not None and detector.classifier.error:
+        row["classifier_error"] = detector.classifier.error
+    return row
+
+
+def _print_detect_row(row: dict) -> None:
+    print(f"后端 {row['backend']}：{row['frames']} 帧，{row['fps']:.1f} fps，"
+          f"单次检测 p50 {row['p50_ms']:.3f} ms / p99 {row['p99_ms']:.3f} ms，检出 {row['detected']} 帧")
+    if "precision" in row:
+        print(f"精确率 {row['precision']:.1%}  检出率 {row['recall']:.1%}  "
+              f"(TP {row['tp']} / FP {row['fp']} / FN {row['fn']})")
+    else:
+        print("无真值，未计算精确率 / 检出率")
+    if "classifier_calls" in row:
+        print(f"分类器：推理 {row['classifier_calls']} 次（最近一分钟 {row['classifier_calls_per_min']} 次），"
+              f"{row['classifier_ms']:.2f} ms/次，缓存命中 {row['classifier_cache_hits']} 次")
+    if "classifier_error" in row:
+        print(row["classifier_error"])
+
+
+def run_resolution_bench(
+    frame_count: int = 200,
+    size: Tuple[int, int] = (1920, 1080),
+    resolutions: Sequence[Optional[Tuple[int, int]]] = DEFAULT_RESOLUTIONS,
+) -> List[dict]:
+    """各处理分辨率下的单次检测 CPU 时间与检测结果一致率（以原分辨率为基准）。"""
+    frames = list(synthetic_frames(frame_count, size))
+    rows = []
+    baseline: Optional[List[bool]] = None
+    for res in resolutions:
+        detector = CameraDetector(process_size=res)
+        flags = []
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        for frame in frames:
+            flags.append(detector.process_frame(frame).pet_detected)
+        cpu_ms = (time.process_time() - cpu_start) * 1000.0 / len(frames)
+        wall_ms = (time.perf_counter() - wall_start) * 1000.0 / len(frames)
+        if baseline is None:
+            baseline = flags
+        agreement = sum(a == b for a, b in zip(flags, baseline)) / len(flags)
+        rows.append({
+            "resolution": "原分辨率" if res is None else f"{res[0]}x{res[1]}",
+            "cpu_ms": cpu_ms,
+            "wall_ms": wall_ms,
+            "agreement": agreement,
+            "detected": sum(flags),
+        })
+    return rows
+
+
+def run_alloc_bench(frame_count: int = 100, size: Tuple[int, int] = (1280, 720), rounds: int = 9) -> List[dict]:
+    """对比逐帧分配与复用缓冲两种模式：每帧临时分配的峰值字节数，以及单帧耗时（含 read）在多轮中的中位数与范围。
+
+    两种模式逐轮交替计时，机器负载的慢变化对两者影响相同。
+    """
+    frames = list(synthetic_frames(min(frame_count, 40), size))
+    detectors = {}
+    for reuse in (False, True):
+        detector = CameraDetector(reuse_buffers=reuse, source=ArraySource(frames, loop=True))
+        for _ in range(5):  # 预热：首帧分配缓冲、初始化 prev
+            detector.detect()
+        detectors[reuse] = detector
+    times = {False: [], True: []}
+    for _ in range(max(1, rounds)):
+        for reuse, detector in detectors.items():
+            start = time.perf_counter()
+            for _ in range(frame_count):
+                detector.detect()
+            times[reuse].append((time.perf_counter() - start) * 1000.0 / frame_count)
+    rows = []
+    for reuse, detector in detectors.items():
+        tracemalloc.start()
+        peaks = []
+        for _ in range(min(frame_count, 50)):
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            detector.detect()
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        tracemalloc.stop()
+        rows.append({
+            "mode": "复用缓冲" if reuse else "逐帧分配",
+            "ms": float(np.median(times[reuse])),
+            "ms_min": min(times[reuse]),
+            "ms_max": max(times[reuse]),
+            "alloc_kb": float(np.mean(peaks)) / 1024.0,
+        })
+    return rows
+
+
+def _print_alloc_rows(rows: List[dict]) -> None:
+    print(f"{'模式':<10}{'耗时中位数 ms/帧':>16}{'范围 ms':>18}{'临时分配 KB/帧':>16}")
+    for r in rows:
+        spread = f"{r['ms_min']:.3f}~{r['ms_max']:.3f}"
+        print(f"{r['mode']:<10}{r['ms']:>16.3f}{spread:>18}{r['alloc_kb']:>16.1f}")
+
+
+def run_backend_bench(frame_count: int = 240, size: Tuple[int, int] = (640, 480)) -> List[dict]:
+    """各检测后端在「正常走动」与「慢速走动」两段合成画面上的单帧耗时、检出率与误报率。"""
+    rows = []
+    for clip, walk in (("正常", 10), ("慢速", 36)):
+        frames = list(synthetic_frames(frame_count, size, walk_frames=walk))
+        labels = synthetic_labels(frame_count, walk_frames=walk)
+        for name in BACKEND_NAMES:
+            detector = CameraDetector(backend=name)
+            flags = [detector.process_frame(f).pet_detected for f in frames]
+            positives = sum(labels) or 1
+            negatives = (len(labels) - sum(labels)) or 1
+            rows.append({
+                "clip": clip,
+                "backend": name,
+                "ms": detector.backend.stats()["ms_per_frame"],
+                "recall": sum(f and l for f, l in zip(flags, labels)) / positives,
+                "false_rate": sum(f and not l for f, l in zip(flags, labels)) / negatives,
+            })
+    return rows
+
+
+def _print_backend_rows(rows: List[dict]) -> None:
+    print(f"{'画面':<6}{'后端':<14}{'后端 ms/帧':>12}{'检出率':>10}{'误报率':>10}")
+    for r in rows:
+        print(f"{r['clip']:<6}{r['backend']:<14}{r['ms']:>12.3f}{r['recall']:>10.1%}{r['false_rate']:>10.1%}")
+
+
+def simulate_schedule(
+    scheduler: AdaptiveScheduler,
+    events: Sequence[Tuple[float, float]],
+    duration_s: float,
+    capture_fps: float = 30.0,
+    capture_lead_ms: Optional[int] = CAMERA_CAPTURE_LEAD_MS,
+) -> dict:
+    """按脚本化的运动时段 [(开始秒, 持续秒)] 模拟调度器，统计检测次数与每段运动的发现延迟，
+    以及采集线程的唤醒与抓帧次数（摄像头 capture_fps 帧/秒；capture_lead_ms 为 None 时采集不跟随调度、一直按帧率抓帧）。"""
+    t = 0.0
+    pending = sorted(events)
+    latencies = []
+    grabs = wakeups = 0.0
+    while t < duration_s:
+        active = [ev for ev in events if ev[0] <= t < ev[0] + ev[1]]
+        for ev in active:
+            if ev in pending:
+                latencies.append(t - ev[0])
+                pending.remove(ev)
+        interval_s = scheduler.on_result(bool(active), now=t) / 1000.0
+        if capture_lead_ms is None:
+            grabs += interval_s * capture_fps
+            wakeups += interval_s * capture_fps
+        else:
+            lead_s = capture_lead_ms / 1000.0
+            grabs += min(interval_s, lead_s) * capture_fps
+            wakeups += min(interval_s, lead_s) * capture_fps + (interval_s > lead_s)  # 休眠结束算一次唤醒
+        t += interval_s
+    return {
+        "detections": scheduler.detections,
+        "skipped": scheduler.skipped,
+        "max_latency_s": max(latencies) if latencies else 0.0,
+        "bound_s": scheduler.reaction_bound_ms / 1000.0,
+        "capture_grabs": int(grabs),
+        "capture_wakeups": int(wakeups),
+    }
+
+
+def run_schedule_bench(hours: float = 8.0) -> List[dict]:
+    """模拟一个工作日：每小时出现两次短暂运动，对比固定频率、自适应调度（采集线程是否跟随调度）的
+    检测次数、反应延迟与采集线程的唤醒 / 抓帧次数。"""
+    duration = hours * 3600.0
+    events = []
+    for h in range(int(hours)):
+        events.append((h * 3600.0 + 613.3, 20.0))
+        events.append((h * 3600.0 + 2417.9, 45.0))
+    rows = []
+    for label, scheduler, lead_ms in (
+        ("固定 1s", AdaptiveScheduler(floor_interval_ms=1000), None),
+        ("自适应", AdaptiveScheduler(), None),
+        ("自适应+采集跟随", AdaptiveScheduler(), CAMERA_CAPTURE_LEAD_MS),
+    ):
+        row = simulate_schedule(scheduler, events, duration, capture_lead_ms=lead_ms)
+        row["mode"] = label
+        row["per_hour"] = row["detections"] / hours
+        row["wakeups_per_hour"] = row["capture_wakeups"] / hours
+        row["grabs_per_hour"] = row["capture_grabs"] / hours
+        rows.append(row)
+    return rows
+
+
+def _print_schedule_rows(rows: List[dict]) -> None:
+    print(
+        f"{'调度':<16}{'检测次数/小时':>14}{'采集唤醒/小时':>14}{'抓帧/小时':>12}{'跳过次数':>10}"
+        f"{'最大发现延迟 s':>16}{'延迟上界 s':>12}"
+    )
+    for r in rows:
+        print(
+            f"{r['mode']:<16}{r['per_hour']:>14.0f}{r['wakeups_per_hour']:>14.0f}{r['grabs_per_hour']:>12.0f}"
+            f"{r['skipped']:>10}{r['max_latency_s']:>16.2f}{r['bound_s']:>12.1f}"
+        )
+
+
+def run_latency_bench(camera_index: int = 0, seconds: float = 10.0, interval_ms: int = 200) -> List[dict]:
+    """在真实摄像头上对比「驱动默认 + 逐帧 read」与「采集参数调优 + grab_only」：
+    采集→判定延迟、实际采集格式与进程 CPU 占用。摄像头不可用时对应行 ok 为 False。
+    """
+    from PyQt6.QtCore import QCoreApplication
+
+    from desktop_pet.camera.pipeline import CameraPipeline
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    configs = (
+        ("驱动默认", dict(capture_size=None, fourcc=None, buffer_size=None, grab_only=False)),
+        ("调优", {}),
+    )
+    rows = []
+    for label, options in configs:
+        detector = CameraDetector(camera_index=camera_index, interval_ms=interval_ms, **options)
+        # 固定频率、不空闲释放：只比较采集设置本身
+        pipeline = CameraPipeline(
+            detector,
+            scheduler=AdaptiveScheduler(base_interval_ms=interval_ms, floor_interval_ms=interval_ms),
+            idle_policy=IdleReleasePolicy(release_after_ms=10 ** 9),
+        )
+        results = []
+        pipeline.detectionReady.connect(results.append)
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        pipeline.start()
+        while time.perf_counter() - wall_start < seconds:
+            app.processEvents()
+            time.sleep(0.01)
+        stats = pipeline.stats()
+        pipeline.stop()
+        cpu = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start)
+        rows.append({
+            "mode": label,
+            "ok": any(r.captured_at > 0.0 for r in results),
+            "format": f"{stats.get('width', 0)}x{stats.get('height', 0)} {stats.get('fourcc', '') or '-'}",
+            "detections": len(results),
+            "p50_ms": stats["latency_p50_ms"],
+            "max_ms": stats["latency_max_ms"],
+            "cpu": cpu,
+        })
+    return rows
+
+
+def _print_latency_rows(rows: List[dict]) -> None:
+    print(f"{'采集设置':<10}{'格式':<18}{'检测次数':>8}{'延迟 p50 ms':>13}{'延迟 max ms':>13}{'CPU':>8}")
+    for r in rows:
+        if not r["ok"]:
+            print(f"{r['mode']:<10}摄像头不可用")
+            continue
+        print(f"{r['mode']:<10}{r['format']:<18}{r['detections']:>8}{r['p50_ms']:>13.1f}{r['max_ms']:>13.1f}{r['cpu']:>8.1%}")
+
+
+def run_tracking_bench(frame_count: int = 240, size: Tuple[int, int] = (640, 480)) -> dict:
+    """运动定位与跟踪（连通域分析）占整次检测耗时的比例：按全部检测平均，以及只在有运动的帧上
+    （定位耗时与同一批帧的检测耗时相比）。"""
+    frames = list(synthetic_frames(frame_count, size))
+    detector = CameraDetector()
+    detector.process_frame(frames[0])
+    detector.tracker.calls, detector.tracker.total_s = 0, 0.0
+    total_s = motion_s = 0.0
+    motion_frames = 0
+    for frame in frames[1:]:
+        start = time.perf_counter()
+        moved = detector.process_frame(frame).bbox is not None
+        elapsed = time.perf_counter() - start
+        total_s += elapsed
+        if moved:
+            motion_s += elapsed
+            motion_frames += 1
+    detect_ms = total_s * 1000.0 / (len(frames) - 1)
+    motion_detect_ms = motion_s * 1000.0 / motion_frames if motion_frames else 0.0
+    stats = detector.tracker.stats()
+    track_avg_ms = detector.tracker.total_s * 1000.0 / (len(frames) - 1)
+    return {
+        "detect_ms": detect_ms,
+        "motion_detect_ms": motion_detect_ms,
+        "track_ms": stats["track_ms"],
+        "track_calls": stats["track_calls"],
+        "motion_frames": motion_frames,
+        "share_avg": track_avg_ms / detect_ms if detect_ms else 0.0,
+        "share_motion": stats["track_ms"] / motion_detect_ms if motion_detect_ms else 0.0,
+    }
+
+
+def _print_tracking_row(row: dict) -> None:
+    print(f"整次检测 {row['detect_ms']:.3f} ms/帧（有运动的帧 {row['motion_detect_ms']:.3f} ms/帧）；定位 {row['track_ms']:.3f} ms/次（{row['track_calls']} 次，有运动 {row['motion_frames']} 帧）")
+    print(f"定位开销占比：按全部检测平均 {row['share_avg']:.1%}，有运动的帧上 {row['share_motion']:.1%}")
+
+
+def run_process_bench(frame_count: int = 200, size: Tuple[int, int] = (1280, 720)) -> List[dict]:
+    """各检测后端在本进程与子进程中检测时，本（界面）进程每帧消耗的 CPU 时间与每帧往返耗时。"""
+    from desktop_pet.camera.process_detector import ProcessCameraDetector
+
+    frames = list(synthetic_frames(min(frame_count, 40), size))
+    rows = []
+    for name in BACKEND_NAMES:
+        for label, cls in (("本进程", CameraDetector), ("子进程", ProcessCameraDetector)):
+            detector = cls(backend=name)
+            detector.process_frame(frames[0])  # 启动子进程、分配缓冲
+            cpu_start = time.process_time()
+            wall_start = time.perf_counter()
+            for i in range(frame_count):
+                detector.process_frame(frames[i % len(frames)])
+            rows.append({
+                "backend": name,
+                "mode": label,
+                "ui_cpu_ms": (time.process_time() - cpu_start) * 1000.0 / frame_count,
+                "wall_ms": (time.perf_counter() - wall_start) * 1000.0 / frame_count,
+            })
+            detector.close()
+    return rows
+
+
+def _print_process_rows(rows: List[dict]) -> None:
+    print(f"{'后端':<14}{'检测位置':<8}{'界面进程 CPU ms/帧':>20}{'耗时 ms/帧':>12}")
+    for r in rows:
+        print(f"{r['backend']:<14}{r['mode']:<8}{r['ui_cpu_ms']:>20.3f}{r['wall_ms']:>12.3f}")
+
+
+def run_profile_bench(frame_count: int = 300, size: Tuple[int, int] = (1280, 720), rounds: int = 5) -> dict:
+    """同一段合成画面分别在关闭 / 开启分段计时时逐帧 detect()（含读帧），比较单帧耗时（各取 rounds 轮中最快的一轮），
+    并给出开启时的分段计时快照。"""
+    frames = list(synthetic_frames(frame_count, size))
+    row = {}
+    for label, profile in (("off", False), ("on", True)):
+        best = float("inf")
+        for _ in range(rounds):
+            detector = CameraDetector(source=ArraySource(frames), profile=profile)
+            start = time.perf_counter()
+            for _ in range(frame_count):
+                detector.detect()
+            best = min(best, (time.perf_counter() - start) * 1000.0 / frame_count)
+            detector.release()
+        row[f"{label}_ms"] = best
+        if profile:
+            row["snapshot"] = detector.profiler.snapshot()
+    row["overhead"] = row["on_ms"] / row["off_ms"] - 1.0 if row["off_ms"] else 0.0
+    return row
+
+
+def _print_profile_row(row: dict) -> None:
+    print(format_snapshot(row["snapshot"]))
+    print(f"单帧耗时：关闭分段计时 {row['off_ms']:.3f} ms，开启 {row['on_ms']:.3f} ms（{row['overhead']:+.1%}）")
+
+
+def filter_metrics(flags: Sequence[bool], labels: Sequence[bool], interval_ms: int) -> dict:
+    """逐次检测结果（相邻两次相隔 interval_ms）的上升沿次数（即动效启动次数）、其中画面无猫时的误启动，
+    以及每次真实到达（真值上升沿）到结果为「有」的延迟；下一次到达前仍未检出的计为漏检。"""
+    flags, labels = list(flags), list(labels)
+    n = min(len(flags), len(labels))
+    starts = [i for i in range(n) if flags[i] and (i == 0 or not flags[i - 1])]
+    arrivals = [i for i in range(n) if labels[i] and (i == 0 or not labels[i - 1])]
+    delays_ms = []
+    for k, a in enumerate(arrivals):
+        end = arrivals[k + 1] if k + 1 < len(arrivals) else n
+        hit = next((j for j in range(a, end) if flags[j]), None)
+        if hit is not None:
+            delays_ms.append((hit - a) * interval_ms)
+    return {
+        "starts": len(starts),
+        "false_starts": sum(not labels[i] for i in starts),
+        "arrivals": len(arrivals),
+        "missed": len(arrivals) - len(delays_ms),
+        "delay_mean_ms": float(np.mean(delays_ms)) if delays_ms else 0.0,
+        "delay_max_ms": max(delays_ms) if delays_ms else 0.0,
+    }
+
+
+def run_filter_bench(
+    source: FrameSource,
+    labels: Optional[Sequence[bool]] = None,
+    interval_ms: int = 1000,
+    detection_filter: Optional[DetectionFilter] = None,
+) -> List[dict]:
+    """把帧源的每一帧当作一次检测（相隔 interval_ms），对比时间滤波前后的动效启动次数与到达延迟。
+
+    滤波的代价体现在到达延迟上：置信度低的到来要几次检测才确认，离开后 CAMERA_FILTER_MIN_OFF_MS 内再次到来也要等这段时间结束。
+    """
+    labels = list(labels) if labels is not None else source.labels
+    detector = CameraDetector(source=source)
+    detection_filter = detection_filter or DetectionFilter()
+    raw, filtered = [], []
+    while True:
+        result = detector.detect()
+        if result.message in ("摄像头不可用", "无法读取画面"):
+            break
+        raw.append(result.pet_detected)
+        filtered.append(detection_filter.update(result.pet_detected, result.confidence, now=len(raw) * interval_ms / 1000.0))
+    detector.release()
+    labels = labels or [False] * len(raw)
+    rows = []
+    for mode, flags in (("原始", raw), ("滤波", filtered)):
+        row = {"mode": mode, "detections": len(flags)}
+        row.update(filter_metrics(flags, labels, interval_ms))
+        rows.append(row)
+    return rows
+
+
+def _print_filter_rows(rows: List[dict]) -> None:
+    print(f"{'结果':<6}{'检测次数':>8}{'动效启动':>8}{'误启动':>8}{'到达':>6}{'漏检':>6}{'平均延迟 ms':>12}{'最大延迟 ms':>12}")
+    for r in rows:
+        print(f"{r['mode']:<6}{r['detections']:>8}{r['starts']:>8}{r['false_starts']:>8}{r['arrivals']:>6}{r['missed']:>6}"
+              f"{r['delay_mean_ms']:>12.0f}{r['delay_max_ms']:>12.0f}")
+
+
+def _print_rows(rows: List[dict]) -> None:
+    print(f"{'分辨率':<10}{'CPU ms/次':>12}{'耗时 ms/次':>12}{'一致率':>10}{'检出帧':>8}")
+    for r in rows:
+        print(f"{r['resolution']:<10}{r['cpu_ms']:>12.3f}{r['wall_ms']:>12.3f}{r['agreement']:>10.1%}{r['detected']:>8}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m desktop_pet.camera.bench", description="摄像头检测基准测试")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_detect = sub.add_parser("detect", help="对视频 / 图片目录 / 合成画面逐帧检测：帧率、耗时分位数、精确率与检出率")
+    p_detect.add_argument("--source", default="synthetic", help="synthetic、视频文件或图片目录")
+    p_detect.add_argument("--labels", default=None, help="真值文件（每行 0/1），缺省用帧源自带真值")
+    p_detect.add_argument("--backend", choices=BACKEND_NAMES, default="frame_diff")
+    p_detect.add_argument("--frames", type=int, default=None, help="最多处理的帧数")
+    p_detect.add_argument("--model", default=None, help="猫分类 ONNX 模型（有运动时第二级分类）")
+    p_detect.add_argument("--size", type=parse_size, default=(640, 480), help="合成画面尺寸")
+    p_res = sub.add_parser("resolution", help="对比不同处理分辨率的 CPU 与一致率")
+    p_res.add_argument("--frames", type=int, default=200)
+    p_res.add_argument("--size", type=parse_size, default=(1920, 1080), help="采集分辨率，如 1920x1080")
+    p_alloc = sub.add_parser("alloc", help="对比逐帧分配与复用缓冲的分配量与耗时")
+    p_alloc.add_argument("--frames", type=int, default=100, help="每轮每种模式的帧数")
+    p_alloc.add_argument("--size", type=parse_size, default=(1280, 720))
+    p_alloc.add_argument("--rounds", type=int, default=9)
+    p_backend = sub.add_parser("backends", help="对比各运动检测后端的耗时与检出效果")
+    p_backend.add_argument("--frames", type=int, default=240)
+    p_backend.add_argument("--size", type=parse_size, default=(640, 480))
+    p_sched = sub.add_parser("schedule", help="模拟自适应调度的检测次数与反应延迟")
+    p_sched.add_argument("--hours", type=float, default=8.0)
+    p_track = sub.add_parser("tracking", help="运动定位与跟踪占检测耗时的比例")
+    p_track.add_argument("--frames", type=int, default=240)
+    p_track.add_argument("--size", type=parse_size, default=(640, 480))
+    p_proc = sub.add_parser("process", help="对比本进程与子进程检测时界面进程的 CPU 占用")
+    p_proc.add_argument("--frames", type=int, default=200)
+    p_proc.add_argument("--size", type=parse_size, default=(1280, 720))
+    p_prof = sub.add_parser("profile", help="检测热路径各阶段耗时，以及分段计时本身的开销")
+    p_prof.add_argument("--frames", type=int, default=300)
+    p_prof.add_argument("--size", type=parse_size, default=(1280, 720))
+    p_filter = sub.add_parser("filter", help="对比时间滤波前后的动效启动次数与真实到达的检出延迟")
+    p_filter.add_argument("--source", default="synthetic", help="synthetic（含闪烁干扰）、视频文件或图片目录")
+    p_filter.add_argument("--labels", default=None, help="真值文件（每行 0/1），缺省用帧源自带真值")
+    p_filter.add_argument("--interval", type=int, default=1000, help="相邻两帧对应的检测间隔（毫秒）")
+    p_filter.add_argument("--frames", type=int, default=400, help="合成画面帧数")
+    p_lat = sub.add_parser("latency", help="真实摄像头上对比采集参数调优前后的采集→判定延迟与 CPU")
+    p_lat.add_argument("--camera", type=int, default=0)
+    p_lat.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    if args.command == "detect":
+        options = {"size": args.size} if args.source == "synthetic" else {}
+        try:
+            source = open_source(args.source, **options)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 2
+        labels = load_labels(args.labels) if args.labels else None
+        _print_detect_row(run_detect_bench(source, args.backend, labels, args.frames, args.model))
+    elif args.command == "resolution":
+        _print_rows(run_resolution_bench(args.frames, args.size))
+    elif args.command == "alloc":
+        _print_alloc_rows(run_alloc_bench(args.frames, args.size, args.rounds))
+    elif args.command == "backends":
+        _print_backend_rows(run_backend_bench(args.frames, args.size))
+    elif args.command == "schedule":
+        _print_schedule_rows(run_schedule_bench(args.hours))
+    elif args.command == "tracking":
+        _print_tracking_row(run_tracking_bench(args.frames, args.size))
+    elif args.command == "process":
+        _print_process_rows(run_process_bench(args.frames, args.size))
+    elif args.command == "profile":
+        _print_profile_row(run_profile_bench(args.frames, args.size))
+    elif args.command == "filter":
+        options = {"count": args.frames, "flicker": 0.15} if args.source == "synthetic" else {}
+        try:
+            source = open_source(args.source, **options)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 2
+        labels = load_labels(args.labels) if args.labels else None
+        _print_filter_rows(run_filter_bench(source, labels, args.interval))
+    elif args.command == "latency":
+        rows = run_latency_bench(args.camera, args.seconds)
+        _print_latency_rows(rows)
+        if not any(r["ok"] for r in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""猫分类器：运动检测之后的第二级，只在有运动时对运动区域做一次 OpenCV DNN（CPU）分类。
+
+模型为 ONNX 图像分类模型（如 ImageNet 分类网络），输出各类别的分数或概率；
+属于 cat_classes 的类别概率之和即「画面中有猫」的置信度。
+内容没有变化的运动区域（如反复晃动的同一块画面）命中缓存，不重复推理。
+"""
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Optional, Sequence, Tuple, Union
+
+from desktop_pet.config import (
+    CAMERA_CLASSIFIER_CAT_CLASSES,
+    CAMERA_CLASSIFIER_INPUT_SIZE,
+    CAMERA_CLASSIFIER_MEAN,
+    CAMERA_CLASSIFIER_SCALE,
+    CAMERA_CLASSIFIER_THRESHOLD,
+)
+
+# 缓存键的缩略图边长与灰度量化位数：画面噪声不改变键，内容变化才改变
+_CACHE_THUMB = 8
+_CACHE_SHIFT = 4
+# 统计「每分钟调用次数」的时间窗口（秒）
+_RATE_WINDOW_S = 60.0
+
+
+class CatClassifier:
+    """加载 ONNX 模型并给出「有猫」置信度；模型在 load() 或首次使用时加载，加载失败时 classify() 返回 None。"""
+
+    def __init__(
+        self,
+        model_path: Union[str, Path],
+        input_size: Tuple[int, int] = CAMERA_CLASSIFIER_INPUT_SIZE,
+        cat_classes: Sequence[int] = CAMERA_CLASSIFIER_CAT_CLASSES,
+        threshold: float = CAMERA_CLASSIFIER_THRESHOLD,
+        scale: float = CAMERA_CLASSIFIER_SCALE,
+        mean: Tuple[float, float, float] = CAMERA_CLASSIFIER_MEAN,
+        swap_rb: bool = True,
+        cache_size: int = 64,
+    ):
+        self.model_path = str(model_path)
+        self.input_size = tuple(input_size)
+        self.cat_classes = list(cat_classes)
+        self.threshold = threshold
+        self.scale = scale
+        self.mean = tuple(mean)
+        self.swap_rb = swap_rb
+        self.cache_size = max(0, cache_size)
+        self.error = ""  # 模型加载失败的原因
+        self._net = None
+        self._cache: "OrderedDict[bytes, float]" = OrderedDict()
+        self._call_times: deque = deque()
+        # 统计：实际推理次数、缓存命中次数、累计推理耗时
+        self.calls = 0
+        self.cache_hits = 0
+        self.total_s = 0.0
+
+    def load(self) -> bool:
+        """加载模型（已加载时直接返回）；失败时记录 error 并返回 False，之后不再重试。"""
+        if self._net is not None:
+            return True
+        if self.error:
+            return False
+        try:
+            import cv2
+            net = cv2.dnn.readNet(self.model_path)
+            # OpenCV 自带实现，默认在 CPU 上运行，不依赖 CUDA / OpenVINO
+            net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            self._net = net
+            return True
+        except Exception as e:
+            self.error = f"分类模型加载失败: {e}"
+            return False
+
+    def _cache_key(self, crop) -> bytes:
+        """区域尺寸 + 量化缩略图：尺寸或宽高比不同的区域即使缩略图相同也不共用结果。"""
+        import cv2
+        thumb = cv2.resize(crop, (_CACHE_THUMB, _CACHE_THUMB), interpolation=cv2.INTER_AREA)
+        shape = ",".join(map(str, crop.shape)).encode()
+        return shape + b":" + (thumb >> _CACHE_SHIFT).tobytes()
+
+    def _infer(self, crop) -> float:
+        import cv2
+        import numpy as np
+        blob = cv2.dnn.blobFromImage(crop, self.scale, self.input_size, self.mean, swapRB=self.swap_rb, crop=False)
+        self._net.setInput(blob)
+        scores = np.asarray(self._net.forward(), dtype=np.float64).reshape(-1)
+        if scores.min() < 0.0 or abs(scores.sum() - 1.0) > 1e-3:
+            # 输出是 logits：做 softmax 转为概率
+            scores = np.exp(scores - scores.max())
+            scores /= scores.sum()
+        return float(min(1.0, scores[self.cat_classes].sum()))
+
+    def classify(self, crop) -> Optional[float]:
+        """对 BGR 画面区域给出有猫的概率（0~1）；模型不可用或区域为空时返回 None。"""
+        if crop is None or crop.size == 0 or not self.load():
+            return None
+        key = self._cache_key(crop) if self.cache_size else None
+        if key is not None and key in self._cache:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return self._cache[key]
+        start = time.perf_counter()
+        try:
+            prob = self._infer(crop)
+        except Exception as e:
+            self.error = f"分类推理失败: {e}"
+            return None
+        self.total_s += time.perf_counter() - start
+        self.calls += 1
+        now = time.monotonic()
+        self._call_times.append(now)
+        self._trim_call_times(now)
+        if key is not None:
+            self._cache[key] = prob
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return prob
+
+    def _trim_call_times(self, now: float) -> None:
+        """只保留最近一分钟的推理时刻（每次推理都修剪，不依赖 stats() 被调用）。"""
+        while self._call_times and now - self._call_times[0] > _RATE_WINDOW_S:
+            self._call_times.popleft()
+
+    def stats(self, now: Optional[float] = None) -> dict:
+        """推理次数、最近一分钟推理次数、平均推理耗时（毫秒）与缓存命中次数。"""
+        self._trim_call_times(time.monotonic() if now is None else now)
+        return {
+            "classifier_calls": self.calls,
+            "classifier_calls_per_min": len(self._call_times),
+            "classifier_ms": self.total_s * 1000.0 / self.calls if self.calls else 0.0,
+            "classifier_cache_hits": self.cache_hits,
+        }
@@ -1,8 +1,47 @@
 """摄像头宠物检测（运动/轮廓检测，MVP 简化版；后续可接入目标检测模型）。"""
+import time
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Sequence, Tuple, Union
 
-from desktop_pet.config import CAMERA_INDEX, CAMERA_DETECT_INTERVAL_MS
+from desktop_pet.camera.backends import MotionBackend, create_backend
+from desktop_pet.camera.classifier import CatClassifier
+from desktop_pet.camera.profiling import StageProfiler
+from desktop_pet.camera.roi import Region, RoiGeometry, build_roi_geometry, normalize_regions
+from desktop_pet.camera.sources import FrameSource
+from desktop_pet.camera.tracking import Box, MotionTracker, Point
+from desktop_pet.config import (
+    CAMERA_BACKEND,
+    CAMERA_BUFFER_SIZE,
+    CAMERA_CAPTURE_SIZE,
+    CAMERA_CLASSIFIER_MODEL,
+    CAMERA_FOURCC,
+    CAMERA_GRAB_ONLY,
+    CAMERA_INDEX,
+    CAMERA_DETECT_INTERVAL_MS,
+    CAMERA_PROCESS_SIZE,
+    CAMERA_PROFILE,
+    CAMERA_REUSE_BUFFERS,
+    CAMERA_WARMUP_FRAMES,
+)
+
+# 原分辨率下的高斯模糊核与像素差分阈值（MVP 默认值）
+BLUR_KSIZE = 21
+DIFF_THRESHOLD = 25
+# 运动面积占比超过该值认为有「活物」（面积比例，与分辨率无关）
+MOTION_RATIO_THRESHOLD = 0.02
+# 运动检测的置信度 = min(1, 运动比例 × MOTION_CONFIDENCE_SCALE)；刚过阈值的检测置信度为 THRESHOLD_CONFIDENCE
+MOTION_CONFIDENCE_SCALE = 10.0
+THRESHOLD_CONFIDENCE = MOTION_RATIO_THRESHOLD * MOTION_CONFIDENCE_SCALE
+# 送分类器的运动区域向外扩展的比例（每边按区域宽高计），让猫的轮廓完整落在区域内
+CLASSIFIER_CROP_MARGIN = 0.15
+
+
+def scaled_blur_ksize(scale: float, base: int = BLUR_KSIZE) -> int:
+    """按缩放比例换算模糊核尺寸（保持奇数、至少 3），使缩小后的模糊覆盖原图中相同的区域。"""
+    k = int(round(base * scale))
+    if k % 2 == 0:
+        k += 1
+    return max(3, k)
 
 
 @dataclass
@@ -11,68 +50,427 @@ class DetectionResult:
     pet_detected: bool
     confidence: float  # 0~1
     message: str = ""
+    captured_at: float = 0.0  # 画面采集完成时刻（time.monotonic），0 表示未知
+    cat_confidence: Optional[float] = None  # 分类器给出的有猫概率；None 表示未运行分类器
+    # 运动位置（按整幅画面归一化到 0~1）：外接框 (x, y, w, h)、质心与平滑后的轨迹点；无运动时为 None
+    bbox: Optional[Box] = None
+    centroid: Optional[Point] = None
+    track: Optional[Point] = None
+    motion_ratio: float = 0.0  # 运动像素占检测区域的比例
+    # 时间滤波前的原始结果；None 表示未经滤波（此时 pet_detected 即原始结果）
+    raw_detected: Optional[bool] = None
 
 
 class CameraDetector:
-    """摄像头检测：通过运动/轮廓判断是否有「宠物」出现（MVP 用简单运动检测）。"""
+    """摄像头检测：通过运动/轮廓判断是否有「宠物」出现（MVP 用简单运动检测）。
+
+    采集（read_frame）与处理（process_frame）可分开调用：流水线模式下由采集线程读帧、
+    检测线程处理，detect() 仍保留「读一帧 + 处理」的同步用法。
+    profile 为 True 时按阶段（读帧、缩小、灰度、模糊、运动后端、计数、定位、分类）计时，见 profiler.snapshot()。
+    """
 
     def __init__(
         self,
         camera_index: int = CAMERA_INDEX,
         interval_ms: int = CAMERA_DETECT_INTERVAL_MS,
+        process_size: Optional[Tuple[int, int]] = CAMERA_PROCESS_SIZE,
+        diff_threshold: int = DIFF_THRESHOLD,
+        reuse_buffers: bool = CAMERA_REUSE_BUFFERS,
+        backend: Union[str, MotionBackend] = CAMERA_BACKEND,
+        warmup_frames: int = CAMERA_WARMUP_FRAMES,
+        capture_size: Optional[Tuple[int, int]] = CAMERA_CAPTURE_SIZE,
+        fourcc: Optional[str] = CAMERA_FOURCC,
+        buffer_size: Optional[int] = CAMERA_BUFFER_SIZE,
+        grab_only: bool = CAMERA_GRAB_ONLY,
+        roi: Optional[Sequence[Region]] = None,
+        source: Optional[FrameSource] = None,
+        classifier: Union[None, str, CatClassifier] = CAMERA_CLASSIFIER_MODEL,
+        profile: bool = CAMERA_PROFILE,
     ):
         self.camera_index = camera_index
+        self.source = source  # 非 None 时用该帧源（视频文件 / 图片目录 / 合成画面）代替摄像头
+        if isinstance(classifier, str):
+            classifier = CatClassifier(classifier)
+        self.classifier: Optional[CatClassifier] = classifier  # 有运动时的第二级猫分类
+        self.tracker = MotionTracker()  # 运动外接框 / 质心与平滑轨迹
+        self.profiler: Optional[StageProfiler] = StageProfiler() if profile else None  # 分段计时，None 为关闭
+        self.read_failures = 0  # 摄像头已打开但读帧 / 抓帧 / 解码失败的次数
         self.interval_ms = interval_ms
+        self.process_size = tuple(process_size) if process_size else None
+        self.diff_threshold = diff_threshold
+        self.reuse_buffers = reuse_buffers
+        if isinstance(backend, str):
+            backend = create_backend(backend, diff_threshold, reuse_buffers)
+        self.backend = backend
+        self.warmup_frames = max(0, warmup_frames)
+        self.capture_size = tuple(capture_size) if capture_size else None
+        self.fourcc = fourcc
+        self.buffer_size = buffer_size
+        self.grab_only = grab_only
+        self.capture_info: dict = {}  # 打开后驱动实际生效的采集参数
+        self.roi = normalize_regions(roi)  # 检测区域（归一化多边形），空表示整幅画面
+        self._roi_geom: Optional[RoiGeometry] = None  # 当前分辨率下的裁剪框与掩码
         self._cap = None
+        # 每次打开摄像头 +1；检测线程发现变化后重置背景模型（在处理线程内重置，避免与 apply 并发）
+        self._open_generation = 0
+        self._model_generation = 0
+        # 打开 / 释放耗时统计（毫秒）
+        self.open_count = 0
+        self.close_count = 0
+        self.last_open_ms = 0.0
+        self.last_warmup_ms = 0.0
+        self.last_close_ms = 0.0
+        # 按输入画面尺寸缓存的处理几何：(输入 h, w) -> (输出 w, h, 模糊核)
+        self._geom_key: Optional[Tuple[int, int]] = None
+        self._geom: Optional[Tuple[int, int, int]] = None
+        # reuse_buffers 模式下的中间结果缓冲，每种分辨率只分配一次（见 _preprocess_reuse）
+        self._bufs: Optional[dict] = None
+        self._capture_buf = None  # detect() 同步读帧时复用的采集缓冲
+
+    def _open_capture(self):
+        """创建采集对象并按配置设置分辨率、像素格式与驱动缓冲；设置了 source 时打开该帧源。"""
+        if self.source is not None:
+            return self.source.open()
+        import cv2
+        cap = cv2.VideoCapture(self.camera_index)
+        if cap is None or not cap.isOpened():
+            return cap
+        # 先设像素格式再设分辨率：部分驱动只在 MJPG 下提供高分辨率 / 高帧率
+        if self.fourcc:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+        if self.capture_size:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.capture_size[0])
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.capture_size[1])
+        if self.buffer_size:
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+        self.capture_info = {
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fourcc": "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)) if fourcc else "",
+            "buffer_size": int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+        }
+        return cap
 
     def _ensure_cap(self):
         try:
-            import cv2
             if self._cap is None or not self._cap.isOpened():
-                self._cap = cv2.VideoCapture(self.camera_index)
-            return self._cap is not None and self._cap.isOpened()
+                start = time.perf_counter()
+                self._cap = self._open_capture()
+                if self._cap is None or not self._cap.isOpened():
+                    return False
+                opened = time.perf_counter()
+                # 丢弃预热帧：刚打开时自动曝光尚未收敛，画面亮度剧烈变化会被误判为运动
+                # 帧源不是传感器，没有曝光收敛问题，不丢帧（保持与真值逐帧对齐）
+                for _ in range(self.warmup_frames if self.source is None else 0):
+                    if not self._cap.grab():
+                        break
+                self.last_open_ms = (opened - start) * 1000.0
+                self.last_warmup_ms = (time.perf_counter() - opened) * 1000.0
+                self.open_count += 1
+                self._open_generation += 1
+            return True
         except Exception:
             return False
 
-    def detect(self) -> DetectionResult:
-        """执行一次检测。若有明显运动则认为可能有宠物。"""
+    def is_open(self) -> bool:
+        return self._cap is not None
+
+    @property
+    def open_generation(self) -> int:
+        """摄像头累计打开次数；每次重开后背景模型会在下一帧处理时重置。"""
+        return self._open_generation
+
+    def model_ready(self) -> bool:
+        """背景模型已针对当前这次打开建立，下一帧能给出可信结果。"""
+        return self._model_generation == self._open_generation and self.backend.ready
+
+    def read_frame(self, image=None):
+        """从摄像头读取一帧（BGR ndarray）；摄像头不可用或读取失败时返回 None。
+
+        传入 image 时通过 cap.read(image) 直接解码到该缓冲（尺寸不符时由 OpenCV 重新分配）。
+        """
         if not self._ensure_cap():
-            return DetectionResult(
-                pet_detected=False,
-                confidence=0.0,
-                message="摄像头不可用",
-            )
+            return None
+        prof = self.profiler
+        start = time.perf_counter() if prof is not None else 0.0
+        try:
+            if image is not None:
+                ret, frame = self._cap.read(image)
+            else:
+                ret, frame = self._cap.read()
+        except Exception:
+            ret, frame = False, None
+        if prof is not None:
+            prof.record("read", time.perf_counter() - start)
+        if not ret or frame is None:
+            self.read_failures += 1
+            return None
+        return frame
+
+    def grab_frame(self) -> bool:
+        """只抓取一帧不解码（配合 retrieve_frame 使用）；摄像头不可用或失败时返回 False。"""
+        if not self._ensure_cap():
+            return False
+        prof = self.profiler
+        start = time.perf_counter() if prof is not None else 0.0
+        try:
+            ok = bool(self._cap.grab())
+        except Exception:
+            ok = False
+        if prof is not None:
+            prof.record("grab", time.perf_counter() - start)
+        if not ok:
+            self.read_failures += 1
+        return ok
+
+    def retrieve_frame(self, image=None):
+        """解码最近一次 grab_frame() 抓取的帧；失败时返回 None。"""
+        if self._cap is None:
+            return None
+        prof = self.profiler
+        start = time.perf_counter() if prof is not None else 0.0
+        try:
+            if image is not None:
+                ret, frame = self._cap.retrieve(image)
+            else:
+                ret, frame = self._cap.retrieve()
+        except Exception:
+            ret, frame = False, None
+        if prof is not None:
+            prof.record("retrieve", time.perf_counter() - start)
+        if not ret or frame is None:
+            self.read_failures += 1
+            return None
+        return frame
+
+    def _geometry(self, frame_h: int, frame_w: int) -> Tuple[int, int, int]:
+        """计算处理尺寸与模糊核：等比缩小到 process_size 以内（不放大），模糊核按同一比例缩放。
+
+        缩小（INTER_AREA 区域平均）与缩放后的模糊核合起来覆盖原图中同样大小的区域，
+        噪声被平均的程度基本不变，因此像素差分阈值与运动面积比例阈值无需随分辨率调整。
+
+        设置了检测区域时按整幅画面的比例缩小裁剪框，返回裁剪框的处理尺寸：区域越小处理越快。
+        """
+        key = (frame_h, frame_w)
+        if self._geom_key == key and self._geom is not None:
+            return self._geom
+        if self.process_size:
+            max_w, max_h = self.process_size
+            scale = min(1.0, max_w / frame_w, max_h / frame_h)
+        else:
+            scale = 1.0
+        out_w = max(1, int(round(frame_w * scale)))
+        out_h = max(1, int(round(frame_h * scale)))
+        self._roi_geom = build_roi_geometry(self.roi, frame_w, frame_h, scale)
+        if self._roi_geom is not None:
+            out_w, out_h = self._roi_geom.size
+        self._geom_key = key
+        self._geom = (out_w, out_h, scaled_blur_ksize(scale))
+        # 分辨率变化后背景模型尺寸不再匹配，重新初始化
+        self.reset_model()
+        return self._geom
+
+    def reset_model(self) -> None:
+        """丢弃背景模型、运动轨迹与预处理缓冲；下一帧重新建模，首帧不报运动。"""
+        self.backend.reset()
+        self.tracker.reset()
+        self._bufs = None
+
+    def set_roi(self, regions: Optional[Sequence[Region]]) -> None:
+        """更换检测区域；下一帧按新区域重新计算裁剪框与掩码并重建背景模型。"""
+        self.roi = normalize_regions(regions)
+        self._geom_key = None
+
+    def _preprocess_alloc(self, frame, out_w: int, out_h: int, ksize: int):
+        """逐帧新建数组的预处理：缩小、灰度、模糊。"""
+        import cv2
+        prof = self.profiler
+        if (out_w, out_h) != (frame.shape[1], frame.shape[0]):
+            # 采集后立即缩小：后续灰度、模糊、差分都在小图上进行
+            frame = cv2.resize(frame, (out_w, out_h), interpolation=cv2.INTER_AREA)
+            if prof is not None:
+                prof.lap("resize")
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if prof is not None:
+            prof.lap("gray")
+        blur = cv2.GaussianBlur(gray, (ksize, ksize), 0)
+        if prof is not None:
+            prof.lap("blur")
+        return blur
+
+    def _preprocess_reuse(self, frame, out_w: int, out_h: int, ksize: int):
+        """复用缓冲的预处理：各步骤经 dst 参数写入预分配数组，模糊结果直接写入后端的输入缓冲。"""
+        import cv2
+        import numpy as np
+        resize = (out_w, out_h) != (frame.shape[1], frame.shape[0])
+        bufs = self._bufs
+        if bufs is None:
+            bufs = self._bufs = {
+                "small": np.empty((out_h, out_w, 3), np.uint8) if resize else None,
+                "gray": np.empty((out_h, out_w), np.uint8),
+                "blur": np.empty((out_h, out_w), np.uint8),
+                "roi": np.empty((out_h, out_w), np.uint8),
+            }
+        prof = self.profiler
+        src = frame
+        if resize:
+            src = cv2.resize(frame, (out_w, out_h), dst=bufs["small"], interpolation=cv2.INTER_AREA)
+            if prof is not None:
+                prof.lap("resize")
+        cv2.cvtColor(src, cv2.COLOR_BGR2GRAY, dst=bufs["gray"])
+        if prof is not None:
+            prof.lap("gray")
+        dst = self.backend.input_buffer((out_h, out_w))
+        if dst is None:
+            dst = bufs["blur"]
+        blur = cv2.GaussianBlur(bufs["gray"], (ksize, ksize), 0, dst=dst)
+        if prof is not None:
+            prof.lap("blur")
+        return blur
+
+    def process_frame(self, frame) -> DetectionResult:
+        """对一帧画面做运动检测；不涉及摄像头 I/O，可在检测线程中调用。"""
         try:
             import cv2
             import numpy as np
-            ret, frame = self._cap.read()
-            if not ret or frame is None:
-                return DetectionResult(False, 0.0, "无法读取画面")
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            gray = cv2.GaussianBlur(gray, (21, 21), 0)
-            if not hasattr(self, "_prev_frame") or self._prev_frame is None:
-                self._prev_frame = gray
-                return DetectionResult(False, 0.0, "初始化")
-            diff = cv2.absdiff(self._prev_frame, gray)
-            self._prev_frame = gray
-            thresh = cv2.threshold(diff, 25, 255, cv2.THRESH_BINARY)[1]
-            motion_ratio = float(np.sum(thresh > 0)) / (thresh.shape[0] * thresh.shape[1])
+            if self._model_generation != self._open_generation:
+                # 摄像头重开过：旧背景与新画面不可比，重新建模，首帧不报运动
+                self._model_generation = self._open_generation
+                self.reset_model()
+            frame_h, frame_w = frame.shape[:2]
+            out_w, out_h, ksize = self._geometry(frame_h, frame_w)
+            prof = self.profiler
+            if prof is not None:
+                prof.start()
+            roi = self._roi_geom
+            pixels = out_w * out_h
+            region = (0, 0, frame_w, frame_h)
+            if roi is not None:
+                region = roi.crop
+                # 只处理检测区域的包围盒（视图，不拷贝）
+                x0, y0, x1, y1 = roi.crop
+                frame = frame[y0:y1, x0:x1]
+                pixels = roi.pixels
+            if self.reuse_buffers:
+                gray = self._preprocess_reuse(frame, out_w, out_h, ksize)
+                mask = self.backend.process(gray)
+                if prof is not None:
+                    prof.lap("motion")
+                if mask is None:
+                    return DetectionResult(False, 0.0, "初始化")
+                if roi is not None and roi.mask is not None:
+                    # 包围盒内区域外的像素不计入运动
+                    mask = cv2.bitwise_and(mask, roi.mask, dst=self._bufs["roi"])
+                motion_ratio = cv2.countNonZero(mask) / float(pixels)
+            else:
+                gray = self._preprocess_alloc(frame, out_w, out_h, ksize)
+                mask = self.backend.process(gray)
+                if prof is not None:
+                    prof.lap("motion")
+                if mask is None:
+                    return DetectionResult(False, 0.0, "初始化")
+                if roi is not None and roi.mask is not None:
+                    mask = cv2.bitwise_and(mask, roi.mask)
+                motion_ratio = float(np.sum(mask > 0)) / pixels
+            if prof is not None:
+                prof.lap("count")
             # 运动面积超过一定比例认为有「活物」
-            pet_detected = motion_ratio > 0.02
-            confidence = min(1.0, motion_ratio * 10.0)
+            pet_detected = motion_ratio > MOTION_RATIO_THRESHOLD
+            confidence = min(1.0, motion_ratio * MOTION_CONFIDENCE_SCALE)
+            # 只在有运动的帧上定位：外接框与质心（相对检测区域），换算到整幅画面
+            located = self.tracker.locate(mask) if pet_detected else None
+            bbox = centroid = None
+            if located is not None:
+                (bx, by, bw, bh), (cx, cy) = located
+                x0, y0 = self._to_frame_point(bx, by, region, frame_w, frame_h)
+                rw, rh = region[2] - region[0], region[3] - region[1]
+                bbox = (x0, y0, bw * rw / frame_w, bh * rh / frame_h)
+                centroid = self._to_frame_point(cx, cy, region, frame_w, frame_h)
+            track = self.tracker.update(centroid)
+            if prof is not None:
+                prof.lap("track")
+            motion = dict(motion_ratio=motion_ratio, bbox=bbox, centroid=centroid, track=track)
+            if located is not None and self.classifier is not None:
+                # 第二级：只在有运动时对运动区域分类，分类器不可用时退回纯运动检测
+                cat = self.classifier.classify(self._motion_crop(frame, located[0]))
+                if prof is not None:
+                    prof.lap("classify")
+                if cat is not None:
+                    is_cat = cat >= self.classifier.threshold
+                    message = "检测到猫" if is_cat else "有运动但不像猫"
+                    return DetectionResult(is_cat, cat, message, cat_confidence=cat, **motion)
             return DetectionResult(
                 pet_detected=pet_detected,
                 confidence=confidence,
                 message="运动检测" if pet_detected else "无显著运动",
+                **motion,
             )
         except Exception as e:
             return DetectionResult(False, 0.0, str(e))
 
+    @staticmethod
+    def _to_frame_point(x: float, y: float, region: Tuple[int, int, int, int], frame_w: int, frame_h: int) -> Point:
+        """检测区域内的归一化坐标换算为整幅画面的归一化坐标。"""
+        x0, y0, x1, y1 = region
+        return (x0 + x * (x1 - x0)) / frame_w, (y0 + y * (y1 - y0)) / frame_h
+
+    @staticmethod
+    def _motion_crop(frame, box: Box):
+        """运动外接框（相对检测区域归一化）换算回（裁剪后的）原画面，按 CLASSIFIER_CROP_MARGIN 外扩，返回视图。"""
+        fh, fw = frame.shape[:2]
+        x, y, w, h = box
+        mx, my = w * CLASSIFIER_CROP_MARGIN, h * CLASSIFIER_CROP_MARGIN
+        x0, y0 = max(0, int((x - mx) * fw)), max(0, int((y - my) * fh))
+        x1 = min(fw, int((x + w + mx) * fw + 0.5))
+        y1 = min(fh, int((y + h + my) * fh + 0.5))
+        return frame[y0:y1, x0:x1]
+
+    def classifier_stats(self) -> dict:
+        """分类器推理次数、每分钟次数、耗时与缓存命中；未启用分类器时为空。"""
+        return self.classifier.stats() if self.classifier is not None else {}
+
+    def detect(self) -> DetectionResult:
+        """执行一次检测。若有明显运动则认为可能有宠物。"""
+        if not self._ensure_cap():
+            return DetectionResult(
+                pet_detected=False,
+                confidence=0.0,
+                message="摄像头不可用",
+            )
+        frame = self.read_frame(self._capture_buf if self.reuse_buffers else None)
+        if frame is None:
+            return DetectionResult(False, 0.0, "无法读取画面")
+        captured_at = time.monotonic()
+        if self.reuse_buffers:
+            self._capture_buf = frame
+        result = self.process_frame(frame)
+        result.captured_at = captured_at
+        return result
+
     def release(self) -> None:
         """释放摄像头。"""
         if self._cap is not None:
+            start = time.perf_counter()
             try:
                 self._cap.release()
             except Exception:
                 pass
             self._cap = None
+            self.last_close_ms = (time.perf_counter() - start) * 1000.0
+            self.close_count += 1
+
+    def close(self) -> None:
+        """不再使用检测器时调用：释放摄像头及检测器持有的其他资源。"""
+        self.release()
+
+    def camera_stats(self) -> dict:
+        """摄像头打开 / 释放次数与最近一次耗时（毫秒；open_ms 不含预热帧）、读帧失败次数。"""
+        return {
+            "read_failures": self.read_failures,
+            "opens": self.open_count,
+            "closes": self.close_count,
+            "open_ms": self.last_open_ms,
+            "warmup_ms": self.last_warmup_ms,
+            "close_ms": self.last_close_ms,
+        }
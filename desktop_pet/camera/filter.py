@@ -0,0 +1,85 @@
+"""检测结果的时间滤波：置信度指数平滑 + 开 / 关双阈值（滞回）+ 最短保持时间。
+
+运动比例在阈值附近抖动时，原始结果会反复在有 / 无之间跳变，每次跳变都会重启动效播放。
+滤波后只有持续、明显的变化才改变状态；真正出现的猫在几次检测内即被确认，延迟有上界。
+"""
+import time
+from typing import Optional
+
+from desktop_pet.camera.detector import THRESHOLD_CONFIDENCE
+from desktop_pet.config import (
+    CAMERA_FILTER_ALPHA,
+    CAMERA_FILTER_MIN_DWELL_MS,
+    CAMERA_FILTER_MIN_OFF_MS,
+    CAMERA_FILTER_OFF,
+    CAMERA_FILTER_ON_RATIO,
+)
+
+
+class DetectionFilter:
+    """对逐次检测的置信度做 EMA，超过 on_threshold 进入「有」，低于 off_threshold 回到「无」；
+    进入「有」后至少保持 min_dwell_ms、回到「无」后至少保持 min_off_ms 才允许再次切换。
+
+    on_threshold 缺省为刚过运动阈值的检测置信度的 CAMERA_FILTER_ON_RATIO 倍（见 config），
+    因此原始结果持续为「有」时一定会确认，不会因滤波而漏报。
+
+    统计原始结果与滤波结果的上升沿次数（raw_edges / filtered_edges），即动效被触发的次数。
+    """
+
+    def __init__(
+        self,
+        alpha: float = CAMERA_FILTER_ALPHA,
+        on_threshold: Optional[float] = None,
+        off_threshold: float = CAMERA_FILTER_OFF,
+        min_dwell_ms: int = CAMERA_FILTER_MIN_DWELL_MS,
+        min_off_ms: Optional[int] = CAMERA_FILTER_MIN_OFF_MS,
+    ):
+        self.alpha = min(1.0, max(0.0, alpha))
+        self.on_threshold = THRESHOLD_CONFIDENCE * CAMERA_FILTER_ON_RATIO if on_threshold is None else on_threshold
+        self.off_threshold = min(off_threshold, self.on_threshold)
+        self.min_dwell_ms = max(0, int(min_dwell_ms))
+        # None 时与 min_dwell_ms 相同
+        self.min_off_ms = self.min_dwell_ms if min_off_ms is None else max(0, int(min_off_ms))
+        self.level = 0.0  # 平滑后的置信度
+        self.active = False
+        self.raw_edges = 0
+        self.filtered_edges = 0
+        self._raw_last = False
+        self._changed_at: Optional[float] = None
+
+    def update(self, detected: bool, confidence: float, now: Optional[float] = None) -> bool:
+        """输入一次原始检测结果，返回滤波后的「是否检测到」。"""
+        now = time.monotonic() if now is None else now
+        if detected and not self._raw_last:
+            self.raw_edges += 1
+        self._raw_last = detected
+        # 原始结果为「无」时按 0 计入，避免无运动帧的残余置信度托住状态
+        self.level += self.alpha * ((confidence if detected else 0.0) - self.level)
+        dwell_ms = self.min_dwell_ms if self.active else self.min_off_ms
+        dwelling = (
+            self._changed_at is not None
+            and (now - self._changed_at) * 1000.0 < dwell_ms
+        )
+        if not dwelling:
+            if not self.active and self.level >= self.on_threshold:
+                self.active = True
+                self.filtered_edges += 1
+                self._changed_at = now
+            elif self.active and self.level < self.off_threshold:
+                self.active = False
+                self._changed_at = now
+        return self.active
+
+    def reset(self) -> None:
+        """清空平滑状态（摄像头释放后重开时调用）；边沿统计保留。"""
+        self.level = 0.0
+        self.active = False
+        self._raw_last = False
+        self._changed_at = None
+
+    def stats(self) -> dict:
+        return {
+            "raw_edges": self.raw_edges,
+            "filtered_edges": self.filtered_edges,
+            "filter_level": self.level,
+        }
@@ -0,0 +1,529 @@
+"""摄像头检测流水线：采集线程只保留最新一帧，检测线程按间隔处理，结果经 Qt 信号回到 GUI 线程。
+
+慢速或卡住的摄像头只会阻塞采集线程，不会给绘制、拖拽等 GUI 事件增加延迟。
+长时间无检测或窗口不可见时释放摄像头（见 IdleReleasePolicy），需要时再快速重开。
+采集线程跟随检测调度：只在下一次检测前的一小段时间（CAMERA_CAPTURE_LEAD_MS）里抓帧，静止退避时不再按摄像头帧率唤醒。
+grab_only 模式下采集线程每帧只 grab() 保持驱动缓冲新鲜，检测线程取帧时才 retrieve() 解码。
+发出的结果先经时间滤波（见 DetectionFilter），调度与空闲释放仍按原始结果及时响应。
+给出 timeline 时每次检测结果追加到检测时间线（只进内存队列，由其后台线程落盘）。
+检测器开启分段计时时，另记录整次处理（process）与采集→界面更新（end_to_end，见 mark_delivered）耗时。
+"""
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional
+
+from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal
+
+from desktop_pet.camera.detector import CameraDetector, DetectionResult
+from desktop_pet.camera.filter import DetectionFilter
+from desktop_pet.camera.scheduler import AdaptiveScheduler, IdleReleasePolicy
+from desktop_pet.camera.profiling import format_snapshot
+from desktop_pet.config import (
+    CAMERA_CAPTURE_LEAD_MS,
+    CAMERA_FILTER_ENABLED,
+    CAMERA_PROBE_GAP_MS,
+    CAMERA_PROFILE_DUMP_S,
+)
+from desktop_pet.health.timeline import TimelineWriter
+
+# 摄像头不可用时采集线程的重试间隔（秒）
+_REOPEN_RETRY_S = 1.0
+# 摄像头释放期间采集线程检查是否恢复的间隔（秒）
+_SUSPENDED_POLL_S = 0.5
+# 探测时等待重开后第一帧的最长时间（秒），含打开与预热
+_PROBE_FRAME_TIMEOUT_S = 5.0
+# 一次探测最多处理的帧数（背景模型需要几帧才能就绪）
+_PROBE_MAX_FRAMES = 8
+# stop() 等待线程退出的最长时间（毫秒）；摄像头驱动卡死时不无限阻塞 GUI
+_STOP_WAIT_MS = 2000
+# 采集→判定延迟统计保留的最近样本数
+_LATENCY_SAMPLES = 200
+
+# stop() 超时仍未退出的线程：保留引用，避免 QThread 在运行中被析构导致进程崩溃
+_lingering_threads: List[QThread] = []
+
+
+class LatestFrameSlot:
+    """单槽帧缓冲：新帧直接覆盖旧帧，读取方永远拿到最新画面，不会排队积压。
+
+    被覆盖的旧帧与读取方用完的帧回收进空闲池，采集方用 spare() 取回作为下一次
+    cap.read(image) 的目标缓冲：稳定后只在三块缓冲间轮转（写入中 / 最新 / 处理中），不再分配。
+    读取方拿到的帧在下一次 take() 之前归其独占。
+
+    读取方在 take() 中等待时 wanted 置位，采集方据此决定是否解码当前帧（grab_only 模式）。
+    读取方用 schedule() 告知下一次取帧的时刻，采集方在 wait_until_due() 中休眠到该时刻之前。
+    dropped 为未被取走就被新帧覆盖（或被 clear() 丢弃）的帧数。
+    """
+    _POOL_LIMIT = 2
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None    # 尚未被取走的最新帧
+        self._frame_ts = 0.0
+        self._waiting = 0
+        self.taken_at = 0.0   # 最近一次 take() 所取帧的采集时刻（time.monotonic）
+        self._reading = None  # 读取方当前持有的帧
+        self._pool: List[object] = []
+        self._closed = False
+        self._due = 0.0  # 读取方下一次取帧的时刻（time.monotonic），0 表示随时
+        self.dropped = 0
+
+    def _recycle(self, buf) -> None:
+        if buf is not None and len(self._pool) < self._POOL_LIMIT:
+            self._pool.append(buf)
+
+    def spare(self):
+        """取一块空闲缓冲给采集方写入；没有时返回 None（由 OpenCV 新分配）。"""
+        with self._cond:
+            return self._pool.pop() if self._pool else None
+
+    def recycle(self, buf) -> None:
+        """采集失败时归还 spare() 取出的缓冲。"""
+        with self._cond:
+            self._recycle(buf)
+
+    @property
+    def wanted(self) -> bool:
+        """读取方正在等待新帧。"""
+        return self._waiting > 0
+
+    def schedule(self, due: float) -> None:
+        """读取方告知下一次取帧的时刻；提前时立即唤醒等待中的采集方。"""
+        with self._cond:
+            self._due = due
+            self._cond.notify_all()
+
+    def wait_until_due(self, lead_s: float) -> bool:
+        """采集方：距下一次取帧还早时等待，直到只剩 lead_s 秒（或时刻提前、已关闭）；返回是否等待过。"""
+        waited = False
+        with self._cond:
+            while not self._closed:
+                remaining = self._due - lead_s - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+                waited = True
+        return waited
+
+    def put(self, frame, timestamp: Optional[float] = None) -> None:
+        """写入新帧；timestamp 为采集完成时刻，缺省取当前时间。"""
+        with self._cond:
+            if self._frame is not None:
+                self.dropped += 1
+            self._recycle(self._frame)
+            self._frame = frame
+            self._frame_ts = time.monotonic() if timestamp is None else timestamp
+            self._cond.notify_all()
+
+    def take(self, timeout: float):
+        """等待一帧尚未取过的新帧并取走；超时或已关闭时返回 None。"""
+        with self._cond:
+            self._waiting += 1
+            try:
+                self._cond.wait_for(lambda: self._frame is not None or self._closed, timeout)
+            finally:
+                self._waiting -= 1
+            if self._closed or self._frame is None:
+                return None
+            self._recycle(self._reading)
+            self._reading = self._frame
+            self.taken_at = self._frame_ts
+            self._frame = None
+            return self._reading
+
+    def clear(self) -> None:
+        """丢弃尚未取走的帧（摄像头释放时调用，避免重开后读到旧画面）。"""
+        with self._cond:
+            if self._frame is not None:
+                self.dropped += 1
+            self._recycle(self._frame)
+            self._frame = None
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._frame = None
+            self._reading = None
+            self._pool.clear()
+            self._cond.notify_all()
+
+
+class CaptureThread(QThread):
+    """采集线程：独占摄像头。active 置位时读帧写入单槽缓冲，清除时释放摄像头；退出时释放。
+
+    只在检测线程下一次取帧前 lead_ms 内读帧，其余时间休眠（见 LatestFrameSlot.wait_until_due）。
+    检测器 grab_only 时每帧只 grab()，仅当检测线程在等帧时才 retrieve() 解码写入缓冲。
+    """
+
+    def __init__(
+        self,
+        detector: CameraDetector,
+        slot: LatestFrameSlot,
+        stop_event: threading.Event,
+        active: threading.Event,
+        lead_ms: int = CAMERA_CAPTURE_LEAD_MS,
+    ):
+        super().__init__()
+        self._detector = detector
+        self._slot = slot
+        self._stop = stop_event
+        self._active = active
+        self._lead_s = max(0, lead_ms) / 1000.0
+        # 统计：循环唤醒次数（每次阻塞返回算一次）与 grab / read 次数
+        self.wakeups = 0
+        self.grabs = 0
+
+    def run(self) -> None:
+        try:
+            reuse = self._detector.reuse_buffers
+            grab_only = self._detector.grab_only
+            while not self._stop.is_set():
+                self.wakeups += 1
+                if not self._active.is_set():
+                    if self._detector.is_open():
+                        self._detector.release()
+                        self._slot.clear()
+                    self._active.wait(_SUSPENDED_POLL_S)
+                    continue
+                if self._slot.wait_until_due(self._lead_s):
+                    continue  # 重新检查停止与释放
+                self.grabs += 1
+                if grab_only:
+                    # grab() 按摄像头帧率阻塞，顺带把驱动缓冲里的旧帧取空
+                    if not self._detector.grab_frame():
+                        self._stop.wait(_REOPEN_RETRY_S)
+                        continue
+                    captured_at = time.monotonic()
+                    if not self._slot.wanted:
+                        continue
+                    buf = self._slot.spare() if reuse else None
+                    frame = self._detector.retrieve_frame(buf)
+                else:
+                    buf = self._slot.spare() if reuse else None
+                    frame = self._detector.read_frame(buf)
+                    captured_at = time.monotonic()
+                if frame is None:
+                    self._slot.recycle(buf)
+                    # 摄像头不可用或读帧失败：稍后重试，不忙等
+                    self._stop.wait(_REOPEN_RETRY_S)
+                    continue
+                self._slot.put(frame, captured_at)
+        finally:
+            self._detector.release()
+
+
+class DetectionThread(QThread):
+    """检测线程：按调度器给出的间隔取最新帧做一次检测，通过 detectionReady 发出结果。
+
+    空闲策略判定应释放摄像头时暂停采集；释放期间按策略定期探测，窗口重新可见时立即恢复。
+    窗口看不见时按调度器最慢的空闲间隔检测（时间线仍有记录），重新可见时立即检测一次并回到基础频率。
+    """
+    detectionReady = pyqtSignal(object)  # DetectionResult
+
+    def __init__(
+        self,
+        detector: CameraDetector,
+        slot: LatestFrameSlot,
+        stop_event: threading.Event,
+        wake: threading.Event,
+        active: threading.Event,
+        scheduler: AdaptiveScheduler,
+        idle_policy: IdleReleasePolicy,
+        visible_getter: Callable[[], bool],
+        latencies_ms: Optional[deque] = None,
+        detection_filter: Optional[DetectionFilter] = None,
+        timeline: Optional[TimelineWriter] = None,
+    ):
+        super().__init__()
+        self._detector = detector
+        self._slot = slot
+        self._stop = stop_event
+        self._wake = wake
+        self._active = active
+        self._scheduler = scheduler
+        self._idle = idle_policy
+        self._visible = visible_getter
+        # 采集→判定延迟样本（毫秒）：由流水线传入以便线程重启后保留
+        self.latencies_ms = latencies_ms if latencies_ms is not None else deque(maxlen=_LATENCY_SAMPLES)
+        self._filter = detection_filter
+        self._timeline = timeline
+
+    def _sleep(self, seconds: Optional[float]) -> None:
+        """睡眠直到超时、被唤醒（可见性变化）或停止；seconds 为 None 时一直等到被唤醒。"""
+        self._wake.wait(seconds)
+        self._wake.clear()
+
+    def _detect_once(self, timeout_s: float) -> DetectionResult:
+        # 被提前唤醒（如窗口重新可见）时采集方可能还在休眠：告诉它现在就要帧
+        self._slot.schedule(0.0)
+        frame = self._slot.take(timeout=timeout_s)
+        if frame is None:
+            # 一个检测周期内没有新帧：按摄像头不可用处理，让窗口能退出「眼睛一亮」
+            return DetectionResult(False, 0.0, "摄像头不可用")
+        return self._process(frame)
+
+    def _process(self, frame) -> DetectionResult:
+        prof = self._detector.profiler
+        start = time.perf_counter() if prof is not None else 0.0
+        result = self._detector.process_frame(frame)
+        if prof is not None:
+            prof.record("process", time.perf_counter() - start)
+        result.captured_at = self._slot.taken_at
+        self.latencies_ms.append((time.monotonic() - result.captured_at) * 1000.0)
+        return result
+
+    def _emit(self, result: DetectionResult) -> None:
+        """经时间滤波后发出结果；原始结果保留在 raw_detected。"""
+        if self._filter is not None:
+            result.raw_detected = result.pet_detected
+            result.pet_detected = self._filter.update(result.pet_detected, result.confidence)
+        if self._timeline is not None:
+            self._timeline.record(result)
+        self.detectionReady.emit(result)
+
+    def _probe(self) -> Optional[DetectionResult]:
+        """短暂重开摄像头取几帧，直到背景模型就绪后给出一次结果。"""
+        generation = self._detector.open_generation
+        self._slot.schedule(0.0)
+        self._active.set()
+        result = None
+        for _ in range(_PROBE_MAX_FRAMES):
+            # 重开后检测器会重置背景模型：只有重开之后、处理前模型已就绪的那一帧结果才可信
+            was_ready = self._detector.open_generation != generation and self._detector.model_ready()
+            frame = self._slot.take(timeout=_PROBE_FRAME_TIMEOUT_S)
+            if frame is None or self._stop.is_set():
+                break
+            result = self._process(frame)
+            if was_ready or result.pet_detected:
+                break
+            self._stop.wait(CAMERA_PROBE_GAP_MS / 1000.0)
+        return result
+
+    def _suspend_capture(self) -> None:
+        """让采集线程释放摄像头；它可能正休眠到下一次检测前，先唤醒。"""
+        self._active.clear()
+        self._slot.schedule(0.0)
+
+    def _run_released(self) -> None:
+        """摄像头已释放：等到探测时刻（窗口不可见时一直等到可见），探测无运动则再次释放。"""
+        wait_s = self._idle.seconds_until_probe()
+        if wait_s is None or wait_s > 0:
+            self._sleep(wait_s)
+            return
+        result = self._probe()
+        if self._stop.is_set():
+            return
+        self._idle.on_probe(bool(result and result.pet_detected))
+        if result is not None:
+            self._emit(result)
+        if self._idle.released:
+            self._suspend_capture()
+        else:
+            self._scheduler.reset()
+
+    def run(self) -> None:
+        # 等待新帧的最长时间：一个基础检测周期
+        frame_timeout_s = self._scheduler.base_interval_ms / 1000.0
+        while not self._stop.is_set():
+            visible = self._visible()
+            if visible and not self._idle.visible:
+                self._scheduler.reset()
+            self._idle.set_visible(visible)
+            if self._idle.released:
+                self._run_released()
+                continue
+            if not self._active.is_set():
+                # 窗口重新可见，策略已恢复常开：重开摄像头并回到基础频率
+                self._active.set()
+                self._scheduler.reset()
+            started = time.monotonic()
+            result = self._detect_once(frame_timeout_s)
+            if self._stop.is_set():
+                break
+            detected = result.pet_detected
+            self._emit(result)
+            self._idle.on_result(detected)
+            if self._idle.should_release():
+                self._idle.mark_released()
+                self._suspend_capture()
+                if self._filter is not None:
+                    self._filter.reset()  # 重开后从头平滑，不沿用释放前的状态
+                continue
+            # 下一次检测的间隔由调度器决定：静止时退避，有运动立即恢复
+            interval_s = self._scheduler.on_result(detected, visible=self._idle.visible) / 1000.0
+            self._slot.schedule(started + interval_s)
+            remaining = started + interval_s - time.monotonic()
+            if remaining > 0:
+                self._sleep(remaining)
+
+
+class CameraPipeline(QObject):
+    """采集 + 检测两个后台线程的外观；detectionReady 在 GUI 线程中发出。"""
+    detectionReady = pyqtSignal(object)  # DetectionResult
+
+    def __init__(
+        self,
+        detector: CameraDetector,
+        interval_ms: Optional[int] = None,
+        parent: Optional[QObject] = None,
+        scheduler: Optional[AdaptiveScheduler] = None,
+        idle_policy: Optional[IdleReleasePolicy] = None,
+        detection_filter: Optional[DetectionFilter] = None,
+        timeline: Optional[TimelineWriter] = None,
+        capture_lead_ms: int = CAMERA_CAPTURE_LEAD_MS,
+    ):
+        super().__init__(parent)
+        self._detector = detector
+        self.capture_lead_ms = capture_lead_ms
+        if scheduler is None:
+            base = interval_ms if interval_ms is not None else detector.interval_ms
+            scheduler = AdaptiveScheduler(base_interval_ms=base)
+        self.scheduler = scheduler
+        self.idle_policy = idle_policy or IdleReleasePolicy()
+        if detection_filter is None and CAMERA_FILTER_ENABLED:
+            detection_filter = DetectionFilter()
+        self.detection_filter = detection_filter
+        self.timeline = timeline
+        self._visible = True
+        self._slot: Optional[LatestFrameSlot] = None
+        self._stop_event: Optional[threading.Event] = None
+        self._wake: Optional[threading.Event] = None
+        self._active: Optional[threading.Event] = None
+        self._capture_thread: Optional[CaptureThread] = None
+        self._detect_thread: Optional[DetectionThread] = None
+        self._latencies = deque(maxlen=_LATENCY_SAMPLES)
+        self._frames_dropped = 0  # 已停止的流水线累计的丢帧数
+        self._capture_wakeups = 0  # 已停止的采集线程累计的唤醒与读帧次数
+        self._capture_grabs = 0
+        self._dump_timer: Optional[QTimer] = None
+        if detector.profiler is not None and CAMERA_PROFILE_DUMP_S > 0:
+            # 定期把分段计时快照输出到 stderr
+            self._dump_timer = QTimer(self)
+            self._dump_timer.setInterval(int(CAMERA_PROFILE_DUMP_S * 1000))
+            self._dump_timer.timeout.connect(self._dump_profile)
+
+    def is_running(self) -> bool:
+        return self._detect_thread is not None
+
+    def set_visible(self, visible: bool) -> None:
+        """窗口可见性变化（由 PetWindow.visibilityChanged 驱动）；重新可见时立即恢复摄像头。"""
+        self._visible = bool(visible)
+        if self._wake is not None:
+            self._wake.set()
+
+    def mark_delivered(self, result: DetectionResult) -> None:
+        """界面已按该结果更新（在 GUI 线程中于 update_detection 之后调用）：记录采集→界面更新的端到端耗时。"""
+        prof = self._detector.profiler
+        if prof is not None and result.captured_at > 0.0:
+            prof.record("end_to_end", time.monotonic() - result.captured_at)
+
+    def profile_snapshot(self) -> dict:
+        """分段计时快照（见 StageProfiler.snapshot）；检测器未开启分段计时时为空。"""
+        prof = self._detector.profiler
+        if prof is None:
+            return {}
+        out = prof.snapshot()
+        out["counters"].update({
+            "read_failures": self._detector.read_failures,
+            "frames_dropped": self.frames_dropped,
+        })
+        return out
+
+    def _dump_profile(self) -> None:
+        print(f"[桌宠-摄像头] 分段计时\n{format_snapshot(self.profile_snapshot())}", file=sys.stderr, flush=True)
+
+    @property
+    def frames_dropped(self) -> int:
+        """采集到但未被检测线程取走就被覆盖的帧数（检测跟不上采集时增加）。"""
+        return self._frames_dropped + (self._slot.dropped if self._slot is not None else 0)
+
+    @property
+    def capture_wakeups(self) -> int:
+        thread = self._capture_thread
+        return self._capture_wakeups + (thread.wakeups if thread is not None else 0)
+
+    @property
+    def capture_grabs(self) -> int:
+        thread = self._capture_thread
+        return self._capture_grabs + (thread.grabs if thread is not None else 0)
+
+    def stats(self) -> dict:
+        """调度（当前间隔、已检测 / 跳过次数、反应上界）、采集线程唤醒与读帧次数、空闲释放、摄像头开关耗时、分类器、
+        时间滤波前后的上升沿次数、时间线写入与采集→判定延迟。"""
+        out = dict(self.scheduler.stats())
+        out.update(self.idle_policy.stats())
+        out.update(self._detector.camera_stats())
+        out.update(self._detector.capture_info)
+        out.update(self._detector.classifier_stats())
+        out["frames_dropped"] = self.frames_dropped
+        out["capture_wakeups"] = self.capture_wakeups
+        out["capture_grabs"] = self.capture_grabs
+        if self.detection_filter is not None:
+            out.update(self.detection_filter.stats())
+        if self.timeline is not None:
+            out.update(self.timeline.stats())
+        samples = sorted(self._latencies)
+        out["latency_p50_ms"] = samples[len(samples) // 2] if samples else 0.0
+        out["latency_max_ms"] = samples[-1] if samples else 0.0
+        return out
+
+    def start(self) -> None:
+        """启动采集与检测线程（已启动时忽略）。"""
+        if self.is_running():
+            return
+        self._slot = LatestFrameSlot()
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()
+        self._active = threading.Event()
+        self._active.set()
+        # 线程不设 parent：由本对象持有引用，stop() 超时时可单独保留，避免随窗口析构
+        self._capture_thread = CaptureThread(
+            self._detector, self._slot, self._stop_event, self._active, self.capture_lead_ms
+        )
+        self._detect_thread = DetectionThread(
+            self._detector,
+            self._slot,
+            self._stop_event,
+            self._wake,
+            self._active,
+            self.scheduler,
+            self.idle_policy,
+            lambda: self._visible,
+            self._latencies,
+            self.detection_filter,
+            self.timeline,
+        )
+        # 信号转发到本对象：跨线程自动排队，detectionReady 总在 GUI 线程发出
+        self._detect_thread.detectionReady.connect(self.detectionReady)
+        self._capture_thread.start()
+        self._detect_thread.start()
+        if self._dump_timer is not None:
+            self._dump_timer.start()
+
+    def stop(self) -> None:
+        """停止线程；摄像头由采集线程退出时释放。"""
+        if not self.is_running():
+            return
+        self._stop_event.set()
+        self._wake.set()
+        self._active.set()  # 唤醒处于释放等待中的采集线程
+        self._slot.close()
+        for thread in (self._detect_thread, self._capture_thread):
+            if not thread.wait(_STOP_WAIT_MS):
+                # 多半是 cap.read() 卡在驱动里：保留引用，待其自行退出
+                _lingering_threads.append(thread)
+                thread.finished.connect(lambda t=thread: _lingering_threads.remove(t))
+        self._detect_thread.detectionReady.disconnect(self.detectionReady)
+        if self._dump_timer is not None:
+            self._dump_timer.stop()
+        self._frames_dropped += self._slot.dropped
+        self._capture_wakeups += self._capture_thread.wakeups
+        self._capture_grabs += self._capture_thread.grabs
+        self._capture_thread = None
+        self._detect_thread = None
+        self._slot = None
+        self._stop_event = None
+        self._wake = None
+        self._active = None
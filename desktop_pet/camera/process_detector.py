@@ -0,0 +1,262 @@
+"""子进程检测：预处理与运动检测在独立进程中进行，不与 GUI 线程争抢 GIL 与同一个核心。
+
+画面经 multiprocessing.shared_memory 传给子进程（一次内存拷贝，不做 pickle），
+请求与结果只是几个数字组成的小元组，经 Pipe 往返。子进程启动后先导入 OpenCV、加载分类模型，
+再回报就绪；只有等待就绪使用较长的启动超时。子进程崩溃或卡死时终止并在下一帧自动重启；
+连续失败时按指数退避延后重启，退避期间直接返回错误结果，不再每帧重新创建进程。
+"""
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+from typing import Optional
+
+from desktop_pet.camera.detector import CameraDetector, DetectionResult
+from desktop_pet.config import CAMERA_WORKER_TIMEOUT_MS
+
+# 子进程刚启动时等待就绪的最长时间（秒）：含进程启动、导入 OpenCV 与加载分类模型
+_STARTUP_TIMEOUT_S = 20.0
+# 子进程就绪后回报的消息
+_READY = "ready"
+# 正常关闭时等待子进程退出的最长时间（秒），超时则强制终止
+_JOIN_TIMEOUT_S = 1.0
+# 连续失败时重启子进程的退避：第二次失败后等 _RESTART_BACKOFF_S，之后每次翻倍，最长 _RESTART_BACKOFF_MAX_S
+_RESTART_BACKOFF_S = 1.0
+_RESTART_BACKOFF_MAX_S = 60.0
+
+
+def _worker_main(conn, options: dict) -> None:
+    """子进程入口：准备好后回报 _READY，再循环接收 (序号, 共享内存名, 画面形状, 打开代数)，
+    处理后回传结果元组；收到 None 退出。"""
+    import cv2  # noqa: F401  启动时导入，首帧不再承担导入耗时
+    import numpy as np
+    detector = CameraDetector(**options)
+    if detector.classifier is not None:
+        # 分类模型在就绪前加载：首次分类不会超出每帧的超时（加载失败时 classify() 返回 None）
+        detector.classifier.load()
+    conn.send(_READY)
+    shm = None
+    generation = None
+    try:
+        while True:
+            try:
+                msg = conn.recv()
+            except EOFError:
+                break  # 父进程已退出
+            if msg is None:
+                break
+            seq, name, shape, open_generation = msg
+            if shm is None or shm.name != name:
+                if shm is not None:
+                    shm.close()
+                # spawn 子进程与父进程共用 resource_tracker，由父进程负责 unlink
+                shm = shared_memory.SharedMemory(name=name)
+            if open_generation != generation:
+                # 摄像头重开过：与进程内检测一致，重建背景模型并清空运动轨迹与缓冲
+                generation = open_generation
+                detector.reset_model()
+            frame = np.ndarray(shape, np.uint8, buffer=shm.buf)
+            result = detector.process_frame(frame)
+            del frame  # 释放对共享内存的引用，之后才能 close()
+            conn.send((
+                seq,
+                result.pet_detected,
+                result.confidence,
+                result.message,
+                result.cat_confidence,
+                (result.motion_ratio, result.bbox, result.centroid, result.track),
+                detector.backend.ready,
+                detector.classifier_stats() if result.cat_confidence is not None else None,
+            ))
+    finally:
+        if shm is not None:
+            shm.close()
+
+
+class ProcessCameraDetector(CameraDetector):
+    """把 process_frame() 交给子进程的检测器；摄像头仍在本进程（采集线程）中读取。
+
+    子进程按需启动（首帧或 start_worker()），用 spawn 方式创建，不继承 Qt 线程状态。
+    检测后端与分类器只能按名称 / 模型路径指定（子进程内重新创建）。不再使用时调用 close() 结束子进程并释放共享内存。
+    """
+
+    def __init__(self, *args, timeout_ms: int = CAMERA_WORKER_TIMEOUT_MS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timeout_ms = timeout_ms
+        self._ctx = multiprocessing.get_context("spawn")
+        self._proc = None
+        self._conn = None
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._seq = 0
+        self._fresh = False
+        self._restart = False  # 检测区域变化：由检测线程在下一帧前重启子进程
+        self._remote_generation: Optional[int] = None
+        self._remote_ready = False
+        self._remote_classifier_stats = super().classifier_stats()
+        # 子进程统计：启动次数、异常（崩溃 / 超时）次数、往返耗时
+        self.worker_starts = 0
+        self.worker_failures = 0
+        self.worker_frames = 0
+        self._worker_total_s = 0.0
+        self._failures_in_row = 0  # 连续失败次数，成功处理一帧后清零
+        self._retry_at = 0.0       # 退避结束时刻（time.monotonic）
+        self._last_error = ""
+
+    def _worker_options(self) -> dict:
+        return {
+            "process_size": self.process_size,
+            "diff_threshold": self.diff_threshold,
+            "reuse_buffers": self.reuse_buffers,
+            "backend": self.backend.name,
+            "roi": self.roi,
+            "classifier": self.classifier.model_path if self.classifier is not None else None,
+            "profile": False,  # 子进程内不分段计时：本进程按整次往返记为 process 阶段
+        }
+
+    def worker_alive(self) -> bool:
+        return self._proc is not None and self._proc.is_alive()
+
+    def start_worker(self) -> None:
+        """启动检测子进程（已在运行时忽略）。"""
+        if self.worker_alive():
+            return
+        self._stop_worker(graceful=False)
+        parent_conn, child_conn = self._ctx.Pipe()
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self._worker_options()),
+            name="desktop-pet-detector",
+            daemon=True,
+        )
+        proc.start()
+        child_conn.close()
+        self._proc, self._conn = proc, parent_conn
+        self._fresh = True
+        self._remote_generation = None
+        self._remote_ready = False
+        self.worker_starts += 1
+
+    def _stop_worker(self, graceful: bool = True) -> None:
+        proc, conn = self._proc, self._conn
+        self._proc = self._conn = None
+        if proc is None:
+            return
+        if graceful:
+            try:
+                conn.send(None)
+            except Exception:
+                pass
+            proc.join(_JOIN_TIMEOUT_S)
+        if proc.is_alive():
+            proc.kill()
+            proc.join(_JOIN_TIMEOUT_S)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _shared_frame(self, frame):
+        """把画面拷进共享内存（不够大时重新创建）；返回共享内存名。"""
+        import numpy as np
+        if self._shm is None or self._shm.size < frame.nbytes:
+            self._close_shm()
+            self._shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+        view = np.ndarray(frame.shape, np.uint8, buffer=self._shm.buf)
+        np.copyto(view, frame)
+        del view
+        return self._shm.name
+
+    def _close_shm(self) -> None:
+        if self._shm is not None:
+            try:
+                self._shm.close()
+                self._shm.unlink()
+            except Exception:
+                pass
+            self._shm = None
+
+    def set_roi(self, regions) -> None:
+        """更换检测区域；可在 GUI 线程调用，子进程由检测线程在处理下一帧前按新区域重启。"""
+        super().set_roi(regions)
+        self._restart = True
+
+    def model_ready(self) -> bool:
+        return self._remote_generation == self._open_generation and self._remote_ready
+
+    def process_frame(self, frame) -> DetectionResult:
+        """把一帧交给子进程检测并等待结果；子进程异常时终止它，本帧返回未检测到，之后自动重启（连续失败时退避）。"""
+        if self._restart:
+            self._restart = False
+            self._stop_worker()
+        if not self.worker_alive():
+            if self._proc is not None:
+                self._stop_worker(graceful=False)
+                self._on_failure("子进程已退出")  # 子进程在两帧之间崩溃
+            if time.monotonic() < self._retry_at:
+                return DetectionResult(False, 0.0, self._last_error)
+            self.start_worker()
+        start = time.perf_counter()
+        generation = self._open_generation
+        try:
+            if self._fresh:
+                if not self._conn.poll(_STARTUP_TIMEOUT_S) or self._conn.recv() != _READY:
+                    raise TimeoutError("检测进程启动超时")
+                self._fresh = False
+            name = self._shared_frame(frame)
+            self._seq += 1
+            self._conn.send((self._seq, name, frame.shape, generation))
+            timeout_s = self.timeout_ms / 1000.0
+            while True:
+                if not self._conn.poll(timeout_s):
+                    raise TimeoutError("检测进程无响应")
+                seq, detected, confidence, message, cat, motion, ready, classifier_stats = self._conn.recv()
+                if seq == self._seq:
+                    break
+        except Exception as e:
+            self._stop_worker(graceful=False)
+            self._on_failure(str(e) or type(e).__name__)
+            return DetectionResult(False, 0.0, self._last_error)
+        self._failures_in_row = 0
+        self._remote_generation = generation
+        self._remote_ready = ready
+        if classifier_stats is not None:
+            self._remote_classifier_stats = classifier_stats
+        self.worker_frames += 1
+        self._worker_total_s += time.perf_counter() - start
+        motion_ratio, bbox, centroid, track = motion
+        return DetectionResult(
+            detected,
+            confidence,
+            message,
+            cat_confidence=cat,
+            motion_ratio=motion_ratio,
+            bbox=bbox,
+            centroid=centroid,
+            track=track,
+        )
+
+    def _on_failure(self, reason: str) -> None:
+        """记录一次子进程失败；连续失败时按指数退避推迟下一次重启（首次失败仍在下一帧重启）。"""
+        self.worker_failures += 1
+        self._failures_in_row += 1
+        self._last_error = f"检测进程异常：{reason}"
+        if self._failures_in_row > 1:
+            delay = min(_RESTART_BACKOFF_MAX_S, _RESTART_BACKOFF_S * 2 ** (self._failures_in_row - 2))
+            self._retry_at = time.monotonic() + delay
+
+    def classifier_stats(self) -> dict:
+        """子进程中分类器的统计（随每次分类结果回传）。"""
+        return self._remote_classifier_stats
+
+    def camera_stats(self) -> dict:
+        out = super().camera_stats()
+        out.update({
+            "worker_starts": self.worker_starts,
+            "worker_failures": self.worker_failures,
+            "worker_ms": self._worker_total_s * 1000.0 / self.worker_frames if self.worker_frames else 0.0,
+        })
+        return out
+
+    def close(self) -> None:
+        super().close()
+        self._stop_worker()
+        self._close_shm()
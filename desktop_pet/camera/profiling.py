@@ -0,0 +1,106 @@
+"""检测热路径分段计时：每个阶段一个定长对数直方图，记录一次只做几次整数运算，不分配内存。
+
+检测器的 profiler 为 None（默认）时热路径上只多一次 is None 判断；开启后可随时 snapshot()
+查看各阶段次数、平均、p50 / p99、最大耗时与计数器（读帧失败、丢帧等）。
+"""
+import math
+import time
+from typing import Dict, List
+
+# 直方图分桶：第 0 桶为 <1 µs，之后每 2 倍耗时分 _BINS_PER_OCTAVE 个桶，最后一桶收纳更慢的样本
+_BINS_PER_OCTAVE = 4
+_BIN_COUNT = 100  # 覆盖到 2^(99/4) µs ≈ 27 s
+
+
+class StageHistogram:
+    """单个阶段的耗时分布。"""
+    __slots__ = ("counts", "count", "total_s", "max_s")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * _BIN_COUNT
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    def add(self, seconds: float) -> None:
+        us = seconds * 1e6
+        i = int(math.log2(us) * _BINS_PER_OCTAVE) + 1 if us >= 1.0 else 0
+        self.counts[min(i, _BIN_COUNT - 1)] += 1
+        self.count += 1
+        self.total_s += seconds
+        if seconds > self.max_s:
+            self.max_s = seconds
+
+    def percentile(self, q: float) -> float:
+        """第 q 百分位耗时（毫秒），取所在桶的上界。"""
+        if not self.count:
+            return 0.0
+        target = q / 100.0 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= target:
+                return min(2.0 ** (i / _BINS_PER_OCTAVE), self.max_s * 1e6) / 1000.0
+        return self.max_s * 1000.0
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.total_s * 1000.0 / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_s * 1000.0,
+        }
+
+
+class StageProfiler:
+    """按阶段名累计耗时直方图与计数器。
+
+    - record(stage, seconds)：记录一次耗时（可在任意线程调用，不同阶段互不干扰）
+    - start() / lap(stage)：检测线程内连续分段计时，lap 记录距上一次 start / lap 的耗时
+    - incr(name)：计数器加一
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, StageHistogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._last = 0.0
+
+    def record(self, stage: str, seconds: float) -> None:
+        hist = self._stages.get(stage)
+        if hist is None:
+            hist = self._stages[stage] = StageHistogram()
+        hist.add(seconds)
+
+    def start(self) -> None:
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.record(stage, now - self._last)
+        self._last = now
+
+    def incr(self, name: str, n: int = 1) -> None:
+        self._counters[name] = self._counters.get(name, 0) + n
+
+    def reset(self) -> None:
+        self._stages = {}
+        self._counters = {}
+
+    def snapshot(self) -> dict:
+        """各阶段的次数 / 平均 / p50 / p99 / 最大耗时（毫秒）与计数器。"""
+        return {
+            "stages": {name: hist.summary() for name, hist in list(self._stages.items())},
+            "counters": dict(self._counters),
+        }
+
+
+def format_snapshot(snapshot: dict) -> str:
+    """把 snapshot() 排成便于阅读的多行文本。"""
+    lines = [f"{'阶段':<12}{'次数':>8}{'平均 ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'最大 ms':>10}"]
+    for name, s in snapshot.get("stages", {}).items():
+        lines.append(f"{name:<12}{s['count']:>8}{s['mean_ms']:>10.3f}{s['p50_ms']:>10.3f}{s['p99_ms']:>10.3f}{s['max_ms']:>10.3f}")
+    counters = snapshot.get("counters", {})
+    if counters:
+        lines.append("计数：" + "，".join(f"{k} {v}" for k, v in counters.items()))
+    return "\n".join(lines)
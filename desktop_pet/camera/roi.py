@@ -0,0 +1,111 @@
+"""检测区域（ROI）：只在画面中指定的矩形 / 多边形区域内检测运动。
+
+区域坐标按画面宽高归一化到 0~1，与采集分辨率无关。检测器按分辨率把区域换算成
+裁剪框（只处理包围盒内的像素）与掩码（包围盒内不属于任何区域的像素不计入运动占比），
+每种分辨率只计算一次。
+"""
+import json
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from desktop_pet.config import CAMERA_ROI_DIR, ensure_dirs
+
+# 一个区域：归一化坐标的多边形顶点 [(x, y), ...]
+Region = List[Tuple[float, float]]
+
+
+def rect_region(x: float, y: float, w: float, h: float) -> Region:
+    """矩形区域（归一化左上角与宽高）转为多边形顶点。"""
+    return [(x, y), (x + w, y), (x + w, y + h), (x, y + h)]
+
+
+def normalize_regions(regions: Optional[Sequence[Sequence[Sequence[float]]]]) -> List[Region]:
+    """整理区域列表：坐标裁剪到 0~1，丢弃不足 3 个顶点的区域。"""
+    out: List[Region] = []
+    for region in regions or ():
+        points = [(min(1.0, max(0.0, float(x))), min(1.0, max(0.0, float(y)))) for x, y in region]
+        if len(points) >= 3:
+            out.append(points)
+    return out
+
+
+class RoiGeometry:
+    """某一输入分辨率下的 ROI 换算结果。
+
+    - crop：原画面中的裁剪框 (x0, y0, x1, y1)，只有这部分参与缩小与检测
+    - size：裁剪框缩小后的处理尺寸 (宽, 高)
+    - mask：处理分辨率下裁剪框内的区域掩码（0/255）；区域恰好填满裁剪框时为 None
+    - pixels：掩码内参与计数的像素数（motion_ratio 的分母）
+    """
+
+    def __init__(self, crop: Tuple[int, int, int, int], size: Tuple[int, int], mask, pixels: int):
+        self.crop = crop
+        self.size = size
+        self.mask = mask
+        self.pixels = pixels
+
+
+def build_roi_geometry(
+    regions: Sequence[Region],
+    frame_w: int,
+    frame_h: int,
+    scale: float,
+) -> Optional[RoiGeometry]:
+    """按输入尺寸与缩放比例计算裁剪框与掩码；区域为空或面积为 0 时返回 None（使用整幅画面）。"""
+    import cv2
+    import numpy as np
+    if not regions:
+        return None
+    xs = [x * frame_w for region in regions for x, _ in region]
+    ys = [y * frame_h for region in regions for _, y in region]
+    x0, y0 = max(0, int(min(xs))), max(0, int(min(ys)))
+    x1, y1 = min(frame_w, int(np.ceil(max(xs)))), min(frame_h, int(np.ceil(max(ys))))
+    if x1 <= x0 or y1 <= y0:
+        return None
+    out_w = max(1, int(round((x1 - x0) * scale)))
+    out_h = max(1, int(round((y1 - y0) * scale)))
+    mask = np.zeros((out_h, out_w), np.uint8)
+    polys = [
+        np.array(
+            [[(x * frame_w - x0) * out_w / (x1 - x0), (y * frame_h - y0) * out_h / (y1 - y0)] for x, y in region],
+            dtype=np.int32,
+        )
+        for region in regions
+    ]
+    cv2.fillPoly(mask, polys, 255)
+    pixels = cv2.countNonZero(mask)
+    if pixels == 0:
+        return None
+    if pixels == out_w * out_h:
+        mask = None  # 区域填满裁剪框（如单个矩形），无需逐帧按位与
+    return RoiGeometry((x0, y0, x1, y1), (out_w, out_h), mask, pixels)
+
+
+class RoiStore:
+    """按用户保存检测区域（JSON 文件，每个用户一个）。"""
+
+    def __init__(self, base_dir: Optional[Path] = None):
+        self.base_dir = base_dir or CAMERA_ROI_DIR
+        ensure_dirs()
+
+    def _path(self, user_id: str) -> Path:
+        return self.base_dir / f"{user_id}.json"
+
+    def load(self, user_id: str) -> List[Region]:
+        """读取用户的检测区域；未设置或文件损坏时返回空列表（检测整幅画面）。"""
+        path = self._path(user_id)
+        if not path.exists():
+            return []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return normalize_regions(data.get("regions"))
+        except Exception:
+            return []
+
+    def save(self, user_id: str, regions: Sequence[Region]) -> None:
+        """保存用户的检测区域；传入空列表表示恢复检测整幅画面。"""
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        data = {"regions": [[list(p) for p in region] for region in normalize_regions(regions)]}
+        with open(self._path(user_id), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,168 @@
+"""自适应检测调度：画面长时间静止时逐步放慢检测频率，一旦检测到运动立即恢复；长时间空闲时释放摄像头。"""
+import time
+from typing import Optional
+
+from desktop_pet.config import (
+    CAMERA_BACKOFF_FACTOR,
+    CAMERA_DETECT_INTERVAL_MS,
+    CAMERA_IDLE_INTERVAL_MS,
+    CAMERA_IDLE_PROBE_INTERVAL_MS,
+    CAMERA_IDLE_RELEASE_MIN,
+    CAMERA_QUIET_AFTER_MS,
+)
+
+
+class AdaptiveScheduler:
+    """根据检测结果给出下一次检测前的等待间隔。
+
+    - 检测到运动：间隔立即回到 base_interval_ms
+    - 连续 quiet_after_ms 未检测到运动：每次检测后间隔乘以 backoff，直到 floor_interval_ms
+    - 窗口看不见：直接按 floor_interval_ms 检测（只为时间线留记录，没有需要反应的画面）
+
+    反应时间上界：运动开始后最迟 floor_interval_ms（再加一次检测耗时）即被发现，
+    之后恢复为 base_interval_ms 的频率。
+    """
+
+    def __init__(
+        self,
+        base_interval_ms: int = CAMERA_DETECT_INTERVAL_MS,
+        floor_interval_ms: int = CAMERA_IDLE_INTERVAL_MS,
+        quiet_after_ms: int = CAMERA_QUIET_AFTER_MS,
+        backoff: float = CAMERA_BACKOFF_FACTOR,
+    ):
+        self.base_interval_ms = max(1, int(base_interval_ms))
+        self.floor_interval_ms = max(self.base_interval_ms, int(floor_interval_ms))
+        self.quiet_after_ms = max(0, int(quiet_after_ms))
+        self.backoff = max(1.0, float(backoff))
+        self.current_interval_ms = self.base_interval_ms
+        self.detections = 0  # 实际执行的检测次数
+        self.hidden_detections = 0  # 其中窗口看不见时的次数
+        self._skipped = 0.0  # 相对固定 base 频率少做的检测次数（按等待时长折算）
+        self._last_motion: Optional[float] = None
+
+    @property
+    def reaction_bound_ms(self) -> int:
+        """静止退避后，从运动出现到被检测到的最长等待（不含单次检测耗时）。"""
+        return self.floor_interval_ms
+
+    @property
+    def skipped(self) -> int:
+        """相对固定频率跳过的检测次数。"""
+        return int(self._skipped)
+
+    def on_result(self, motion: bool, now: Optional[float] = None, visible: bool = True) -> int:
+        """记录一次检测结果，返回下一次检测前应等待的毫秒数。"""
+        now = time.monotonic() if now is None else now
+        self.detections += 1
+        if self._last_motion is None or motion:
+            self._last_motion = now
+        if not visible:
+            self.hidden_detections += 1
+            self.current_interval_ms = self.floor_interval_ms
+        elif motion:
+            self.current_interval_ms = self.base_interval_ms
+        elif (now - self._last_motion) * 1000.0 >= self.quiet_after_ms:
+            self.current_interval_ms = min(
+                self.floor_interval_ms,
+                int(self.current_interval_ms * self.backoff),
+            )
+        self._skipped += self.current_interval_ms / self.base_interval_ms - 1.0
+        return self.current_interval_ms
+
+    def reset(self) -> None:
+        """回到基础频率（如窗口重新可见、摄像头重开时）。"""
+        self.current_interval_ms = self.base_interval_ms
+        self._last_motion = None
+
+    def stats(self) -> dict:
+        return {
+            "interval_ms": self.current_interval_ms,
+            "detections": self.detections,
+            "skipped": self.skipped,
+            "hidden_detections": self.hidden_detections,
+            "reaction_bound_ms": self.reaction_bound_ms,
+        }
+
+
+class IdleReleasePolicy:
+    """空闲释放摄像头的策略（只做判断，不持有设备）。
+
+    - 连续 release_after_ms 无检测，或窗口连续 release_after_ms 不可见：应释放摄像头
+    - 已释放且窗口可见：每隔 probe_interval_ms 探测一次（短暂重开、取几帧）；探测到运动则恢复常开
+    - 已释放且窗口不可见：不探测；窗口重新可见时立即恢复常开
+    """
+
+    def __init__(
+        self,
+        release_after_ms: int = CAMERA_IDLE_RELEASE_MIN * 60 * 1000,
+        probe_interval_ms: int = CAMERA_IDLE_PROBE_INTERVAL_MS,
+    ):
+        self.release_after_ms = max(0, int(release_after_ms))
+        self.probe_interval_ms = max(1, int(probe_interval_ms))
+        self.visible = True
+        self.released = False
+        self.releases = 0
+        self.probes = 0
+        self._last_motion: Optional[float] = None
+        self._hidden_since: Optional[float] = None
+        self._last_probe = 0.0
+
+    def set_visible(self, visible: bool, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        if visible == self.visible:
+            return
+        self.visible = visible
+        if visible:
+            self._hidden_since = None
+            if self.released:
+                # 窗口重新可见：立即恢复，并重新计算空闲时长
+                self.resume(now)
+        else:
+            self._hidden_since = now
+
+    def on_result(self, motion: bool, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        if self._last_motion is None or motion:
+            self._last_motion = now
+
+    def should_release(self, now: Optional[float] = None) -> bool:
+        """常开状态下是否到了释放摄像头的时候。"""
+        if self.released:
+            return False
+        now = time.monotonic() if now is None else now
+        limit = self.release_after_ms / 1000.0
+        if self._last_motion is not None and now - self._last_motion >= limit:
+            return True
+        return self._hidden_since is not None and now - self._hidden_since >= limit
+
+    def mark_released(self, now: Optional[float] = None) -> None:
+        self.released = True
+        self.releases += 1
+        self._last_probe = time.monotonic() if now is None else now
+
+    def seconds_until_probe(self, now: Optional[float] = None) -> Optional[float]:
+        """已释放时距下次探测的秒数（<=0 表示应立即探测）；窗口不可见时返回 None（不探测）。"""
+        if not self.visible:
+            return None
+        now = time.monotonic() if now is None else now
+        return self._last_probe + self.probe_interval_ms / 1000.0 - now
+
+    def on_probe(self, motion: bool, now: Optional[float] = None) -> None:
+        """记录一次探测结果：有运动则恢复常开，否则保持释放直到下次探测。"""
+        now = time.monotonic() if now is None else now
+        self.probes += 1
+        self._last_probe = now
+        if motion:
+            self.resume(now)
+
+    def resume(self, now: Optional[float] = None) -> None:
+        self.released = False
+        self._last_motion = time.monotonic() if now is None else now
+
+    def stats(self) -> dict:
+        return {
+            "released": self.released,
+            "visible": self.visible,
+            "releases": self.releases,
+            "probes": self.probes,
+        }
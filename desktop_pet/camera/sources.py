@@ -0,0 +1,245 @@
+"""帧源：用视频文件、图片目录或合成画面代替摄像头，便于无摄像头的基准测试与回归测试。
+
+帧源实现 cv2.VideoCapture 的子集（isOpened / grab / retrieve / read / release），
+通过 CameraDetector(source=...) 接入，检测器、流水线与真实摄像头走同一条路径。
+帧源可附带逐帧真值 labels（该帧画面中是否有猫），供基准测试计算检出率 / 精确率。
+"""
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# 图片目录帧源识别的扩展名
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def synthetic_frames(
+    count: int,
+    size: Tuple[int, int] = (1920, 1080),
+    seed: int = 0,
+    walk_frames: int = 10,
+    period: int = 40,
+    script: Optional[Sequence[Tuple[int, int]]] = None,
+    flicker: float = 0.0,
+) -> Iterator[np.ndarray]:
+    """生成带传感器噪声的合成画面：静止背景 + 走过画面的「猫」（亮色椭圆）。
+
+    默认每 period 帧为一段：前 walk_frames 帧猫从左走到右，其余帧画面中没有猫；
+    walk_frames 越大猫走得越慢（相邻帧位移越小）。
+    给出 script=[(起始帧, 持续帧数), ...] 时按脚本出现：每段内猫从左走到右，段外没有猫。
+    flicker 为每帧出现「闪烁」的概率：右上角一小块画面变亮（如屏幕反光），运动比例在检测阈值附近，不是猫。
+    """
+    w, h = size
+    rng = np.random.default_rng(seed)
+    # 闪烁用独立的随机数序列，不改变同一 seed 下的噪声
+    flicker_rng = np.random.default_rng(seed + 1)
+    fx0, fx1, fy0, fy1 = int(w * 0.80), int(w * 0.96), int(h * 0.06), int(h * 0.22)
+    yy, xx = np.mgrid[0:h, 0:w]
+    background = (60 + 80 * xx / w + 40 * yy / h).astype(np.float32)
+    radius_x, radius_y = w // 10, h // 8
+    for i in range(count):
+        progress = _walk_progress(i, walk_frames, period, script)
+        img = background.copy()
+        if progress is not None:
+            cx = int(w * 0.15 + (w * 0.7) * progress)
+            cy = int(h * 0.55)
+            img[((xx - cx) / radius_x) ** 2 + ((yy - cy) / radius_y) ** 2 <= 1.0] = 210
+        if flicker > 0.0 and flicker_rng.random() < flicker:
+            img[fy0:fy1, fx0:fx1] += 60
+        img += rng.normal(0, 3.0, size=img.shape).astype(np.float32)
+        gray = np.clip(img, 0, 255).astype(np.uint8)
+        yield np.dstack([gray, gray, gray])
+
+
+def _walk_progress(
+    index: int,
+    walk_frames: int,
+    period: int,
+    script: Optional[Sequence[Tuple[int, int]]],
+) -> Optional[float]:
+    """第 index 帧猫走过画面的进度（0~1）；画面中没有猫时返回 None。"""
+    if script is None:
+        phase = index % period
+        return phase / max(1, walk_frames - 1) if phase < walk_frames else None
+    for start, length in script:
+        if start <= index < start + length:
+            return (index - start) / max(1, length - 1)
+    return None
+
+
+def synthetic_labels(
+    count: int,
+    walk_frames: int = 10,
+    period: int = 40,
+    script: Optional[Sequence[Tuple[int, int]]] = None,
+) -> List[bool]:
+    """与 synthetic_frames 对应的真值：该帧画面中是否有猫。"""
+    return [_walk_progress(i, walk_frames, period, script) is not None for i in range(count)]
+
+
+def load_labels(path: Union[str, Path]) -> List[bool]:
+    """读取真值文件：每行一帧，0 / 1（或 false / true）；空行与 # 开头的行忽略。"""
+    labels = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            text = line.split("#", 1)[0].strip().lower()
+            if text:
+                labels.append(text in ("1", "true", "yes"))
+    return labels
+
+
+class FrameSource:
+    """帧源基类：子类实现 _next_frame()（返回下一帧或 None）与 _rewind()。
+
+    open() 回到开头并返回自身，供检测器每次（重新）打开时调用；loop 为 True 时播完从头循环。
+    """
+
+    def __init__(self, loop: bool = False, labels: Optional[Sequence[bool]] = None):
+        self.loop = loop
+        self.labels: Optional[List[bool]] = list(labels) if labels is not None else None
+        self._opened = False
+        self._current: Optional[np.ndarray] = None
+
+    def _next_frame(self) -> Optional[np.ndarray]:
+        raise NotImplementedError
+
+    def _rewind(self) -> None:
+        raise NotImplementedError
+
+    def open(self) -> "FrameSource":
+        self._rewind()
+        self._current = None
+        self._opened = True
+        return self
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def grab(self) -> bool:
+        if not self._opened:
+            return False
+        frame = self._next_frame()
+        if frame is None and self.loop:
+            self._rewind()
+            frame = self._next_frame()
+        self._current = frame
+        return frame is not None
+
+    def retrieve(self, image=None):
+        frame = self._current
+        if frame is None:
+            return False, None
+        if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+            np.copyto(image, frame)
+            return True, image
+        return True, frame.copy()
+
+    def read(self, image=None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def release(self) -> None:
+        self._opened = False
+        self._current = None
+
+
+class ArraySource(FrameSource):
+    """回放内存中的帧序列。"""
+
+    def __init__(self, frames: Sequence[np.ndarray], loop: bool = True, labels: Optional[Sequence[bool]] = None):
+        super().__init__(loop, labels)
+        self._frames = frames
+        self._index = 0
+
+    def _rewind(self) -> None:
+        self._index = 0
+
+    def _next_frame(self) -> Optional[np.ndarray]:
+        if self._index >= len(self._frames):
+            return None
+        frame = self._frames[self._index]
+        self._index += 1
+        return frame
+
+
+class SyntheticSource(ArraySource):
+    """脚本化运动的合成画面（见 synthetic_frames），自带真值。画面预先生成，回放时不计生成耗时。"""
+
+    def __init__(
+        self,
+        count: int = 240,
+        size: Tuple[int, int] = (640, 480),
+        seed: int = 0,
+        walk_frames: int = 10,
+        period: int = 40,
+        script: Optional[Sequence[Tuple[int, int]]] = None,
+        loop: bool = False,
+        flicker: float = 0.0,
+    ):
+        frames = list(synthetic_frames(count, size, seed, walk_frames, period, script, flicker))
+        super().__init__(frames, loop, synthetic_labels(count, walk_frames, period, script))
+
+
+class ImageDirSource(FrameSource):
+    """按文件名顺序回放目录中的图片；目录下有 labels.txt 时作为真值。"""
+
+    def __init__(self, directory: Union[str, Path], loop: bool = False):
+        directory = Path(directory)
+        labels_path = directory / "labels.txt"
+        super().__init__(loop, load_labels(labels_path) if labels_path.exists() else None)
+        self.paths = sorted(p for p in directory.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+        self._index = 0
+
+    def _rewind(self) -> None:
+        self._index = 0
+
+    def _next_frame(self) -> Optional[np.ndarray]:
+        import cv2
+        while self._index < len(self.paths):
+            frame = cv2.imread(str(self.paths[self._index]), cv2.IMREAD_COLOR)
+            self._index += 1
+            if frame is not None:
+                return frame
+        return None
+
+
+class VideoFileSource(FrameSource):
+    """回放视频文件；同名 .labels.txt（如 clip.mp4 → clip.labels.txt）存在时作为真值。"""
+
+    def __init__(self, path: Union[str, Path], loop: bool = False):
+        path = Path(path)
+        labels_path = path.with_suffix(".labels.txt")
+        super().__init__(loop, load_labels(labels_path) if labels_path.exists() else None)
+        self.path = path
+        self._cap = None
+
+    def _rewind(self) -> None:
+        import cv2
+        if self._cap is not None:
+            self._cap.release()
+        self._cap = cv2.VideoCapture(str(self.path))
+
+    def _next_frame(self) -> Optional[np.ndarray]:
+        if self._cap is None:
+            return None
+        ret, frame = self._cap.read()
+        return frame if ret else None
+
+    def release(self) -> None:
+        super().release()
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+
+def open_source(spec: str, loop: bool = False, **synthetic_options) -> FrameSource:
+    """按描述创建帧源："synthetic"（合成画面）、图片目录或视频文件路径；路径不存在时抛出 ValueError。"""
+    if spec == "synthetic":
+        return SyntheticSource(loop=loop, **synthetic_options)
+    path = Path(spec)
+    if path.is_dir():
+        return ImageDirSource(path, loop)
+    if path.is_file():
+        return VideoFileSource(path, loop)
+    raise ValueError(f"找不到帧源: {spec}")
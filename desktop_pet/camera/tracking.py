@@ -0,0 +1,112 @@
+"""运动定位与跟踪：从运动掩码求外接框与质心，并对质心做指数平滑得到轨迹。
+
+掩码先缩小到 TRACK_MAX_WIDTH 宽再做 connectedComponentsWithStats，只在有运动的帧上运行，
+相对整次检测的开销很小（见 bench tracking）。坐标均按掩码宽高归一化到 0~1。
+"""
+import time
+from typing import Optional, Tuple
+
+# 连通域分析使用的掩码最大宽度（像素）：外接框精度约 1/32 画面宽，足够定位；再大连通域分析耗时成倍增加
+TRACK_MAX_WIDTH = 32
+# 面积小于最大连通域该比例的连通域视为噪点，不计入外接框与质心
+MIN_COMPONENT_RATIO = 0.1
+
+Box = Tuple[float, float, float, float]  # (x, y, w, h)
+Point = Tuple[float, float]
+
+
+class MotionTracker:
+    """运动外接框 / 质心定位与平滑轨迹。
+
+    - locate(mask)：主要运动区域（合并较大的连通域）的外接框与面积加权质心
+    - update(centroid)：对质心做 EMA；连续 lost_after 次没有运动后轨迹清空
+    """
+
+    def __init__(self, alpha: float = 0.4, lost_after: int = 3, max_width: int = TRACK_MAX_WIDTH):
+        self.alpha = alpha
+        self.lost_after = max(1, lost_after)
+        self.max_width = max_width
+        self.track: Optional[Point] = None
+        self._misses = 0
+        self._small = None  # 缩小后的掩码缓冲
+        # 定位次数与累计耗时
+        self.calls = 0
+        self.total_s = 0.0
+
+    def reset(self) -> None:
+        self.track = None
+        self._misses = 0
+        self._small = None
+
+    def locate(self, mask) -> Optional[Tuple[Box, Point]]:
+        """返回 (外接框, 质心)，按掩码尺寸归一化；掩码中没有运动像素时返回 None。"""
+        start = time.perf_counter()
+        try:
+            return self._locate(mask)
+        finally:
+            self.total_s += time.perf_counter() - start
+            self.calls += 1
+
+    def _locate(self, mask) -> Optional[Tuple[Box, Point]]:
+        import cv2
+        import numpy as np
+        h, w = mask.shape[:2]
+        small = mask
+        if w > self.max_width:
+            sw = self.max_width
+            sh = max(1, int(round(h * sw / w)))
+            if self._small is None or self._small.shape != (sh, sw):
+                self._small = np.empty((sh, sw), np.uint8)
+            # 双线性缩小：掩码经过模糊与阈值后是成片的区域，不会在缩小中丢失；比 INTER_AREA 快数倍
+            small = cv2.resize(mask, (sw, sh), dst=self._small, interpolation=cv2.INTER_LINEAR)
+        # 小图上标签数远小于 65536，用 16 位标签图，比默认 32 位快约一倍
+        count, _, stats, centroids = cv2.connectedComponentsWithStats(small, connectivity=8, ltype=cv2.CV_16U)
+        if count <= 1:
+            return None
+        sh, sw = small.shape[:2]
+        if count == 2:
+            # 只有一个连通域（最常见）：不需要面积过滤与加权合并
+            left, top, cw, ch, _ = stats[1].tolist()
+            ccx, ccy = centroids[1].tolist()
+            return (left / sw, top / sh, cw / sw, ch / sh), ((ccx + 0.5) / sw, (ccy + 0.5) / sh)
+        # 连通域通常只有几个：转成 Python 列表逐个处理，比多次 numpy 花式索引更省
+        comps = stats[1:].tolist()
+        centers = centroids[1:].tolist()
+        min_area = max(c[cv2.CC_STAT_AREA] for c in comps) * MIN_COMPONENT_RATIO
+        x0 = y0 = float("inf")
+        x1 = y1 = 0
+        total = sx = sy = 0.0
+        for (left, top, cw, ch, area), (ccx, ccy) in zip(comps, centers):
+            if area < min_area:
+                continue
+            x0, y0 = min(x0, left), min(y0, top)
+            x1, y1 = max(x1, left + cw), max(y1, top + ch)
+            total += area
+            # 连通域质心是像素中心坐标，+0.5 换算到与外接框相同的边界坐标系
+            sx += (ccx + 0.5) * area
+            sy += (ccy + 0.5) * area
+        box = (x0 / sw, y0 / sh, (x1 - x0) / sw, (y1 - y0) / sh)
+        return box, (sx / total / sw, sy / total / sh)
+
+    def stats(self) -> dict:
+        """定位次数与平均单次耗时（毫秒）。"""
+        ms = self.total_s * 1000.0 / self.calls if self.calls else 0.0
+        return {"track_calls": self.calls, "track_ms": ms}
+
+    def update(self, centroid: Optional[Point]) -> Optional[Point]:
+        """记录本次检测的质心（无运动时传 None），返回平滑后的轨迹点。"""
+        if centroid is None:
+            self._misses += 1
+            if self._misses >= self.lost_after:
+                self.track = None
+            return self.track
+        self._misses = 0
+        if self.track is None:
+            self.track = centroid
+        else:
+            a = self.alpha
+            self.track = (
+                self.track[0] + a * (centroid[0] - self.track[0]),
+                self.track[1] + a * (centroid[1] - self.track[1]),
+            )
+        return self.track
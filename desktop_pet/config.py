@@ -12,19 +12,83 @@ HEALTH_DATA_DIR = DATA_DIR / "health"
 AUTH_DATA_DIR = DATA_DIR / "auth"  # 用户与登录
 AVATARS_DIR = DATA_DIR / "avatars"  # 用户上传/生成的猫咪形象
 VIDEOS_DIR = DATA_DIR / "videos"    # 即梦图生视频保存目录
-GIFS_DIR = DATA_DIR / "gifs"       # 视频转 GIF 缓存，与视频路径一一映射
+GIFS_DIR = DATA_DIR / "gifs"       # 视频转 GIF / 帧包缓存，与视频路径一一映射
 VOICE_DATA_DIR = DATA_DIR / "voice"  # 主人声音样本（供后续克隆/TTS）
 VOICE_SAMPLES_DIR = VOICE_DATA_DIR / "samples"  # 按用户 ID 存录音
+CAMERA_ROI_DIR = DATA_DIR / "camera_roi"  # 摄像头检测区域，按用户 ID 存
+DETECTION_TIMELINE_DIR = HEALTH_DATA_DIR / "timeline"  # 检测时间线（二进制日志），按宠物 ID 分目录、按天分文件
 
 # 窗口默认
 WINDOW_WIDTH = 200
 WINDOW_HEIGHT = 200
+# 头像 / 视频 / 帧包共用的内容区边距：图片与视频同一区域、同一比例；帧包默认按去掉边距后的内容区尺寸生成
+WINDOW_CONTENT_MARGIN = 10
 WINDOW_FRAMELESS = True
 WINDOW_ALWAYS_ON_TOP = True
+# 眨眼、眼睛一亮、视线变化只重绘受影响的区域（眼睛带 / 高光），不整窗重绘
+WINDOW_PARTIAL_REPAINT = True
 
 # 摄像头（可选）
 CAMERA_INDEX = 0
+# 采集参数：请求的采集分辨率 (宽, 高)、像素格式（"MJPG" 压缩 / None 驱动默认，多为 YUYV 原始格式）、
+# 驱动缓冲帧数（1=始终拿到最新帧，避免积压导致检测滞后）；None 表示不设置、沿用驱动默认
+CAMERA_CAPTURE_SIZE = (640, 480)
+CAMERA_FOURCC = "MJPG"
+CAMERA_BUFFER_SIZE = 1
+# 采集线程每个采集周期只 grab()，仅在检测线程需要时才 retrieve() 解码，省去未分析帧的解码开销
+CAMERA_GRAB_ONLY = True
+# 采集线程跟随检测调度：只在下一次检测前 CAMERA_CAPTURE_LEAD_MS 内抓帧（顺带取空驱动缓冲里的旧帧），其余时间休眠不唤醒
+CAMERA_CAPTURE_LEAD_MS = 300
 CAMERA_DETECT_INTERVAL_MS = 1000
+# 自适应调度：连续 CAMERA_QUIET_AFTER_MS 无运动后，检测间隔按 CAMERA_BACKOFF_FACTOR 逐步放大到 CAMERA_IDLE_INTERVAL_MS；检测到运动立即恢复
+CAMERA_IDLE_INTERVAL_MS = 5000
+CAMERA_QUIET_AFTER_MS = 60000
+CAMERA_BACKOFF_FACTOR = 2.0
+# 空闲释放摄像头：连续 CAMERA_IDLE_RELEASE_MIN 分钟无检测或窗口不可见则释放设备（指示灯熄灭）；
+# 释放期间窗口可见时每隔 CAMERA_IDLE_PROBE_INTERVAL_MS 短暂重开探测一次，相邻探测帧间隔 CAMERA_PROBE_GAP_MS
+CAMERA_IDLE_RELEASE_MIN = 10
+CAMERA_IDLE_PROBE_INTERVAL_MS = 30000
+CAMERA_PROBE_GAP_MS = 300
+# 打开摄像头后丢弃的预热帧数（自动曝光/白平衡尚未稳定，避免误报运动）
+CAMERA_WARMUP_FRAMES = 5
+# 检测处理分辨率 (宽, 高)：采集后先缩小到该尺寸内（保持宽高比）再做灰度/模糊/差分；None=原分辨率
+CAMERA_PROCESS_SIZE = (320, 240)
+# 检测热路径复用预分配缓冲（OpenCV dst 参数 + cap.read(image)），避免逐帧分配数组
+CAMERA_REUSE_BUFFERS = True
+# 运动检测后端：frame_diff（相邻帧差分）/ running_avg（背景均值）/ mog2 / knn（OpenCV 背景建模）
+CAMERA_BACKEND = "frame_diff"
+# 在独立子进程中做检测（画面经共享内存传递），避免较重的检测器与界面线程争抢 GIL；
+# 子进程单帧超过 CAMERA_WORKER_TIMEOUT_MS 无响应视为卡死，终止后自动重启
+CAMERA_DETECT_IN_PROCESS = False
+CAMERA_WORKER_TIMEOUT_MS = 3000
+# 检测结果时间滤波：置信度 EMA 升到开阈值才算「有」，降到 CAMERA_FILTER_OFF 以下才算「无」；抑制阈值附近的抖动反复重启动效播放。
+# 开阈值 = 刚过运动阈值的检测给出的置信度（detector.THRESHOLD_CONFIDENCE，0.2）× CAMERA_FILTER_ON_RATIO：
+# 取 0.9、ALPHA 取 0.3 时，任何持续的检测（置信度 ≥ 0.2）在 7 次检测内必然确认（0.7^7 < 1 - 0.9），滤波不抬高检测阈值；
+# 明显的运动（置信度 ≥ 0.6）第一次就确认，而阈值附近一两帧的闪烁不会确认。
+# 进入「有」后至少保持 CAMERA_FILTER_MIN_DWELL_MS；回到「无」后只需保持 CAMERA_FILTER_MIN_OFF_MS 即可再次进入，
+# 真正再次到来的猫最多被推迟这么久
+CAMERA_FILTER_ENABLED = True
+CAMERA_FILTER_ALPHA = 0.3
+CAMERA_FILTER_ON_RATIO = 0.9
+CAMERA_FILTER_OFF = 0.1
+CAMERA_FILTER_MIN_DWELL_MS = 3000
+CAMERA_FILTER_MIN_OFF_MS = 1000
+# 检测时间线：每次检测（时刻、运动比例、置信度、是否检测到）追加写入 DETECTION_TIMELINE_DIR，
+# 后台线程每 CAMERA_TIMELINE_FLUSH_MS 批量落盘，检测线程不等待磁盘
+CAMERA_TIMELINE_ENABLED = True
+CAMERA_TIMELINE_FLUSH_MS = 5000
+# 检测热路径分段计时（读帧、缩小、灰度、模糊、运动后端、计数、定位、分类及采集→界面更新的端到端耗时）：
+# 设置环境变量 CAMERA_PROFILE=1 开启，关闭时几乎无开销；开启后每 CAMERA_PROFILE_DUMP_S 秒向 stderr 输出一次快照（0=不输出）
+CAMERA_PROFILE = os.getenv("CAMERA_PROFILE") == "1"
+CAMERA_PROFILE_DUMP_S = 60
+# 猫分类器（第二级）：有运动时对运动区域做一次 OpenCV DNN（CPU）分类，区分猫与路过的人等；
+# 模型为 ONNX 图像分类模型，可从环境变量 CAMERA_CLASSIFIER_MODEL 指定，未设置则只做运动检测
+CAMERA_CLASSIFIER_MODEL = os.getenv("CAMERA_CLASSIFIER_MODEL") or None
+CAMERA_CLASSIFIER_INPUT_SIZE = (224, 224)  # 模型输入尺寸 (宽, 高)
+CAMERA_CLASSIFIER_CAT_CLASSES = (281, 282, 283, 284, 285)  # 属于「猫」的类别下标（ImageNet 家猫类）
+CAMERA_CLASSIFIER_THRESHOLD = 0.5  # 有猫概率超过该值才算检测到宠物
+CAMERA_CLASSIFIER_SCALE = 1 / 255.0  # 输入预处理：(像素 - MEAN) * SCALE，通道顺序转为 RGB
+CAMERA_CLASSIFIER_MEAN = (0.0, 0.0, 0.0)
 
 # 提醒默认（分钟）
 FEED_REMIND_INTERVAL = 360  # 6 小时
@@ -37,9 +101,17 @@ JIMENG_SECRET_KEY = os.getenv("JIMENG_SECRET_KEY")
 
 # 动效播放：True=用 GIF（无内存泄漏），False=用视频（若 GIF 效果不好可改回 False 回滚）
 USE_GIF_PLAYBACK = True
+# True=在窗口内用 OpenCV 直接逐帧解码即梦视频（不经 QMediaPlayer，也不必先转 GIF），优先于 USE_GIF_PLAYBACK
+USE_OPENCV_PLAYBACK = False
+# True=视频转为帧包（按窗口尺寸预缩放的真彩色逐帧像素，映射文件零拷贝播放）代替 GIF；USE_OPENCV_PLAYBACK 时不转换
+USE_FRAMEPACK_PLAYBACK = False
+# 窗口内逐帧播放（GIF 等）：后台解码预读的帧最多占用这么多字节，显示过的帧随即丢弃，播完全部释放
+PLAYBACK_DECODE_BUDGET_BYTES = 2 * 1024 * 1024
+# 空闲时预先解码好开头几帧（最多占用这么多字节），检测到人时第一帧直接贴图；0=不预热
+PLAYBACK_PREWARM_BYTES = 512 * 1024
 
 
 def ensure_dirs() -> None:
     """确保数据目录存在。"""
-    for d in (DATA_DIR, PROFILES_DIR, ALBUMS_DIR, HEALTH_DATA_DIR, AUTH_DATA_DIR, AVATARS_DIR, VIDEOS_DIR, GIFS_DIR, VOICE_DATA_DIR, VOICE_SAMPLES_DIR):
+    for d in (DATA_DIR, PROFILES_DIR, ALBUMS_DIR, HEALTH_DATA_DIR, AUTH_DATA_DIR, AVATARS_DIR, VIDEOS_DIR, GIFS_DIR, VOICE_DATA_DIR, VOICE_SAMPLES_DIR, CAMERA_ROI_DIR, DETECTION_TIMELINE_DIR):
         d.mkdir(parents=True, exist_ok=True)
@@ -1,9 +1,12 @@
-"""健康提醒与档案。"""
+"""健康提醒、档案与检测时间线。"""
 from desktop_pet.health.models import HealthReminder, ReminderType
 from desktop_pet.health.reminders import HealthReminderService
+from desktop_pet.health.timeline import DetectionTimeline, TimelineWriter
 
 __all__ = [
     "HealthReminder",
     "ReminderType",
     "HealthReminderService",
+    "DetectionTimeline",
+    "TimelineWriter",
 ]
@@ -0,0 +1,231 @@
+"""检测时间线：把每次摄像头检测追加写入定长二进制日志，回答「这周猫什么时候在桌前」而不保存画面。
+
+每条记录 RECORD_DTYPE 定长 17 字节（时刻、运动比例、置信度、标志位），按本地日期每天一个文件，
+文件头为 8 字节魔数。写入先进内存队列，由后台线程定时批量追加，检测线程不等待磁盘；
+读取用 numpy.memmap 映射文件，按时间范围查询与按小时汇总都是向量化运算。
+"""
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+
+from desktop_pet.config import CAMERA_TIMELINE_FLUSH_MS, DETECTION_TIMELINE_DIR
+
+# 单条记录：Unix 时刻（秒）、运动比例、置信度、标志位（FLAG_*）；紧凑排列，无对齐填充
+RECORD_DTYPE = np.dtype([("ts", "<f8"), ("motion_ratio", "<f4"), ("confidence", "<f4"), ("flags", "u1")])
+FLAG_DETECTED = 1      # 最终结果（时间滤波后）为检测到
+FLAG_RAW_DETECTED = 2  # 时间滤波前的原始结果为检测到
+# 按小时汇总：小时起点（Unix 时刻）、检测次数、检测到的次数、平均运动比例、最大置信度
+HOURLY_DTYPE = np.dtype([
+    ("hour", "<f8"),
+    ("ticks", "<i4"),
+    ("detected", "<i4"),
+    ("motion_mean", "<f4"),
+    ("confidence_max", "<f4"),
+])
+# 文件头：格式标识与版本，记录格式变化时更换
+MAGIC = b"DPTL0001"
+# 内存队列上限：磁盘长时间不可写时丢弃最旧的记录，不无限占用内存
+_MAX_PENDING = 100_000
+# close() 等待写入线程退出的最长时间（秒）
+_JOIN_TIMEOUT_S = 2.0
+
+
+def day_file(base_dir: Path, day: date) -> Path:
+    return base_dir / f"{day:%Y%m%d}.bin"
+
+
+def read_day(path: Path) -> np.ndarray:
+    """映射一天的日志（只读 memmap）；文件不存在、为空或格式不符时返回空数组。末尾不完整的记录忽略。"""
+    try:
+        size = path.stat().st_size
+        count = (size - len(MAGIC)) // RECORD_DTYPE.itemsize
+        if count <= 0:
+            return np.empty(0, RECORD_DTYPE)
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return np.empty(0, RECORD_DTYPE)
+        return np.memmap(path, RECORD_DTYPE, mode="r", offset=len(MAGIC), shape=(count,))
+    except OSError:
+        return np.empty(0, RECORD_DTYPE)
+
+
+class TimelineWriter:
+    """检测时间线写入：append() / record() 只把记录放进内存队列，后台线程每 flush_ms 批量追加到当天文件。
+
+    首次写入时启动后台线程；不再使用时调用 close()，落盘剩余记录。close() 之后追加的记录不再写入，计入 dropped。
+    """
+
+    def __init__(self, base_dir: Union[str, Path, None] = None, flush_ms: int = CAMERA_TIMELINE_FLUSH_MS):
+        self.base_dir = Path(base_dir) if base_dir is not None else DETECTION_TIMELINE_DIR
+        self.flush_ms = flush_ms
+        self._lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._io_lock = threading.Lock()  # 串行化落盘（后台线程与 flush() 调用方）
+        self._checked: set = set()  # 已检查过末尾完整性的文件
+        # 统计：已写入 / 丢弃的记录数、落盘次数与累计耗时、写入失败次数
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.errors = 0
+        self._flush_total_s = 0.0
+
+    def append(
+        self,
+        ts: float,
+        motion_ratio: float,
+        confidence: float,
+        detected: bool,
+        raw_detected: Optional[bool] = None,
+    ) -> None:
+        """追加一条记录（不做磁盘 I/O）；raw_detected 缺省与 detected 相同。已 close() 时丢弃并计数。"""
+        raw = detected if raw_detected is None else raw_detected
+        flags = (FLAG_DETECTED if detected else 0) | (FLAG_RAW_DETECTED if raw else 0)
+        with self._lock:
+            if self._stop.is_set():
+                # 后台线程已停止、不会再落盘：不入队，避免记录悄悄丢失
+                self.dropped += 1
+                return
+            if len(self._pending) >= _MAX_PENDING:
+                del self._pending[0]
+                self.dropped += 1
+            self._pending.append((ts, motion_ratio, confidence, flags))
+        if self._thread is None and not self._stop.is_set():
+            self._start()
+
+    def record(self, result, ts: Optional[float] = None) -> None:
+        """追加一次检测结果（DetectionResult）；ts 缺省取画面采集时刻换算的系统时间。"""
+        if ts is None:
+            ts = time.time()
+            if result.captured_at > 0.0:
+                ts -= max(0.0, time.monotonic() - result.captured_at)
+        self.append(ts, result.motion_ratio, result.confidence, result.pet_detected, result.raw_detected)
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="desktop-pet-timeline", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_ms / 1000.0)
+            self._wake.clear()
+            self.flush()
+        self.flush()
+
+    def flush(self) -> None:
+        """把队列中的记录追加到对应日期的文件；写入失败时丢弃本批并计数。"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        start = time.perf_counter()
+        records = np.array(batch, dtype=RECORD_DTYPE)
+        days = [datetime.fromtimestamp(ts).date() for ts, _, _, _ in batch]
+        with self._io_lock:
+            begin = 0
+            # 跨零点的一批按日期切成连续的几段
+            for i in range(1, len(days) + 1):
+                if i == len(days) or days[i] != days[begin]:
+                    self._write(days[begin], records[begin:i])
+                    begin = i
+            self.flushes += 1
+            self._flush_total_s += time.perf_counter() - start
+
+    def _write(self, day: date, records: np.ndarray) -> None:
+        path = day_file(self.base_dir, day)
+        try:
+            self.base_dir.mkdir(parents=True, exist_ok=True)
+            with open(path, "ab") as f:
+                size = f.seek(0, 2)
+                if size == 0:
+                    f.write(MAGIC)
+                elif path not in self._checked:
+                    # 上次写到一半退出：截掉末尾不完整的记录，保持定长对齐
+                    tail = (size - len(MAGIC)) % RECORD_DTYPE.itemsize
+                    if tail:
+                        f.truncate(size - tail)
+                self._checked.add(path)
+                f.write(records.tobytes())
+            self.written += len(records)
+        except OSError:
+            self.errors += 1
+
+    def close(self) -> None:
+        """停止后台线程并落盘剩余记录。"""
+        with self._lock:
+            self._stop.set()  # 与 append() 互斥：之后的记录不会再进队列
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(_JOIN_TIMEOUT_S)
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "timeline_written": self.written,
+            "timeline_pending": pending,
+            "timeline_dropped": self.dropped,
+            "timeline_errors": self.errors,
+            "timeline_flush_ms": self._flush_total_s * 1000.0 / self.flushes if self.flushes else 0.0,
+        }
+
+
+class DetectionTimeline:
+    """检测时间线查询：时间范围内的原始记录与按小时汇总。时间均为 Unix 时刻（秒），范围左闭右开。"""
+
+    def __init__(self, base_dir: Union[str, Path, None] = None):
+        self.base_dir = Path(base_dir) if base_dir is not None else DETECTION_TIMELINE_DIR
+
+    def days(self) -> List[date]:
+        """有记录文件的日期，升序。"""
+        out = []
+        for path in self.base_dir.glob("*.bin"):
+            try:
+                out.append(datetime.strptime(path.stem, "%Y%m%d").date())
+            except ValueError:
+                continue
+        return sorted(out)
+
+    def query(self, start: float, end: float) -> np.ndarray:
+        """返回 start <= ts < end 的记录（RECORD_DTYPE 数组，拷贝，不持有文件映射）。"""
+        parts = []
+        day = datetime.fromtimestamp(start).date()
+        last = datetime.fromtimestamp(end).date()
+        while day <= last:
+            records = read_day(day_file(self.base_dir, day))
+            if len(records):
+                ts = records["ts"]
+                parts.append(records[(ts >= start) & (ts < end)])
+            del records
+            day += timedelta(days=1)
+        if not parts:
+            return np.empty(0, RECORD_DTYPE)
+        return np.concatenate(parts)
+
+    def hourly(self, start: float, end: float) -> np.ndarray:
+        """按本地整点汇总 [start, end) 内的记录（HOURLY_DTYPE 数组），没有记录的小时也占一行。"""
+        first = datetime.fromtimestamp(start).replace(minute=0, second=0, microsecond=0).timestamp()
+        hours = max(0, int(np.ceil((end - first) / 3600.0)))
+        out = np.zeros(hours, HOURLY_DTYPE)
+        out["hour"] = first + 3600.0 * np.arange(hours)
+        records = self.query(start, end)
+        if not len(records) or not hours:
+            return out
+        idx = ((records["ts"] - first) // 3600.0).astype(np.intp)
+        ticks = np.bincount(idx, minlength=hours)
+        out["ticks"] = ticks
+        out["detected"] = np.bincount(idx, weights=records["flags"] & FLAG_DETECTED, minlength=hours)
+        motion = np.bincount(idx, weights=records["motion_ratio"], minlength=hours)
+        out["motion_mean"] = np.divide(motion, ticks, out=np.zeros(hours), where=ticks > 0)
+        np.maximum.at(out["confidence_max"], idx, records["confidence"])
+        return out
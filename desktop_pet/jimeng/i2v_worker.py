@@ -1,16 +1,17 @@
 """即梦图生视频后台 Worker（QThread），在图生图完成后用生成的 AI 图调用图生视频并保存。"""
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 from PyQt6.QtCore import QThread, pyqtSignal, QObject
 
+from desktop_pet.config import USE_FRAMEPACK_PLAYBACK, USE_OPENCV_PLAYBACK
 from desktop_pet.jimeng.i2v_client import generate_video_from_image
-from desktop_pet.jimeng.video_to_gif import video_to_gif
+from desktop_pet.jimeng.video_to_gif import video_to_framepack, video_to_gif
 
 
 class I2VWorker(QThread):
-    """用一张图（通常为图生图生成的 AI 图）生成短视频，保存到指定目录，并转为 GIF。"""
-    finished_success = pyqtSignal(str, str)  # (video_path, gif_path)，gif_path 为空表示转换失败
+    """用一张图（通常为图生图生成的 AI 图）生成短视频，保存到指定目录，并转为 GIF 或帧包（窗口直接播视频时不转）。"""
+    finished_success = pyqtSignal(str, str)  # (video_path, gif_path)，gif_path 为空表示未转换或转换失败
     finished_fail = pyqtSignal(str)          # 错误信息
 
     def __init__(
@@ -20,12 +21,14 @@ class I2VWorker(QThread):
         secret_key: str,
         save_dir: str | Path,
         parent: Optional[QObject] = None,
+        pack_size: Optional[Tuple[int, int]] = None,
     ):
         super().__init__(parent)
         self._image_path = Path(image_path)
         self._access_key = access_key
         self._secret_key = secret_key
         self._save_dir = Path(save_dir)
+        self._pack_size = pack_size  # 帧包尺寸（窗口媒体区域的物理像素），见 video_to_framepack
 
     def run(self) -> None:
         path = generate_video_from_image(
@@ -36,7 +39,11 @@ class I2VWorker(QThread):
         )
         if path is not None:
             video_path = str(path.resolve())
-            gif_path_obj = video_to_gif(path)
+            gif_path_obj = None
+            if USE_FRAMEPACK_PLAYBACK and not USE_OPENCV_PLAYBACK:
+                video_to_framepack(path, self._pack_size)  # 帧包按视频路径映射，窗口据此找到
+            elif not USE_OPENCV_PLAYBACK:
+                gif_path_obj = video_to_gif(path)
             gif_path = str(gif_path_obj.resolve()) if gif_path_obj else ""
             self.finished_success.emit(video_path, gif_path)
         else:
@@ -1,12 +1,12 @@
-"""将 MP4 视频转为 GIF，供桌宠窗口播放（避免 QMediaPlayer 内存泄漏）。"""
+"""将 MP4 视频转为 GIF 或帧包（framepack），供桌宠窗口播放（避免 QMediaPlayer 内存泄漏）。"""
 import subprocess
 import time
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 from PyQt6.QtCore import QObject, QThread, pyqtSignal
 
-from desktop_pet.config import GIFS_DIR, ensure_dirs
+from desktop_pet.config import GIFS_DIR, WINDOW_CONTENT_MARGIN, WINDOW_HEIGHT, WINDOW_WIDTH, ensure_dirs
 
 
 def video_path_to_gif_path(video_path: str | Path) -> Path:
@@ -18,16 +18,27 @@ def video_path_to_gif_path(video_path: str | Path) -> Path:
     return GIFS_DIR / video_path.with_suffix(".gif").name
 
 
-def video_to_gif(video_path: str | Path, fps: int = 30, width: int = 320) -> Optional[Path]:
+def video_path_to_framepack_path(video_path: str | Path) -> Path:
     """
-    将 MP4 转为 GIF，保存到 data/gifs/，与视频路径一一映射。
+    视频路径 -> 帧包路径映射。
+    data/videos/xxx.mp4 -> data/gifs/xxx.framepack
+    """
+    from desktop_pet.app.framepack import SUFFIX
+
+    video_path = Path(video_path)
+    return GIFS_DIR / video_path.with_suffix(SUFFIX).name
+
+
+def video_to_gif(video_path: str | Path, fps: int = 30, width: int = 320, gif_path: Optional[Path] = None) -> Optional[Path]:
+    """
+    将 MP4 转为 GIF，默认保存到 data/gifs/，与视频路径一一映射。
     直接用 ffmpeg 转换，避免 moviepy + NumPy 2.0 的 tostring 兼容性问题。
     返回 GIF 路径，失败返回 None。
     """
     video_path = Path(video_path)
     if not video_path.exists():
         return None
-    gif_path = video_path_to_gif_path(video_path)
+    gif_path = Path(gif_path) if gif_path else video_path_to_gif_path(video_path)
     ensure_dirs()
     try:
         # 单次 ffmpeg 调用：palettegen + paletteuse 生成高质量 GIF
@@ -60,21 +71,82 @@ def video_to_gif(video_path: str | Path, fps: int = 30, width: int = 320) -> Opt
         return None
 
 
+def video_to_framepack(
+    video_path: str | Path,
+    size: Optional[Tuple[int, int]] = None,
+    compress: bool = False,
+    pack_path: Optional[Path] = None,
+) -> Optional[Path]:
+    """
+    将 MP4 转为帧包，默认保存到 data/gifs/（与视频路径一一映射）。
+    用 OpenCV 逐帧解码，按 size=(宽, 高)（物理像素，应为窗口媒体区域尺寸，缺省为窗口内容区）等比放大、居中裁剪铺满，
+    与 VideoFrameSource 画面一致，播放时无需再缩放；保留原帧率与真彩色；
+    compress=True 时每帧用 zlib 轻度压缩（文件小，但播放时要解压、不能零拷贝）。
+    返回帧包路径，失败返回 None。
+    """
+    import cv2
+
+    from desktop_pet.app.framepack import write_framepack
+
+    video_path = Path(video_path)
+    if not video_path.exists():
+        return None
+    pack_path = Path(pack_path) if pack_path else video_path_to_framepack_path(video_path)
+    ensure_dirs()
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        if not cap.isOpened():
+            import sys
+            print(f"[桌宠-帧包] 无法打开视频: {video_path}", file=sys.stderr, flush=True)
+            return None
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        delay_ms = int(round(1000.0 / fps)) if fps and fps > 0 else 100
+        if size is None:
+            # 窗口内容区，即没有头像时的媒体区域
+            size = (WINDOW_WIDTH - 2 * WINDOW_CONTENT_MARGIN, WINDOW_HEIGHT - 2 * WINDOW_CONTENT_MARGIN)
+
+        def frames():
+            while True:
+                ok, bgr = cap.read()
+                if not ok or bgr is None:
+                    return
+                yield bgr, delay_ms
+
+        if write_framepack(pack_path, frames(), size, compress) == 0:
+            pack_path.unlink(missing_ok=True)
+            return None
+        return pack_path
+    except Exception as e:
+        import sys
+        print(f"[桌宠-帧包] 转换失败: {e}", file=sys.stderr, flush=True)
+        return None
+    finally:
+        cap.release()
+
+
 class VideoToGifWorker(QThread):
-    """后台将已有视频转为 GIF，用于已有宠物档案的按需转换。"""
-    finished_success = pyqtSignal(str, str, float)  # video_path, gif_path, elapsed_seconds
+    """后台将已有视频转为 GIF（framepack=True 时转为帧包），用于已有宠物档案的按需转换。"""
+    finished_success = pyqtSignal(str, str, float)  # video_path, gif_path（或帧包路径）, elapsed_seconds
     finished_fail = pyqtSignal(str)
 
-    def __init__(self, video_path: str | Path, parent: Optional[QObject] = None):
+    def __init__(
+        self,
+        video_path: str | Path,
+        parent: Optional[QObject] = None,
+        framepack: bool = False,
+        size: Optional[Tuple[int, int]] = None,
+    ):
         super().__init__(parent)
         self._video_path = Path(video_path)
+        self._framepack = framepack
+        self._size = size  # 帧包尺寸（物理像素），见 video_to_framepack
 
     def run(self) -> None:
         if not self._video_path.exists():
             self.finished_fail.emit("视频文件不存在")
             return
         t0 = time.perf_counter()
-        gif_path_obj = video_to_gif(self._video_path)
+        gif_path_obj = video_to_framepack(self._video_path, self._size) if self._framepack else video_to_gif(self._video_path)
         elapsed = time.perf_counter() - t0
         if gif_path_obj:
             self.finished_success.emit(
@@ -83,4 +155,4 @@ class VideoToGifWorker(QThread):
                 elapsed,
             )
         else:
-            self.finished_fail.emit("视频转 GIF 失败")
+            self.finished_fail.emit("视频转帧包失败" if self._framepack else "视频转 GIF 失败")
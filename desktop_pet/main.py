@@ -1,15 +1,25 @@
 """桌宠入口：欢迎（登录/注册/访客）→ 桌宠或广场；各界面可返回欢迎页切换模式。"""
 import sys
 
-from PyQt6.QtCore import QTimer, QEventLoop
+from PyQt6.QtCore import QEventLoop
 from PyQt6.QtWidgets import QApplication
 
 from desktop_pet import __version__
 from desktop_pet.app.window import PetWindow
 from desktop_pet.camera.detector import CameraDetector
-from desktop_pet.config import CAMERA_DETECT_INTERVAL_MS, ensure_dirs
+from desktop_pet.camera.pipeline import CameraPipeline
+from desktop_pet.camera.process_detector import ProcessCameraDetector
+from desktop_pet.camera.roi import RoiStore
+from desktop_pet.config import (
+    CAMERA_DETECT_IN_PROCESS,
+    CAMERA_DETECT_INTERVAL_MS,
+    CAMERA_TIMELINE_ENABLED,
+    DETECTION_TIMELINE_DIR,
+    ensure_dirs,
+)
 from desktop_pet.auth.store import AuthStore
 from desktop_pet.auth.session import Session
+from desktop_pet.health.timeline import TimelineWriter
 from desktop_pet.profile.store import ProfileStore
 from desktop_pet.ui.welcome import WelcomeDialog
 from desktop_pet.ui.onboarding import OnboardingDialog
@@ -94,15 +104,28 @@ def main() -> None:
             if pending_i2v:
                 window._on_start_i2v(pending_i2v)
 
-        detector = CameraDetector(interval_ms=CAMERA_DETECT_INTERVAL_MS)
-        timer = QTimer(window)
-        timer.timeout.connect(lambda: window.update_detection(detector.detect().pet_detected))
-        timer.start(CAMERA_DETECT_INTERVAL_MS)
+        # 摄像头采集与检测在后台线程进行，结果经信号回到 GUI 线程，慢摄像头不卡界面
+        # 只在用户设置的检测区域内检测（避开显示器、窗户、风扇等），未设置时检测整幅画面
+        detector_cls = ProcessCameraDetector if CAMERA_DETECT_IN_PROCESS else CameraDetector
+        detector = detector_cls(interval_ms=CAMERA_DETECT_INTERVAL_MS, roi=RoiStore().load(user.id))
+        # 每次检测追加到该宠物的检测时间线（后台线程批量落盘），供「猫什么时候在桌前」统计
+        timeline = TimelineWriter(DETECTION_TIMELINE_DIR / pet.id) if CAMERA_TIMELINE_ENABLED else None
+        pipeline = CameraPipeline(detector, parent=window, timeline=timeline)
+        def on_result(result) -> None:
+            window.update_detection(result.pet_detected)
+            window.look_at(result.track)  # 几何形象看向运动方向
+            pipeline.mark_delivered(result)  # 分段计时开启时记录采集→界面更新耗时
+        pipeline.detectionReady.connect(on_result)
+        # 窗口看不见（隐藏、最小化、被完全遮挡）时按空闲间隔检测，长时间看不见时释放摄像头；重新看得见时立即恢复
+        window.visibilityChanged.connect(pipeline.set_visible)
+        pipeline.start()
 
         loop = QEventLoop()
         def on_return() -> None:
-            timer.stop()
-            detector.release()
+            pipeline.stop()  # 采集线程退出时释放摄像头
+            detector.close()  # 子进程检测时结束子进程
+            if timeline is not None:
+                timeline.close()  # 落盘剩余的检测记录
             window.close()
             loop.quit()
         window.returnToWelcomeRequested.connect(on_return)
@@ -0,0 +1,83 @@
+"""测试用的极小 ONNX 模型（手工编码 protobuf，不依赖 onnx 包）。
+
+颜色分类器：输入 1x3xHxW（RGB，0~1），全局平均池化后线性层 + softmax 输出两类
+[不是猫, 是猫]；画面越偏橙（R 高 B 低）越像猫，灰色画面不像猫。
+"""
+import struct
+from pathlib import Path
+from typing import Iterable, List
+
+# ONNX 枚举值
+_FLOAT = 1
+_ATTR_INT = 2
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    value &= (1 << 64) - 1
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _int_field(field: int, value: int) -> bytes:
+    return _varint(field << 3) + _varint(value)
+
+
+def _bytes_field(field: int, payload: bytes) -> bytes:
+    return _varint(field << 3 | 2) + _varint(len(payload)) + payload
+
+
+def _str_field(field: int, text: str) -> bytes:
+    return _bytes_field(field, text.encode("utf-8"))
+
+
+def _tensor(name: str, dims: List[int], values: Iterable[float]) -> bytes:
+    values = list(values)
+    body = b"".join(_int_field(1, d) for d in dims)
+    body += _int_field(2, _FLOAT)
+    body += _str_field(8, name)
+    body += _bytes_field(9, struct.pack(f"<{len(values)}f", *values))
+    return body
+
+
+def _value_info(name: str, dims: List[int]) -> bytes:
+    shape = b"".join(_bytes_field(1, _int_field(1, d)) for d in dims)
+    tensor_type = _int_field(1, _FLOAT) + _bytes_field(2, shape)
+    return _str_field(1, name) + _bytes_field(2, _bytes_field(1, tensor_type))
+
+
+def _node(op: str, inputs: List[str], outputs: List[str], **int_attrs: int) -> bytes:
+    body = b"".join(_str_field(1, i) for i in inputs)
+    body += b"".join(_str_field(2, o) for o in outputs)
+    body += _str_field(3, f"{op.lower()}_{outputs[0]}")
+    body += _str_field(4, op)
+    for key, value in int_attrs.items():
+        body += _bytes_field(5, _str_field(1, key) + _int_field(3, value) + _int_field(20, _ATTR_INT))
+    return body
+
+
+def write_color_cat_model(path: Path, size: int = 32) -> Path:
+    """写出颜色分类模型：猫的 logit = 8 * (R - B) - 2，不是猫的 logit = 0。"""
+    weights = [0.0, 0.0, 0.0, 8.0, 0.0, -8.0]
+    bias = [0.0, -2.0]
+    graph = b"".join([
+        _bytes_field(1, _node("GlobalAveragePool", ["input"], ["pooled"])),
+        _bytes_field(1, _node("Flatten", ["pooled"], ["flat"], axis=1)),
+        _bytes_field(1, _node("Gemm", ["flat", "W", "B"], ["logits"], transB=1)),
+        _bytes_field(1, _node("Softmax", ["logits"], ["prob"], axis=1)),
+        _str_field(2, "color_cat"),
+        _bytes_field(5, _tensor("W", [2, 3], weights)),
+        _bytes_field(5, _tensor("B", [2], bias)),
+        _bytes_field(11, _value_info("input", [1, 3, size, size])),
+        _bytes_field(12, _value_info("prob", [1, 2])),
+    ])
+    model = _int_field(1, 7) + _str_field(2, "desktop-pet-tests") + _bytes_field(7, graph)
+    model += _bytes_field(8, _str_field(1, "") + _int_field(2, 13))
+    path.write_bytes(model)
+    return path
@@ -0,0 +1,428 @@
+"""桌宠窗口绘制与动效测试（离屏运行）。"""
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+import pytest
+from PyQt6.QtCore import QElapsedTimer, QEventLoop, QRect, QSize, Qt
+from PyQt6.QtGui import QImage, QPainter, QRegion
+from PyQt6.QtWidgets import QApplication
+
+from desktop_pet.app.animation import AnimationClock, animation_clock
+from desktop_pet.app.bench import run_repaint_bench, write_test_avatar, write_test_gif, write_test_video
+from desktop_pet.app.frame_player import FramePackSource, FramePlayer, GifFrameSource, VideoFrameSource
+from desktop_pet.app.pet_actor import PetState
+from desktop_pet.app.pixmap_cache import SCALED_AVATARS, ScaledPixmapCache
+from desktop_pet.app.sprites import EYE_BAND, SPRITES, Appearance, appearance_for
+from desktop_pet.app.window import PetWindow
+from desktop_pet.config import WINDOW_CONTENT_MARGIN
+
+
+@pytest.fixture(scope="module")
+def app() -> QApplication:
+    return QApplication.instance() or QApplication([])
+
+
+def test_scaled_pixmap_cache_keys_on_mtime_size_and_dpr(app, tmp_path) -> None:
+    path = write_test_avatar(tmp_path / "a.png", (400, 200))
+    cache = ScaledPixmapCache()
+    content = QRect(10, 10, 180, 180)
+    first = cache.get(str(path), content)
+    assert first.rect == QRect(10, 55, 180, 90)  # 等比缩放后在内容区内居中
+    assert cache.get(str(path), content) is first
+    hidpi = cache.get(str(path), content, dpr=2.0)
+    assert hidpi.pixmap.width() == 360 and hidpi.rect == first.rect
+    # 源文件被覆盖：修改时间变化即重新缩放
+    write_test_avatar(path, (200, 400))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert cache.get(str(path), content).rect == QRect(55, 10, 90, 180)
+    assert cache.stats()["avatar_cache_misses"] == 3
+    assert cache.get(str(tmp_path / "missing.png"), content) is None
+
+
+def test_window_scales_avatar_once_and_invalidates_on_new_path(app, tmp_path) -> None:
+    first = write_test_avatar(tmp_path / "first.png", (300, 600))
+    second = write_test_avatar(tmp_path / "second.png", (600, 300))
+    window = PetWindow(avatar_path=str(first))
+    window.show()
+    app.processEvents()
+    misses = SCALED_AVATARS.misses
+    for _ in range(5):
+        window.repaint()
+    assert SCALED_AVATARS.misses == misses
+    content = window.height() - 2 * WINDOW_CONTENT_MARGIN
+    assert window._media_rect().height() == content
+    window.set_avatar_path(str(second))
+    assert SCALED_AVATARS.misses == misses + 1
+    assert window._media_rect().width() == content
+    window.close()
+
+
+def test_window_keeps_an_undecodable_avatar_and_retries_once_rewritten(app, tmp_path) -> None:
+    path = tmp_path / "generating.png"
+    path.write_bytes(b"not a png yet")  # 图生视频输出中：文件尚未写完
+    window = PetWindow(avatar_path=str(path))
+    window.show()
+    app.processEvents()
+    misses = SCALED_AVATARS.misses
+    window.repaint()
+    assert window._scaled_avatar() is None and window._avatar_path == str(path)  # 本次画几何形象，路径保留
+    assert SCALED_AVATARS.misses == misses  # 同一版本的失败已缓存，不反复解码
+    write_test_avatar(path, (300, 300))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    window.repaint()
+    assert window._scaled_avatar() is not None and SCALED_AVATARS.misses == misses + 1
+    window.close()
+
+
+def test_geometric_sprites_are_shared_and_cover_each_appearance(app) -> None:
+    SPRITES.clear()
+    renders = SPRITES.renders
+    windows = [PetWindow(), PetWindow()]
+    for window in windows:
+        window.show()
+    app.processEvents()
+    for window in windows:
+        for state, closed in ((PetState.IDLE, False), (PetState.EYES_LIT, False), (PetState.IDLE, True), (PetState.DRAGGED, False)):
+            window._state, window._eyes_closed = state, closed
+            window.repaint()
+    assert SPRITES.renders == renders + 1  # 两个窗口、四种外观只渲染一组
+    sprites = SPRITES.get(windows[0].size())
+    assert sprites.eyes[Appearance.DRAGGED] is sprites.eyes[Appearance.IDLE]
+    closed = sprites.eyes[Appearance.EYES_CLOSED].toImage()
+    lit = sprites.eyes[Appearance.EYES_LIT].toImage()
+    assert closed != lit and closed.size() == lit.size() == EYE_BAND.size()
+    assert appearance_for(PetState.EYES_LIT, True) == Appearance.EYES_CLOSED
+    for window in windows:
+        window.close()
+
+
+def _render(window, image: QImage = None, rect: QRect = None) -> QImage:
+    """把窗口画到 image 上；给 rect 时与透明窗口的后备存储一样，先清空该区域再只重绘它。"""
+    if image is None:
+        image = QImage(window.size(), QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(0)
+    if rect is not None:
+        painter = QPainter(image)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        painter.fillRect(rect, Qt.GlobalColor.transparent)
+        painter.end()
+    rect = rect if rect is not None else window.rect()
+    window.render(image, rect.topLeft(), QRegion(rect))
+    return image
+
+
+def test_animations_repaint_only_the_affected_region(app) -> None:
+    window = PetWindow()
+    window.show()
+    app.processEvents()
+    # 眨眼：只重绘眼睛带，且局部重绘的结果与整窗重绘一致
+    stale = _render(window)
+    painted = window.painted_pixels
+    window._do_blink()
+    app.processEvents()
+    assert window.painted_pixels - painted == EYE_BAND.width() * EYE_BAND.height()
+    assert _render(window, stale, window._eye_rect()) == _render(window)
+    # 视线移动：新旧两处眼睛带
+    window._open_eyes()
+    stale = _render(window)
+    old = window._eye_rect()
+    window.look_at((0.0, 1.0))
+    assert _render(window, stale, old.united(window._eye_rect())) == _render(window)
+    # 状态没变的检测结果不重绘
+    app.processEvents()
+    painted = window.painted_pixels
+    window.set_state(PetState.DRAGGED)
+    window.update_detection(False)
+    app.processEvents()
+    assert window.painted_pixels == painted
+    window.close()
+
+
+def test_repaint_bench_cuts_painted_pixels(app) -> None:
+    row = run_repaint_bench(seconds=6.0, present_s=2.0)
+    assert row["geometric_partial_px_per_min"] < 0.1 * row["geometric_full_px_per_min"]
+    assert row["avatar_partial_px_per_min"] < 0.1 * row["avatar_full_px_per_min"]
+
+
+def _run(app, ms: int) -> None:
+    timer = QElapsedTimer()
+    timer.start()
+    while timer.elapsed() < ms:
+        app.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents, 10)
+
+
+def _run_until(app, condition, timeout_ms: int = 5000) -> None:
+    timer = QElapsedTimer()
+    timer.start()
+    while not condition() and timer.elapsed() < timeout_ms:
+        app.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents, 10)
+    assert condition()
+
+
+def test_animation_clock_coalesces_wakeups_and_stops_when_idle(app) -> None:
+    clock = AnimationClock()
+    fired = []
+    clock.call_later(10, lambda: fired.append("blink"), tolerance_ms=80)
+    clock.call_later(40, lambda: fired.append("frame"))
+    _run(app, 150)
+    assert fired == ["blink", "frame"] and clock.wakeups == 1  # 容忍延后的任务并入下一次唤醒
+    ticks = []
+    handle = clock.every(20, lambda: ticks.append(1) if len(ticks) < 2 else clock.cancel(handle))
+    skipped = clock.call_later(30, lambda: fired.append("cancelled"))
+    clock.cancel(skipped)
+    _run(app, 200)
+    assert len(ticks) == 2 and "cancelled" not in fired
+    assert clock.stats()["clock_entries"] == 0 and not clock.stats()["clock_active"]
+
+
+def test_window_blink_and_lit_fade_run_on_the_shared_clock(app) -> None:
+    window = PetWindow()
+    window.show()
+    app.processEvents()
+    window._do_blink()
+    assert window._eyes_closed
+    _run(app, 250)
+    assert not window._eyes_closed
+    window.update_detection(True)
+    assert window._state == PetState.EYES_LIT and window._lit_alpha == 0.0
+    _run(app, 300)
+    assert window._lit_alpha == 1.0 and window._fade_task is None
+    window.close()
+
+
+class _WaitingPet:
+    id = "waiting"
+    video_path = None
+    gif_path = None
+
+
+def test_hidden_or_minimized_window_pauses_clock_tasks(app) -> None:
+    clock = animation_clock()
+    window = PetWindow(pet=_WaitingPet())
+    seen = []
+    window.visibilityChanged.connect(seen.append)
+    owned = lambda: sum(1 for e in clock._entries.values() if e.owner == id(window))
+    assert owned() == 0  # 未显示前不眨眼也不轮询
+    window.show()
+    app.processEvents()
+    assert window.is_seen() and owned() == 2  # 眨眼 + 视频路径轮询
+    window.update_detection(True)
+    window.hide()
+    assert owned() == 0 and window._lit_alpha == 1.0
+    window.update_detection(False)
+    window.update_detection(True)  # 看不见时不启动播放、不渐显
+    assert window._lit_alpha == 1.0
+    window.show()
+    app.processEvents()
+    assert owned() == 2
+    window.showMinimized()
+    app.processEvents()
+    if window.isMinimized():  # 部分平台插件不支持最小化
+        assert owned() == 0
+    window.close()
+    assert seen[:3] == [True, False, True] and owned() == 0
+
+
+def test_frame_player_streams_within_budget_and_drops_frames(app, tmp_path) -> None:
+    gif = write_test_gif(tmp_path / "clip.gif", frames=12, size=(64, 64), fps=100)
+    player = FramePlayer(GifFrameSource(str(gif)), budget_bytes=3 * 32 * 32 * 4)
+    player.set_size(QSize(32, 32))
+    shown, done = [], []
+    player.frameChanged.connect(lambda: shown.append((player.current.index, player.current.image.size())))
+    player.finished.connect(lambda: done.append(True))
+    player.play()
+    _run_until(app, lambda: done)
+    assert [i for i, _ in shown] == list(range(12)) and shown[0][1] == QSize(32, 32)
+    stats = player.stats()
+    assert stats["peak_buffered_bytes"] <= 3 * 32 * 32 * 4  # 预读不超过预算
+    assert player.current is None and not player.is_playing()  # 播完即释放
+    player.play()
+    _run_until(app, lambda: len(done) == 2)
+    assert player.stats()["plays"] == 2 and player.stats()["frames_shown"] == 24
+
+
+def test_window_plays_gif_frames_in_place_of_the_avatar(app, tmp_path) -> None:
+    gif = write_test_gif(tmp_path / "pet.gif", frames=6, size=(64, 64), fps=50)
+    window = PetWindow()
+    window.show()
+    window._setup_gif(str(gif))
+    app.processEvents()
+    window.update_detection(True)
+    assert window._frames_playing()
+    _run_until(app, lambda: window._frame_player.current is not None)
+    frame = window._frame_player.current.image
+    assert frame.size() == window._media_rect().size()
+    _run_until(app, lambda: not window._frames_playing())
+    assert window._frame_player.current is None
+    window.update_detection(True)  # 人一直在：不重播
+    assert not window._frames_playing()
+    window.close()
+
+
+def test_frame_player_keeps_wall_clock_by_dropping_frames(app, tmp_path) -> None:
+    gif = write_test_gif(tmp_path / "busy.gif", frames=20, size=(32, 32), fps=50)
+    player = FramePlayer(GifFrameSource(str(gif)))
+    times, done = [], []
+
+    def on_frame() -> None:
+        times.append(time.perf_counter())
+        end = times[-1] + 0.045  # 每帧占住 GUI 线程 45 ms，远超 20 ms 的帧时长
+        while time.perf_counter() < end:
+            pass
+
+    player.frameChanged.connect(on_frame)
+    player.finished.connect(lambda: done.append(time.perf_counter()))
+    player.play()
+    _run_until(app, lambda: done)
+    stats = player.stats()
+    assert stats["frames_dropped"] > 0 and stats["frames_late"] > 0
+    assert stats["frames_shown"] + stats["frames_dropped"] == 20
+    # 整段（含最后一帧的时长）仍约为标称的 20 × 20 ms
+    assert 0.38 <= done[0] - times[0] < 0.5
+
+
+def test_prewarmed_first_frame_is_ready_on_detection(app, tmp_path) -> None:
+    gif = write_test_gif(tmp_path / "warm.gif", frames=8, size=(64, 64), fps=50)
+    window = PetWindow()
+    window.show()
+    window._setup_gif(str(gif))
+    app.processEvents()
+    player = window._frame_player
+    _run_until(app, lambda: player._warm_thread is None)
+    assert player.warm_frames > 0
+    window.update_detection(True)
+    assert player.current is not None and player.current.index == 0  # 不等解码线程，当场有第一帧
+    _run_until(app, lambda: not window._frames_playing())
+    stats = window.playback_stats()
+    assert stats["frames_shown"] + stats["frames_dropped"] == 8  # 解码线程跳过已预热的帧
+    assert stats["reactions"] == 1 and stats["warm_frames"] == player.warm_frames > 0
+    window.close()
+
+
+def test_stale_prewarm_finished_signal_leaves_the_current_prewarm_alone(app, tmp_path) -> None:
+    gif = write_test_gif(tmp_path / "rewarm.gif", frames=8, size=(64, 64), fps=50)
+    player = FramePlayer(GifFrameSource(str(gif)))
+    player.set_size(QSize(64, 64))
+    player.prewarm()
+    stale = player._warm_thread
+    stale.wait()  # 线程已结束，但 finished 还在事件队列里
+    player._drop_warm()
+    player.prewarm()
+    current = player._warm_thread
+    assert current is not None and current is not stale
+    player._collect_warm(stale)  # 旧线程的 finished 迟到：不收走也不等待新的预热线程
+    assert player._warm_thread is current and player.warm_frames == 0
+    _run_until(app, lambda: player._warm_thread is None)
+    assert player.warm_frames > 0
+
+
+class _SlowGifSource(GifFrameSource):
+    def read(self):
+        time.sleep(0.03)  # 每帧解码 30 ms
+        return super().read()
+
+
+def test_play_during_prewarm_does_not_wait_for_the_prewarm_thread(app, tmp_path) -> None:
+    gif = write_test_gif(tmp_path / "slow.gif", frames=10, size=(32, 32), fps=50)
+    player = FramePlayer(_SlowGifSource(str(gif)), prewarm_bytes=1 << 20)
+    player.set_size(QSize(32, 32))
+    shown, done = [], []
+    player.frameChanged.connect(lambda: shown.append(player.current.index))
+    player.finished.connect(lambda: done.append(True))
+    player.prewarm()
+    warming, queue = player._warm_thread, player._warm_queue
+    _run_until(app, lambda: len(queue._frames) >= 2)
+    start = time.perf_counter()
+    player.play()  # 预热线程还在解码：只收下已解码的帧，不等它
+    assert time.perf_counter() - start < 0.02
+    assert not warming.isFinished() and player._warm_thread is None
+    _run_until(app, lambda: done)
+    # 预热帧之后由新的解码线程接着解码：每帧恰好出现一次、按顺序
+    assert sorted(shown) == shown and len(set(shown)) == len(shown)
+    stats = player.stats()
+    assert stats["frames_shown"] + stats["frames_dropped"] == 10
+
+
+def test_window_plays_video_through_opencv_and_releases_the_decoder(app, tmp_path, monkeypatch) -> None:
+    import desktop_pet.app.window as window_module
+
+    monkeypatch.setattr(window_module, "USE_OPENCV_PLAYBACK", True)
+    video = write_test_video(tmp_path / "pet_i2v.mp4", frames=6, size=(96, 160), fps=60)
+    window = PetWindow()
+    window.show()
+    window._setup_media(str(video))  # 没有 GIF 也直接播视频
+    app.processEvents()
+    player = window._frame_player
+    source = player.source
+    assert isinstance(source, VideoFrameSource)
+    for i in range(3):
+        window.update_detection(True)
+        _run_until(app, lambda: player.current is not None)
+        assert player.current.image.size() == window._media_rect().size()  # 解码时已缩放到显示区域
+        _run_until(app, lambda: not window._frames_playing())
+        window.update_detection(False)
+        assert source._cap is None  # 每遍播完释放 VideoCapture
+    stats = player.stats()
+    assert stats["plays"] == 3 and stats["frames_shown"] + stats["frames_dropped"] == 18
+    assert stats["peak_buffered_bytes"] <= player.budget_bytes
+    window.close()
+
+
+def test_framepack_round_trips_video_frames_and_plays_zero_copy(app, tmp_path) -> None:
+    from desktop_pet.jimeng.video_to_gif import video_to_framepack
+
+    video = write_test_video(tmp_path / "pet_i2v.mp4", frames=5, size=(96, 160), fps=50)
+    raw = video_to_framepack(video, size=(48, 80), pack_path=tmp_path / "raw.framepack")
+    packed = video_to_framepack(video, size=(48, 80), compress=True, pack_path=tmp_path / "zlib.framepack")
+    assert os.path.getsize(packed) < os.path.getsize(raw)
+    sources = [FramePackSource(str(raw)), FramePackSource(str(packed))]
+    for source in sources:
+        assert source.open(QSize(48, 80))
+        source.skip(3)  # 只移动读取位置
+        frame = source.read()
+        assert (frame.index, frame.delay_ms, frame.image.size()) == (3, 20, QSize(48, 80))
+        assert source.read().index == 4 and source.read() is None
+        source.close()
+    first = [s.open(QSize(48, 80)) and s.read().image for s in sources]
+    assert first[0] == first[1] and first[0].pixel(24, 40) >> 24 == 0xFF
+    # 未压缩的帧直接指向映射内存
+    pack = sources[0]._pack
+    base = np.frombuffer(pack._mm, np.uint8).ctypes.data
+    assert int(first[0].constBits()) == base + int(pack.index[0]["offset"])
+    assert FramePackSource(str(tmp_path / "missing.framepack")).open(QSize(48, 80)) is False
+    player = FramePlayer(sources[0])
+    player.set_size(QSize(48, 80))
+    done = []
+    player.finished.connect(lambda: done.append(True))
+    player.play()
+    _run_until(app, lambda: done)
+    assert player.stats()["frames_shown"] + player.stats()["frames_dropped"] == 5
+
+
+def test_default_framepack_matches_the_media_rect_and_is_served_unscaled(app, tmp_path) -> None:
+    from desktop_pet.jimeng.video_to_gif import video_to_framepack
+
+    video = write_test_video(tmp_path / "pet_i2v.mp4", frames=3, size=(96, 160), fps=50)
+    pack = video_to_framepack(video, pack_path=tmp_path / "pet.framepack")  # 缺省尺寸
+    window = PetWindow()
+    window.show()
+    window._setup_player(FramePackSource(str(pack)))
+    app.processEvents()
+    source = window._frame_player.source
+    window.update_detection(True)
+    _run_until(app, lambda: window._frame_player.current is not None)
+    image = window._frame_player.current.image
+    assert image.size() == window._media_rect().size()
+    base = np.frombuffer(source._pack._mm, np.uint8).ctypes.data
+    assert base <= int(image.constBits()) < base + len(source._pack._mm)  # 直接指向映射内存，未缩放拷贝
+    _run_until(app, lambda: not window._frames_playing())
+    # 尺寸不一致时等比铺满、居中裁剪，不拉伸
+    other = FramePackSource(str(pack))
+    assert other.open(QSize(90, 180))
+    assert other.read().image.size() == QSize(90, 180)
+    window.close()
@@ -0,0 +1,678 @@
+"""摄像头检测测试（不依赖真实摄像头）。"""
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QCoreApplication
+
+from desktop_pet.camera.backends import BACKEND_NAMES, create_backend
+from desktop_pet.camera.classifier import CatClassifier
+from desktop_pet.camera.detector import (
+    MOTION_CONFIDENCE_SCALE,
+    MOTION_RATIO_THRESHOLD,
+    CameraDetector,
+    DetectionResult,
+    scaled_blur_ksize,
+)
+from desktop_pet.camera.filter import DetectionFilter
+from desktop_pet.camera.pipeline import CameraPipeline, LatestFrameSlot
+from desktop_pet.camera.profiling import StageHistogram
+from desktop_pet.camera.process_detector import ProcessCameraDetector
+from desktop_pet.camera.roi import RoiStore, build_roi_geometry, rect_region
+from desktop_pet.camera.scheduler import AdaptiveScheduler, IdleReleasePolicy
+from desktop_pet.camera.tracking import MotionTracker
+from desktop_pet.camera.bench import run_detect_bench, run_filter_bench
+from tests.onnx_models import write_color_cat_model
+from desktop_pet.health.timeline import TimelineWriter
+from desktop_pet.camera.sources import (
+    ImageDirSource,
+    SyntheticSource,
+    VideoFileSource,
+    open_source,
+    synthetic_frames,
+    synthetic_labels,
+)
+
+
+def _frame_with_block(x: int, w: int = 640, h: int = 480) -> np.ndarray:
+    frame = np.full((h, w, 3), 40, dtype=np.uint8)
+    frame[150:330, x:x + 180] = 220
+    return frame
+
+
+class _ListCapture:
+    """按顺序回放内存帧的假摄像头，帧用完后读取失败；统计 grab / 解码次数。"""
+
+    def __init__(self, frames):
+        self._frames = frames
+        self._current = None
+        self.grabs = 0
+        self.retrieves = 0
+        self.opened = True
+
+    def isOpened(self) -> bool:
+        return self.opened
+
+    def grab(self) -> bool:
+        time.sleep(0.005)
+        if not self._frames:
+            return False
+        self._current = self._frames.pop(0)
+        self.grabs += 1
+        return True
+
+    def retrieve(self, image=None):
+        self.retrieves += 1
+        return self._current is not None, self._current
+
+    def read(self, image=None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def release(self) -> None:
+        self.opened = False
+
+
+class _FakeDetector(CameraDetector):
+    """用内存帧代替摄像头。"""
+
+    def __init__(self, frames, **kwargs):
+        super().__init__(warmup_frames=0, **kwargs)
+        self.capture = _ListCapture(list(frames))
+
+    def _open_capture(self):
+        return self.capture
+
+
+def test_process_frame_detects_motion() -> None:
+    detector = CameraDetector()
+    first = detector.process_frame(_frame_with_block(60))
+    assert first.pet_detected is False
+    still = detector.process_frame(_frame_with_block(60))
+    assert still.pet_detected is False
+    moved = detector.process_frame(_frame_with_block(360))
+    assert moved.pet_detected is True
+    assert 0.0 < moved.confidence <= 1.0
+
+
+def test_downscaled_processing_matches_full_resolution() -> None:
+    assert scaled_blur_ksize(1.0) == 21
+    assert scaled_blur_ksize(0.25) == 5
+    assert scaled_blur_ksize(0.05) == 3
+    frames = list(synthetic_frames(60, size=(1280, 720)))
+    full = CameraDetector(process_size=None)
+    small = CameraDetector(process_size=(320, 240))
+    full_flags = [full.process_frame(f).pet_detected for f in frames]
+    small_flags = [small.process_frame(f).pet_detected for f in frames]
+    assert any(full_flags)
+    agreement = sum(a == b for a, b in zip(full_flags, small_flags)) / len(frames)
+    assert agreement >= 0.95
+    assert small._geometry(720, 1280) == (320, 180, 5)
+
+
+def test_reuse_buffers_matches_allocating_path() -> None:
+    frames = list(synthetic_frames(40, size=(640, 480)))
+    alloc = CameraDetector(reuse_buffers=False)
+    reuse = CameraDetector(reuse_buffers=True)
+    for frame in frames:
+        a = alloc.process_frame(frame)
+        b = reuse.process_frame(frame)
+        assert a.pet_detected == b.pet_detected
+        assert abs(a.confidence - b.confidence) < 1e-9
+    bufs = reuse._bufs
+    reuse.process_frame(frames[0])
+    assert reuse._bufs is bufs  # 同分辨率不重新分配
+
+
+@pytest.mark.parametrize("name", BACKEND_NAMES)
+def test_backends_agree_with_and_without_buffer_reuse(name: str) -> None:
+    frames = list(synthetic_frames(30, size=(320, 240)))
+    alloc = CameraDetector(backend=name, reuse_buffers=False)
+    reuse = CameraDetector(backend=name, reuse_buffers=True)
+    for frame in frames:
+        assert alloc.process_frame(frame).pet_detected == reuse.process_frame(frame).pet_detected
+    stats = reuse.backend.stats()
+    assert stats["backend"] == name and stats["frames"] == len(frames)
+    assert stats["ms_per_frame"] > 0.0
+
+
+def test_running_average_catches_slow_motion() -> None:
+    frames = list(synthetic_frames(36, size=(320, 240), walk_frames=36))
+    labels = synthetic_labels(36, walk_frames=36)
+    diff = CameraDetector(backend="frame_diff")
+    avg = CameraDetector(backend="running_avg")
+    diff_hits = sum(diff.process_frame(f).pet_detected for f in frames)
+    avg_hits = sum(avg.process_frame(f).pet_detected for f in frames)
+    assert avg_hits > diff_hits
+    assert avg_hits >= sum(labels) * 0.9
+    with pytest.raises(ValueError):
+        create_backend("nope")
+
+
+def _frame_with_fan(blade_on: bool, cat_x: int = 0) -> np.ndarray:
+    """右上角有「吊扇」闪烁、左下角可能有「猫」的画面。"""
+    frame = np.full((480, 640, 3), 40, dtype=np.uint8)
+    if blade_on:
+        frame[0:200, 420:640] = 230
+    if cat_x:
+        frame[300:460, cat_x:cat_x + 120] = 220
+    return frame
+
+
+@pytest.mark.parametrize("reuse", [False, True])
+def test_roi_excludes_masked_motion(reuse: bool) -> None:
+    full = CameraDetector(reuse_buffers=reuse)
+    # 左下角的 L 形多边形：排除右上角的吊扇
+    roi = [[(0.0, 0.5), (0.6, 0.5), (0.6, 1.0), (0.0, 1.0)], rect_region(0.0, 0.0, 0.2, 0.5)]
+    masked = CameraDetector(reuse_buffers=reuse, roi=roi)
+    fan = [_frame_with_fan(i % 2 == 0) for i in range(6)]
+    assert any(full.process_frame(f).pet_detected for f in fan)
+    assert not any(masked.process_frame(f).pet_detected for f in fan)
+    assert masked.process_frame(_frame_with_fan(False, cat_x=200)).pet_detected
+    # 掩码按分辨率只算一次，且只处理包围盒
+    geom = masked._roi_geom
+    assert geom.crop == (0, 0, 384, 480)
+    assert masked._geometry(480, 640)[:2] == geom.size == (192, 240)
+    masked.process_frame(fan[0])
+    assert masked._roi_geom is geom
+    assert 0 < geom.pixels < 192 * 240 and geom.mask is not None
+    assert build_roi_geometry([rect_region(0.25, 0.25, 0.5, 0.5)], 640, 480, 0.5).mask is None
+
+
+def test_roi_store_round_trip(tmp_path) -> None:
+    store = RoiStore(base_dir=tmp_path)
+    assert store.load("u1") == []
+    store.save("u1", [rect_region(0.1, 0.2, 0.3, 0.4), [(0.0, 0.0), (1.0, 0.0)]])
+    regions = store.load("u1")
+    assert len(regions) == 1 and regions[0][2] == pytest.approx((0.4, 0.6))
+    (tmp_path / "u2.json").write_text("{broken", encoding="utf-8")
+    assert store.load("u2") == []
+
+
+def test_detect_bench_on_scripted_synthetic_source() -> None:
+    source = SyntheticSource(count=80, size=(320, 240), script=[(10, 12), (50, 8)])
+    assert source.labels[9:11] == [False, True] and sum(source.labels) == 20
+    row = run_detect_bench(source)
+    assert row["frames"] == 80 and row["fps"] > 0
+    assert 0.0 < row["p50_ms"] <= row["p99_ms"]
+    assert row["recall"] >= 0.8 and row["precision"] >= 0.8
+    # 帧源可重复打开（检测器释放后重开从头回放）
+    assert run_detect_bench(source, limit=5)["frames"] == 5
+
+
+def test_image_dir_and_video_file_sources(tmp_path) -> None:
+    import cv2
+    frames = [_frame_with_block(x) for x in (60, 60, 360, 360)]
+    for i, frame in enumerate(frames):
+        cv2.imwrite(str(tmp_path / f"{i:03d}.png"), frame)
+    (tmp_path / "labels.txt").write_text("0\n0\n1  # 猫进入\n0\n", encoding="utf-8")
+    source = ImageDirSource(tmp_path)
+    assert source.labels == [False, False, True, False]
+    detector = CameraDetector(source=source, warmup_frames=5)
+    flags = [detector.detect().pet_detected for _ in range(4)]
+    assert flags == [False, False, True, False]  # 帧源不丢预热帧
+    assert detector.detect().message == "无法读取画面"
+    assert isinstance(open_source(str(tmp_path)), ImageDirSource)
+    with pytest.raises(ValueError):
+        open_source(str(tmp_path / "missing.mp4"))
+
+    video = tmp_path / "clip.avi"
+    writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*"MJPG"), 10, (640, 480))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+    looped = VideoFileSource(video, loop=True).open()
+    shapes = [looped.read()[1].shape for _ in range(6)]
+    assert shapes == [(480, 640, 3)] * 6
+    looped.release()
+    assert not looped.isOpened()
+
+
+def test_process_detector_matches_and_restarts_after_crash() -> None:
+    frames = list(synthetic_frames(30, size=(320, 240)))
+    local = CameraDetector(backend="running_avg")
+    remote = ProcessCameraDetector(backend="running_avg")
+    try:
+        for frame in frames:
+            a = local.process_frame(frame)
+            b = remote.process_frame(frame)
+            assert (a.pet_detected, a.message) == (b.pet_detected, b.message)
+            assert abs(a.confidence - b.confidence) < 1e-9
+        assert remote.model_ready()
+        remote._proc.kill()
+        remote._proc.join()
+        after = remote.process_frame(frames[0])
+        assert after.message == "初始化"  # 新子进程重建背景模型
+        assert remote.process_frame(frames[1]).message != "初始化"
+        stats = remote.camera_stats()
+        assert stats["worker_starts"] == 2 and stats["worker_failures"] == 1
+        # 摄像头重开：子进程内背景模型与轨迹一并重建
+        remote._open_generation += 1
+        reopened = remote.process_frame(frames[2])
+        assert reopened.message == "初始化" and reopened.track is None
+        # 更换检测区域只做标记，由处理下一帧的线程重启子进程
+        proc = remote._proc
+        remote.set_roi([rect_region(0.0, 0.0, 0.5, 1.0)])
+        assert remote._proc is proc and proc.is_alive()
+        remote.process_frame(frames[3])
+        assert not proc.is_alive() and remote.camera_stats()["worker_starts"] == 3
+        assert remote.camera_stats()["worker_failures"] == 1
+    finally:
+        remote.close()
+    assert not remote.worker_alive()
+
+
+def test_process_detector_backs_off_when_the_worker_never_starts() -> None:
+    frames = list(synthetic_frames(6, size=(320, 240)))
+    remote = ProcessCameraDetector(backend="running_avg")
+    remote._worker_options = lambda: {"no_such_option": True}  # 子进程构造检测器即失败
+    try:
+        results = [remote.process_frame(frame) for frame in frames]
+        assert all(r.pet_detected is False and r.message.startswith("检测进程异常") for r in results)
+        # 第一次失败后立即重试一次，之后在退避期内不再每帧创建子进程
+        stats = remote.camera_stats()
+        assert stats["worker_starts"] == 2 and stats["worker_failures"] == 2
+        assert not remote.worker_alive()
+        remote._retry_at = 0.0  # 退避结束：下一帧再试，失败后退避翻倍
+        remote.process_frame(frames[0])
+        assert remote.camera_stats()["worker_starts"] == 3
+        assert remote._retry_at - time.monotonic() > 1.5
+    finally:
+        remote.close()
+
+
+def _frame_with_colored_block(x: int, color) -> np.ndarray:
+    frame = np.full((480, 640, 3), 40, dtype=np.uint8)
+    frame[150:330, x:x + 180] = color
+    return frame
+
+
+def test_classifier_runs_only_on_motion_and_rejects_non_cats(tmp_path) -> None:
+    model = write_color_cat_model(tmp_path / "color_cat.onnx")
+    classifier = CatClassifier(model, input_size=(32, 32), cat_classes=(1,))
+    detector = CameraDetector(classifier=classifier)
+    orange, grey = (40, 130, 230), (80, 80, 80)
+    assert detector.process_frame(_frame_with_colored_block(60, grey)).cat_confidence is None
+    still = detector.process_frame(_frame_with_colored_block(60, grey))
+    assert still.cat_confidence is None and classifier.calls == 0  # 无运动不分类
+    person = detector.process_frame(_frame_with_colored_block(360, grey))
+    assert person.pet_detected is False and person.cat_confidence < 0.5
+    cat = detector.process_frame(_frame_with_colored_block(360, orange))
+    assert cat.pet_detected is True and cat.confidence == cat.cat_confidence > 0.7
+    # 同一块画面反复出现：命中缓存，不重复推理
+    for color in (grey, orange, grey):
+        detector.process_frame(_frame_with_colored_block(360, color))
+    calls = classifier.calls
+    stats = detector.classifier_stats()
+    assert calls == 3 and stats["classifier_cache_hits"] == 2
+    assert stats["classifier_calls_per_min"] == calls and stats["classifier_ms"] > 0.0
+
+
+def test_classifier_cache_keys_on_crop_shape_and_call_times_stay_bounded(tmp_path, monkeypatch) -> None:
+    import desktop_pet.camera.classifier as classifier_module
+
+    classifier = CatClassifier(write_color_cat_model(tmp_path / "color_cat.onnx"), input_size=(32, 32), cat_classes=(1,))
+    square = np.full((64, 64, 3), 120, dtype=np.uint8)
+    wide = np.full((64, 128, 3), 120, dtype=np.uint8)  # 缩略图与 square 相同
+    classifier.classify(square)
+    classifier.classify(wide)
+    assert classifier.calls == 2 and classifier.cache_hits == 0
+    # 推理时刻在 classify() 里就修剪，不依赖 stats() 被调用
+    clock = [time.monotonic()]
+    monkeypatch.setattr(classifier_module.time, "monotonic", lambda: clock[0])
+    for i in range(5):
+        clock[0] += 61.0
+        classifier.classify(np.full((64, 64, 3), 10 + 40 * i, dtype=np.uint8))
+    assert len(classifier._call_times) == 1
+
+
+def test_missing_classifier_model_falls_back_to_motion(tmp_path) -> None:
+    detector = CameraDetector(classifier=str(tmp_path / "missing.onnx"))
+    detector.process_frame(_frame_with_block(60))
+    moved = detector.process_frame(_frame_with_block(360))
+    assert moved.pet_detected is True and moved.cat_confidence is None
+    assert detector.classifier.error
+
+
+def test_detection_reports_motion_box_centroid_and_track() -> None:
+    empty = np.full((480, 640, 3), 40, dtype=np.uint8)
+    detector = CameraDetector(backend="running_avg")
+    detector.process_frame(empty)
+    assert detector.process_frame(empty).bbox is None
+    result = detector.process_frame(_frame_with_block(360))
+    x, y, w, h = result.bbox
+    # 方块在 x 360~540、y 150~330（画面 640x480）；模糊会让外接框略大
+    assert 0.5 < x < 360 / 640 + 0.02 and 0.25 < y < 150 / 480 + 0.02
+    assert x + w > 530 / 640 and y + h > 320 / 480
+    assert x < result.centroid[0] < x + w and y < result.centroid[1] < y + h
+    assert result.track == result.centroid
+    nxt = detector.process_frame(_frame_with_block(420))
+    # 平滑轨迹在上一次与本次质心之间
+    assert result.track[0] < nxt.track[0] < nxt.centroid[0]
+    for _ in range(3):
+        last = detector.process_frame(empty)
+    assert last.bbox is None and last.track is None  # 连续无运动后轨迹清空
+    # 检测区域：坐标仍按整幅画面归一化
+    roi = CameraDetector(roi=[rect_region(0.5, 0.0, 0.5, 1.0)])
+    roi.process_frame(empty)
+    moved = roi.process_frame(_frame_with_block(440))
+    assert 0.5 <= moved.bbox[0] and moved.centroid[0] > 0.6
+
+
+def test_motion_tracker_single_component_matches_the_merged_path() -> None:
+    tracker = MotionTracker()
+    mask = np.zeros((480, 640), np.uint8)
+    mask[160:320, 320:480] = 255
+    (box, centroid) = tracker.locate(mask)
+    assert box == pytest.approx((0.5, 1 / 3, 0.25, 1 / 3), abs=0.04)
+    assert centroid == pytest.approx((0.625, 0.5), abs=0.04)
+    # 加一块远小于主区域的噪点：被面积过滤掉，结果与单连通域一致
+    mask[20:36, 20:40] = 255
+    noisy_box, noisy_centroid = tracker.locate(mask)
+    assert noisy_box == pytest.approx(box) and noisy_centroid == pytest.approx(centroid)
+    assert tracker.stats()["track_calls"] == 2
+
+
+def test_detection_filter_hysteresis_and_dwell() -> None:
+    f = DetectionFilter(alpha=0.6, on_threshold=0.25, off_threshold=0.1, min_dwell_ms=3000)
+    # 阈值附近的零星抖动不触发
+    flicker = [(True, 0.26), (True, 0.26), (False, 0.0), (True, 0.26), (False, 0.0)]
+    assert not any(f.update(d, c, now=float(t)) for t, (d, c) in enumerate(flicker))
+    assert f.raw_edges == 2 and f.filtered_edges == 0
+    # 明显的运动第一次就确认
+    assert f.update(True, 0.7, now=5.0)
+    # 短暂中断不关闭：先受最短保持时间约束，之后还要降到关阈值以下
+    assert f.update(False, 0.0, now=6.0)
+    assert f.update(True, 0.4, now=8.5)
+    assert f.update(False, 0.0, now=9.0)
+    assert not f.update(False, 0.0, now=10.0)
+    assert f.raw_edges == 4 and f.filtered_edges == 1
+    f.reset()
+    assert f.level == 0.0 and not f.active
+
+
+def test_detection_filter_confirms_steady_detections_just_above_the_threshold() -> None:
+    f = DetectionFilter()
+    confidence = min(1.0, MOTION_RATIO_THRESHOLD * 1.01 * MOTION_CONFIDENCE_SCALE)  # 刚过运动阈值的检测
+    ticks = [f.update(True, confidence, now=float(t)) for t in range(8)]
+    # ALPHA=0.3、开阈值为阈值置信度的 0.9 倍：0.7^7 < 0.1，第 7 次确认
+    assert ticks.index(True) == 6 and all(ticks[6:])
+    # 离开后只需保持 CAMERA_FILTER_MIN_OFF_MS 就能确认再次到来
+    t = 8.0
+    while f.active:
+        f.update(False, 0.0, now=t)
+        t += 1.0
+    off_at = t - 1.0
+    assert f.update(True, 1.0, now=off_at + 1.0)
+
+
+def test_filter_bench_cuts_flicker_starts_without_delaying_arrivals() -> None:
+    raw, filtered = run_filter_bench(SyntheticSource(count=400, flicker=0.15))
+    assert filtered["starts"] < raw["starts"] / 2
+    assert filtered["false_starts"] < raw["false_starts"] / 4
+    assert filtered["missed"] == raw["missed"] == 0
+    assert filtered["delay_max_ms"] <= raw["delay_max_ms"] + 1000
+
+
+def test_stage_histogram_percentiles() -> None:
+    hist = StageHistogram()
+    for _ in range(98):
+        hist.add(0.001)
+    hist.add(0.050)
+    hist.add(0.200)
+    s = hist.summary()
+    assert s["count"] == 100 and s["max_ms"] == pytest.approx(200.0)
+    # 分桶为 2^(1/4) 倍：分位数误差不超过约 19%
+    assert 1.0 <= s["p50_ms"] <= 1.0 * 2 ** 0.25
+    assert 50.0 <= s["p99_ms"] <= 50.0 * 2 ** 0.25
+
+
+def test_profiled_detector_records_stages_and_read_failures() -> None:
+    frames = [_frame_with_block(60), _frame_with_block(360), _frame_with_block(360)]
+    plain = _FakeDetector(list(frames))
+    assert plain.profiler is None
+    detector = _FakeDetector(list(frames), profile=True)
+    flags = [detector.detect().pet_detected for _ in range(4)]
+    assert flags == [plain.detect().pet_detected for _ in range(4)]
+    stages = detector.profiler.snapshot()["stages"]
+    assert stages["read"]["count"] == 4
+    for name in ("resize", "gray", "blur", "motion"):
+        assert stages[name]["count"] == 3
+    assert stages["track"]["count"] == 2  # 首帧只建立背景
+    assert detector.camera_stats()["read_failures"] == 1  # 帧用完后读取失败
+
+
+def test_adaptive_scheduler_backs_off_and_recovers() -> None:
+    sched = AdaptiveScheduler(base_interval_ms=1000, floor_interval_ms=8000, quiet_after_ms=3000, backoff=2.0)
+    t = 0.0
+    intervals = []
+    for _ in range(10):
+        interval = sched.on_result(False, now=t)
+        intervals.append(interval)
+        t += interval / 1000.0
+    assert intervals[:3] == [1000, 1000, 1000]
+    assert max(intervals) == 8000 == sched.reaction_bound_ms
+    assert intervals == sorted(intervals)
+    assert sched.skipped > 0
+    assert sched.on_result(True, now=t) == 1000
+    assert sched.stats()["interval_ms"] == 1000
+    # 窗口看不见：即使有运动也按最慢间隔检测
+    assert sched.on_result(True, now=t + 1, visible=False) == 8000
+    assert sched.stats()["hidden_detections"] == 1
+
+
+def test_latest_frame_slot_recycles_buffers() -> None:
+    slot = LatestFrameSlot()
+    assert slot.spare() is None
+    slot.put("a")
+    slot.put("b")  # "a" 被覆盖 -> 回收
+    assert slot.spare() == "a"
+    assert slot.take(timeout=0.1) == "b"
+    slot.put("c")
+    assert slot.take(timeout=0.1) == "c"
+    assert slot.spare() == "b"  # 读取方用完的帧回收
+
+
+def test_latest_frame_slot_keeps_only_newest() -> None:
+    slot = LatestFrameSlot()
+    slot.put("a")
+    slot.put("b")
+    assert slot.take(timeout=0.1) == "b"
+    assert slot.take(timeout=0.01) is None
+    slot.put("c")
+    slot.clear()
+    assert slot.take(timeout=0.01) is None
+    slot.close()
+    assert slot.take(timeout=1.0) is None
+
+
+class _FlakyCapture:
+    """模拟刚打开时自动曝光未收敛：前几帧整体偏暗，之后稳定。"""
+
+    def __init__(self, dark_frames: int):
+        self._dark = dark_frames
+        self.grabs = 0
+        self.opened = True
+
+    def isOpened(self) -> bool:
+        return self.opened
+
+    def grab(self) -> bool:
+        self.grabs += 1
+        self._dark -= 1
+        return True
+
+    def read(self, image=None):
+        self._dark -= 1
+        level = 0 if self._dark >= 0 else 40
+        return True, _frame_with_block(60) // 40 * level
+
+    def release(self) -> None:
+        self.opened = False
+
+
+class _ReopenDetector(CameraDetector):
+    def _open_capture(self):
+        return _FlakyCapture(dark_frames=3)
+
+
+def test_reopen_discards_warmup_and_resets_model() -> None:
+    detector = _ReopenDetector(warmup_frames=3)
+    results = [detector.detect() for _ in range(3)]
+    assert detector._cap.grabs == 3
+    assert not any(r.pet_detected for r in results)
+    detector.release()
+    first_after_reopen = detector.detect()
+    assert first_after_reopen.pet_detected is False
+    assert first_after_reopen.message == "初始化"
+    stats = detector.camera_stats()
+    assert stats["opens"] == 2 and stats["closes"] == 1
+    assert stats["open_ms"] >= 0.0 and stats["close_ms"] >= 0.0
+
+
+def test_idle_release_policy() -> None:
+    policy = IdleReleasePolicy(release_after_ms=10_000, probe_interval_ms=5_000)
+    policy.on_result(False, now=0.0)
+    assert not policy.should_release(now=9.0)
+    assert policy.should_release(now=10.0)
+    policy.mark_released(now=10.0)
+    assert policy.seconds_until_probe(now=12.0) == 3.0
+    policy.on_probe(False, now=15.0)
+    assert policy.released
+    policy.set_visible(False, now=16.0)
+    assert policy.seconds_until_probe(now=30.0) is None
+    policy.set_visible(True, now=40.0)
+    assert not policy.released  # 重新可见立即恢复
+    policy.set_visible(False, now=41.0)
+    policy.on_result(True, now=45.0)
+    assert not policy.should_release(now=50.0)
+    assert policy.should_release(now=51.0)  # 不可见满 10 秒
+
+
+@pytest.mark.parametrize("grab_only", [False, True])
+def test_pipeline_emits_results_on_gui_thread(grab_only: bool, tmp_path) -> None:
+    app = QCoreApplication.instance() or QCoreApplication([])
+    frames = [_frame_with_block(60), _frame_with_block(60)] + [_frame_with_block(360)] * 50
+    detector = _FakeDetector(frames, interval_ms=20, grab_only=grab_only, profile=True)
+    timeline = TimelineWriter(tmp_path)
+    pipeline = CameraPipeline(detector, timeline=timeline)
+    results = []
+    pipeline.detectionReady.connect(results.append)
+    pipeline.detectionReady.connect(pipeline.mark_delivered)
+    pipeline.start()
+    deadline = time.monotonic() + 3.0
+    while time.monotonic() < deadline and not any(r.pet_detected for r in results):
+        app.processEvents()
+        time.sleep(0.01)
+    stats = pipeline.stats()
+    snapshot = pipeline.profile_snapshot()
+    pipeline.stop()
+    timeline.close()
+    assert snapshot["stages"]["process"]["count"] >= 1
+    assert snapshot["stages"]["end_to_end"]["count"] >= 1
+    assert "frames_dropped" in snapshot["counters"] and "read_failures" in snapshot["counters"]
+    assert results and all(isinstance(r, DetectionResult) for r in results)
+    assert timeline.written >= len(results)  # 每次检测都写入时间线
+    assert any(r.pet_detected for r in results)
+    assert all(r.captured_at > 0.0 for r in results)
+    assert 0.0 <= stats["latency_p50_ms"] <= stats["latency_max_ms"] < 1000.0
+    assert detector.is_open() is False
+    capture = detector.capture
+    if grab_only:
+        # 只解码检测线程实际取走的帧
+        assert capture.retrieves < capture.grabs
+    else:
+        assert capture.retrieves == capture.grabs
+
+
+def test_latest_frame_slot_tracks_waiting_reader_and_timestamp() -> None:
+    slot = LatestFrameSlot()
+    assert not slot.wanted
+    seen = []
+    reader = threading.Thread(target=lambda: seen.append(slot.take(timeout=1.0)))
+    reader.start()
+    deadline = time.monotonic() + 1.0
+    while not slot.wanted and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert slot.wanted
+    slot.put("a", timestamp=12.5)
+    reader.join()
+    assert seen == ["a"] and slot.taken_at == 12.5
+    assert not slot.wanted
+
+
+class _StaticCapture:
+    def __init__(self):
+        self.opened = True
+
+    def isOpened(self) -> bool:
+        return self.opened
+
+    def grab(self) -> bool:
+        time.sleep(0.005)
+        return True
+
+    def retrieve(self, image=None):
+        return True, _frame_with_block(60)
+
+    def read(self, image=None):
+        self.grab()
+        return self.retrieve(image)
+
+    def release(self) -> None:
+        self.opened = False
+
+
+class _StaticDetector(CameraDetector):
+    def _open_capture(self):
+        return _StaticCapture()
+
+
+def test_capture_thread_sleeps_between_scheduled_detections() -> None:
+    app = QCoreApplication.instance() or QCoreApplication([])
+    counts = {}
+    for lead_ms in (50, 10_000):  # 10 s 提前量：采集一直按帧率抓帧（跟随调度之前的行为）
+        detector = _StaticDetector(interval_ms=300, warmup_frames=1)
+        pipeline = CameraPipeline(
+            detector,
+            scheduler=AdaptiveScheduler(base_interval_ms=300, floor_interval_ms=300),
+            idle_policy=IdleReleasePolicy(release_after_ms=10 ** 9),
+            capture_lead_ms=lead_ms,
+        )
+        pipeline.start()
+        deadline = time.monotonic() + 3.0
+        while time.monotonic() < deadline and pipeline.stats()["detections"] < 5:
+            app.processEvents()
+            time.sleep(0.01)
+        stats = pipeline.stats()
+        pipeline.stop()
+        assert stats["detections"] >= 5
+        counts[lead_ms] = stats["capture_grabs"] / stats["detections"]
+        assert pipeline.stats()["capture_wakeups"] >= stats["capture_wakeups"]  # 停止后计数保留
+    # 摄像头 5 ms 一帧：跟随调度时每次检测只抓提前量内的约 10 帧，而不是整个 300 ms 间隔的约 60 帧
+    assert counts[50] < 25 < counts[10_000]
+
+
+def test_pipeline_releases_idle_camera_and_probes() -> None:
+    app = QCoreApplication.instance() or QCoreApplication([])
+    detector = _StaticDetector(interval_ms=20, warmup_frames=1)
+    pipeline = CameraPipeline(
+        detector,
+        idle_policy=IdleReleasePolicy(release_after_ms=100, probe_interval_ms=150),
+    )
+    pipeline.start()
+    deadline = time.monotonic() + 3.0
+    while time.monotonic() < deadline and pipeline.stats()["probes"] < 2:
+        app.processEvents()
+        time.sleep(0.01)
+    stats = pipeline.stats()
+    pipeline.stop()
+    assert stats["releases"] >= 1 and stats["probes"] >= 2
+    assert stats["opens"] >= 2 and stats["closes"] >= 1
+    assert detector.is_open() is False
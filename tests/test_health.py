@@ -1,9 +1,20 @@
-"""健康提醒测试。"""
+"""健康提醒与检测时间线测试。"""
 import tempfile
+from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+
 from desktop_pet.health.models import HealthReminder, ReminderType
 from desktop_pet.health.reminders import HealthReminderService
+from desktop_pet.health.timeline import (
+    FLAG_DETECTED,
+    FLAG_RAW_DETECTED,
+    DetectionTimeline,
+    TimelineWriter,
+    day_file,
+    read_day,
+)
 
 
 def test_reminder_service_list_and_save() -> None:
@@ -15,3 +26,55 @@ def test_reminder_service_list_and_save() -> None:
         assert feed is not None
         assert feed.pet_id == "pet1"
         assert feed.interval_minutes > 0
+
+
+def test_timeline_writer_rotates_daily_and_queries(tmp_path) -> None:
+    day = datetime(2024, 5, 6, 23, 30).timestamp()
+    writer = TimelineWriter(tmp_path, flush_ms=10)
+    # 23:30 ~ 00:30 每分钟一次，跨零点写到两个文件
+    for i in range(61):
+        ts = day + 60 * i
+        writer.append(ts, 0.05 if i % 2 else 0.0, 0.5 if i % 2 else 0.0, bool(i % 2))
+    writer.close()
+    assert writer.written == 61 and writer.stats()["timeline_pending"] == 0
+    timeline = DetectionTimeline(tmp_path)
+    assert [d.isoformat() for d in timeline.days()] == ["2024-05-06", "2024-05-07"]
+    records = timeline.query(day, day + 61 * 60)
+    assert len(records) == 61 and np.all(np.diff(records["ts"]) > 0)
+    assert int(np.count_nonzero(records["flags"] & FLAG_DETECTED)) == 30
+    assert len(timeline.query(day + 600, day + 1200)) == 10
+
+    hourly = timeline.hourly(day, day + 61 * 60)
+    assert len(hourly) == 2  # 23 点与 0 点
+    assert list(hourly["ticks"]) == [30, 31]
+    assert list(hourly["detected"]) == [15, 15]
+    assert hourly["confidence_max"][0] == np.float32(0.5)
+
+
+def test_timeline_ignores_truncated_tail_and_appends_aligned(tmp_path) -> None:
+    ts = datetime(2024, 5, 6, 12, 0).timestamp()
+    writer = TimelineWriter(tmp_path)
+    writer.append(ts, 0.1, 1.0, True)
+    writer.flush()
+    path = day_file(tmp_path, datetime.fromtimestamp(ts).date())
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 5)  # 上次写到一半退出
+    assert len(read_day(path)) == 1
+    writer2 = TimelineWriter(tmp_path)
+    writer2.append(ts + 1, 0.0, 0.0, False, raw_detected=True)
+    writer2.close()
+    records = DetectionTimeline(tmp_path).query(ts, ts + 2)
+    assert list(records["ts"]) == [ts, ts + 1]
+    assert list(records["flags"]) == [FLAG_DETECTED | FLAG_RAW_DETECTED, FLAG_RAW_DETECTED]
+
+
+def test_timeline_append_after_close_is_counted_as_dropped(tmp_path) -> None:
+    ts = datetime(2024, 5, 6, 12, 0).timestamp()
+    writer = TimelineWriter(tmp_path, flush_ms=10)
+    writer.append(ts, 0.1, 1.0, True)
+    writer.close()
+    writer.append(ts + 1, 0.1, 1.0, True)  # 后台线程已停止：不入队，计入丢弃
+    stats = writer.stats()
+    assert stats["timeline_written"] == 1 and stats["timeline_pending"] == 0
+    assert stats["timeline_dropped"] == 1
+    assert len(DetectionTimeline(tmp_path).query(ts, ts + 2)) == 1